@@ -61,6 +61,9 @@ def summarize_api_configurations(configs: Dict[str, Any]) -> Dict[str, Dict[str,
             "api_key_masked": _mask_secret(api_key),
             "model": getattr(config, "model", None),
             "base_url": getattr(config, "base_url", None),
+            "max_in_flight": getattr(config, "max_in_flight", 0),
+            "requests_per_minute": getattr(config, "requests_per_minute", 0),
+            "tokens_per_minute": getattr(config, "tokens_per_minute", 0),
         }
     return summary
 
@@ -78,14 +81,41 @@ API_DISPLAY_NAMES = {
 }
 
 
+def load_rate_limits(config: Any, max_in_flight: int, requests_per_minute: int, tokens_per_minute: int):
+    """
+    设置平台限流参数（0 表示不限制）
+
+    环境变量 <NAME>_MAX_IN_FLIGHT、<NAME>_REQUESTS_PER_MINUTE、<NAME>_TOKENS_PER_MINUTE 优先于传入的默认值
+    """
+    defaults = {
+        "max_in_flight": max_in_flight,
+        "requests_per_minute": requests_per_minute,
+        "tokens_per_minute": tokens_per_minute,
+    }
+    for attr, default in defaults.items():
+        try:
+            value = int(os.environ.get(f"{config.name.upper()}_{attr.upper()}", default))
+        except (ValueError, TypeError):
+            value = default
+        setattr(config, attr, max(0, value))
+
+
 class APIConfig:
     """API平台配置基类"""
 
+    # 限流默认值，子类按平台额度覆盖
+    MAX_IN_FLIGHT = 8
+    REQUESTS_PER_MINUTE = 0
+    TOKENS_PER_MINUTE = 0
+
     def __init__(self, name: str, base_url: str, api_key: str = None):
         self.name = name
         self.base_url = base_url
         self.api_key = api_key or os.environ.get(f"{name.upper()}_API_KEY")
         self.enabled = bool(self.api_key)
+        load_rate_limits(
+            self, self.MAX_IN_FLIGHT, self.REQUESTS_PER_MINUTE, self.TOKENS_PER_MINUTE
+        )
 
     def get_headers(self) -> Dict[str, str]:
         """获取请求头"""
@@ -226,6 +256,8 @@ class AistudioConfig:
         self.stream = True
         self.response_format = None
         self.fallback_models = ["Qwen3-30B-A3B-Q4_K_M"]
+        # 单实例部署的量化模型，并发高了只会排队变慢
+        load_rate_limits(self, max_in_flight=2, requests_per_minute=0, tokens_per_minute=0)
 
     def get_headers(self):
         return {
@@ -24,17 +24,88 @@ class Config:
     LOG_FILE = os.path.join(DATA_DIR, 'app.log')
     
     # 缓存配置
-    CACHE_TTL = 3600  # 缓存过期时间（秒）
+    CACHE_TTL = 3600  # 缓存过期时间（秒），即新鲜窗口
+    CACHE_MAX_STALE = int(os.environ.get('CACHE_MAX_STALE', 0))  # 过期后仍可先返回旧结果并后台刷新的窗口（秒），0 表示关闭
+    CACHE_REFRESH_WORKERS = int(os.environ.get('CACHE_REFRESH_WORKERS', 2))  # 后台刷新线程数
     MAX_CACHE_SIZE = 1000  # 最大缓存条目数
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'sqlite').lower()  # 缓存存储后端（sqlite/log/json/memory）
+    CACHE_EVICTION_POLICY = os.environ.get('CACHE_EVICTION_POLICY', 'fifo').lower()  # 淘汰策略（lru/fifo/lfu）
+    CACHE_L1_SIZE = int(os.environ.get('CACHE_L1_SIZE', 256))  # 共享缓存前的进程内 L1 条目数，0 表示关闭
+    CACHE_L1_TTL = float(os.environ.get('CACHE_L1_TTL', 30))  # L1 条目最长保留时间（秒）
+    CACHE_VALUE_FORMAT = os.environ.get('CACHE_VALUE_FORMAT', 'json').lower()  # 条目编码（json/msgpack/raw）
+    CACHE_COMPRESSION = os.environ.get('CACHE_COMPRESSION', 'zlib').lower()  # 压缩方式（zlib/zstd/none）
+    CACHE_COMPRESS_MIN_BYTES = int(os.environ.get('CACHE_COMPRESS_MIN_BYTES', 512))  # 编码后达到该大小才压缩
+    CACHE_KEEP_RAW_RESPONSE = os.environ.get('CACHE_KEEP_RAW_RESPONSE', 'False').lower() == 'true'  # 调试时在缓存中保留模型原始输出
+    CACHE_KEY_PREFIX_SEPARATOR = ':'  # 缓存键前缀分隔符（统计按前缀分组）
+    CACHE_L1_EPOCH_CHECK = float(os.environ.get('CACHE_L1_EPOCH_CHECK', 1.0))  # 检查其它进程删除/清空的间隔（秒）
+    # 缓存键由规范化的请求参数计算；描述是否去除空白与标点后再参与计算
+    CACHE_KEY_NORMALIZE_DESCRIPTION = os.environ.get('CACHE_KEY_NORMALIZE_DESCRIPTION', 'True').lower() == 'true'
+    # 迁移期：语义键未命中时仍读取旧的提示词键
+    CACHE_LEGACY_KEY_FALLBACK = os.environ.get('CACHE_LEGACY_KEY_FALLBACK', 'True').lower() == 'true'
+    # 启动预热：恢复快照，并在后台重放最近最常见的请求（每个提供方按每分钟次数限速）
+    CACHE_WARMUP_ENABLED = os.environ.get('CACHE_WARMUP_ENABLED', 'False').lower() == 'true'
+    CACHE_WARMUP_TOP_N = int(os.environ.get('CACHE_WARMUP_TOP_N', 50))  # 重放的请求数量，0 表示只恢复快照
+    CACHE_WARMUP_RATE_PER_MINUTE = float(os.environ.get('CACHE_WARMUP_RATE_PER_MINUTE', 20))  # 0 表示不限速
+    CACHE_WARMUP_SINCE_DAYS = int(os.environ.get('CACHE_WARMUP_SINCE_DAYS', 7))  # 只统计最近若干天的记录，0 表示不限
+    CACHE_SNAPSHOT_FILE = os.environ.get('CACHE_SNAPSHOT_FILE', os.path.join(CACHE_DIR, 'cache.snapshot'))
     
+    # 语料库只读连接池大小（每个连接带 64MB 页缓存与 256MB 内存映射）
+    CORPUS_DB_POOL_SIZE = int(os.environ.get('CORPUS_DB_POOL_SIZE', 4))
+    
+    # 语料库姓名成员缓存（off/auto/set/bloom）
+    CORPUS_MEMBERSHIP_MODE = os.environ.get('CORPUS_MEMBERSHIP_MODE', 'auto').lower()
+    CORPUS_MEMBERSHIP_MAX_MB = int(os.environ.get('CORPUS_MEMBERSHIP_MAX_MB', 256))  # 内存预算（MB）
+    CORPUS_MEMBERSHIP_ERROR_RATE = float(os.environ.get('CORPUS_MEMBERSHIP_ERROR_RATE', 0.01))  # 布隆过滤器误判率
+    CORPUS_MEMBERSHIP_MAX_BUILD_SECONDS = float(os.environ.get('CORPUS_MEMBERSHIP_MAX_BUILD_SECONDS', 30))
+
+    # 提示词示例姓名池（按风格/性别/朝代预抽取，后台定期轮换）
+    EXAMPLE_POOL_SIZE = int(os.environ.get('EXAMPLE_POOL_SIZE', 200))  # 每个池的示例数量
+    EXAMPLE_POOL_MAX_POOLS = int(os.environ.get('EXAMPLE_POOL_MAX_POOLS', 64))  # 池数量上限
+    EXAMPLE_POOL_REFRESH_SECONDS = float(os.environ.get('EXAMPLE_POOL_REFRESH_SECONDS', 300))  # 轮换间隔，0 表示不轮换
+
+    # 超量生成姓名池（向模型请求 倍数 × 数量 个姓名，剩余的留给之后相同的请求）
+    # 默认关闭：开启后每个未命中的请求按倍数消耗输出 token，且改由姓名池代替结果缓存（见 env.example）
+    NAME_POOL_FACTOR = int(os.environ.get('NAME_POOL_FACTOR', 1))  # 超量倍数，1 表示关闭
+    NAME_POOL_MAX_NAMES = int(os.environ.get('NAME_POOL_MAX_NAMES', 40))  # 单次请求（单个池）的姓名上限
+    NAME_POOL_SHOWN_LIMIT = int(os.environ.get('NAME_POOL_SHOWN_LIMIT', 200))  # 每个用户每种请求记录的已展示姓名上限
+    NAME_POOL_SHOWN_MAX_ENTRIES = int(os.environ.get('NAME_POOL_SHOWN_MAX_ENTRIES', 10000))  # 已展示记录（用户 × 请求）条数上限，独立于 MAX_CACHE_SIZE
+
     # API请求配置
     REQUEST_TIMEOUT = 30  # 请求超时时间（秒）
     MAX_RETRIES = 3  # 最大重试次数
     RETRY_DELAY = 1  # 重试延迟（秒）
+    # 适配器 HTTP 连接池与传输层重试（可按平台覆盖，如 ALIYUN_HTTP_POOL_MAXSIZE）
+    HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', 4))  # 每个适配器缓存的主机连接池数
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 16))  # 每个主机保持的长连接数
+    HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 2))  # 429/5xx 的重试次数（POST 只重试 429 与带 Retry-After 的 503）
+    HTTP_CONNECT_RETRIES = int(os.environ.get('HTTP_CONNECT_RETRIES', 0))  # 连接失败的重试次数，默认交给熔断器快速失败
+    HTTP_RETRY_BACKOFF = float(os.environ.get('HTTP_RETRY_BACKOFF', 0.5))  # 重试退避系数（秒）
+    HTTP_RETRY_STATUSES = os.environ.get('HTTP_RETRY_STATUSES', '429,502,503,504')
+    # 对冲请求：优先平台超过延迟仍未返回时并行调用下一个平台，采用最先返回的有效结果
+    HEDGE_ENABLED = os.environ.get('HEDGE_ENABLED', 'False').lower() == 'true'
+    HEDGE_DELAY_MS = float(os.environ.get('HEDGE_DELAY_MS', 8000))  # 默认对冲延迟（毫秒）
+    HEDGE_USE_P95 = os.environ.get('HEDGE_USE_P95', 'True').lower() == 'true'  # 样本足够时改用该平台的 p95 耗时
+    HEDGE_P95_MIN_SAMPLES = int(os.environ.get('HEDGE_P95_MIN_SAMPLES', 20))
+    HEDGE_MAX_HEDGES = int(os.environ.get('HEDGE_MAX_HEDGES', 1))  # 单次请求最多额外发起的对冲调用数
+    HEDGE_WORKERS = int(os.environ.get('HEDGE_WORKERS', 8))  # 同时进行的对冲调用数上限（首选调用不占用），占满时跳过对冲
+    # 熔断：平台连续失败后在冷却期内直接跳过，冷却结束后只放行一个探测请求
+    CIRCUIT_BREAKER_ENABLED = os.environ.get('CIRCUIT_BREAKER_ENABLED', 'True').lower() == 'true'
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_BREAKER_FAILURE_THRESHOLD', 5))  # 连续失败多少次后熔断
+    CIRCUIT_BREAKER_COOLDOWN = float(os.environ.get('CIRCUIT_BREAKER_COOLDOWN', 30))  # 熔断冷却时间（秒）
+    # 限流：各平台的并发数与每分钟请求/token 数在 config/api_config.py 的 APIConfig 中配置
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+    RATE_LIMIT_MAX_WAIT = float(os.environ.get('RATE_LIMIT_MAX_WAIT', 2))  # 额度用完时最长排队时间（秒），预计更久则换下一个平台
+    SINGLE_FLIGHT_MAX_WAIT = float(os.environ.get('SINGLE_FLIGHT_MAX_WAIT', 30))  # 相同请求等待进行中调用的最长时间（秒），0 表示不合并
     
     # 路由策略
     ROUTER_STRATEGY = os.environ.get('ROUTER_STRATEGY', 'priority').lower()
     ROUTER_WEIGHTS = os.environ.get('ROUTER_WEIGHTS', '')
+    # 自适应路由（ROUTER_STRATEGY=adaptive）：按 (平台, 模型) 的耗时/错误率/解析成功率 EWMA 排序
+    ROUTER_ADAPTIVE_ALPHA = float(os.environ.get('ROUTER_ADAPTIVE_ALPHA', 0.2))  # EWMA 平滑系数，越大越看重最近的调用
+    ROUTER_ADAPTIVE_EXPLORATION = float(os.environ.get('ROUTER_ADAPTIVE_EXPLORATION', 0.3))  # UCB 探索系数，0 表示只按期望耗时
+    ROUTER_ADAPTIVE_PRIOR_LATENCY_MS = float(os.environ.get('ROUTER_ADAPTIVE_PRIOR_LATENCY_MS', 5000))  # 无样本平台的先验耗时
+    ROUTER_STATS_FILE = os.environ.get('ROUTER_STATS_FILE', os.path.join(DATA_DIR, 'router_stats.json'))  # 统计持久化/预置文件，留空不落盘
+    ROUTER_STATS_SAVE_EVERY = int(os.environ.get('ROUTER_STATS_SAVE_EVERY', 20))  # 每记录多少次调用写一次文件
     
     # 姓名生成配置
     DEFAULT_NAME_COUNT = 5  # 默认生成姓名数量
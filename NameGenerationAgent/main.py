@@ -16,6 +16,17 @@ if sys.platform == 'win32':
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
+def start_background_warmup():
+    """按配置在后台恢复缓存快照并重放热门请求（CACHE_WARMUP_ENABLED）"""
+    try:
+        from src.core.cache_warmup import start_cache_warmup
+        from src.core.name_generator import name_generator
+        from src.core.record_service import record_service
+        if start_cache_warmup(name_generator, record_service):
+            print("[成功] 缓存预热已在后台启动")
+    except Exception as e:
+        print(f"[警告] 缓存预热启动失败: {e}")
+
 def main():
     """主函数"""
     print("智能姓名生成系统")
@@ -85,10 +96,15 @@ def main():
         print("   - 年龄: 儿童/青少年/成年人/长者")
         print("   - 同一描述 + 不同选项 = 不同风格的姓名")
         print("按 Ctrl+C 停止服务")
+        server_options = get_dev_server_options(debug=config["default"].DEBUG)
+        # 开启重载时只在实际提供服务的子进程中预热
+        if not server_options.get("debug") or server_options.get("use_reloader") is False \
+                or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+            start_background_warmup()
         app.run(
             host='0.0.0.0',
             port=5000,
-            **get_dev_server_options(debug=config["default"].DEBUG),
+            **server_options,
         )
     except Exception as e:
         print(f"[错误] Flask应用启动失败: {str(e)}")
@@ -0,0 +1,100 @@
+"""
+Benchmark CacheManager.set throughput on a full cache (every set evicts one entry).
+
+Compares the legacy dict scan (full expiry sweep + min() over all keys per set)
+with the ordered eviction structures for each policy.
+
+Usage:
+    python -m scripts.benchmark_cache_eviction --sizes 1000 100000 1000000 --backend memory
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from config.settings import Config
+from src.utils.cache_eviction import available_policies
+from src.utils.cache_manager import CacheManager
+
+VALUE = {"names": [{"name": "林清扬", "meaning": "清朗飞扬"}], "api": "bench"}
+
+
+class LegacyDictCache:
+    """The pre-refactor set(): sweep every entry for expiry, then min() over all keys when full."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.cache_data: Dict[str, dict] = {}
+        self.max_size = max_size
+        self.ttl = ttl
+
+    def set(self, key: str, value):
+        now = time.time()
+        expired = [k for k, d in self.cache_data.items() if now - d["timestamp"] > self.ttl]
+        for k in expired:
+            del self.cache_data[k]
+        if len(self.cache_data) >= self.max_size:
+            oldest = min(self.cache_data, key=lambda k: self.cache_data[k]["timestamp"])
+            del self.cache_data[oldest]
+        self.cache_data[key] = {"value": value, "timestamp": now}
+
+
+def _sets_per_second(cache, ops: int, prefix: str) -> float:
+    start = time.perf_counter()
+    for i in range(ops):
+        cache.set(f"{prefix}{i}", VALUE)
+    elapsed = time.perf_counter() - start
+    return ops / elapsed if elapsed else float("inf")
+
+
+def _bench_legacy(size: int, ops: int) -> float:
+    cache = LegacyDictCache(size, Config.CACHE_TTL)
+    now = time.time()
+    for i in range(size):
+        cache.cache_data[f"fill{i}"] = {"value": VALUE, "timestamp": now}
+    return _sets_per_second(cache, ops, "new")
+
+
+def _bench_manager(size: int, ops: int, backend: str, policy: str, workdir: str) -> float:
+    Config.MAX_CACHE_SIZE = size
+    cache_file = os.path.join(workdir, f"bench-{backend}-{policy}-{size}") if backend != "memory" else None
+    cache = CacheManager(cache_file=cache_file, backend=backend, policy=policy)
+    cache.clear()
+    now = time.time()
+    for i in range(size):
+        cache.backend.set(f"fill{i}", VALUE, now)
+    rate = _sets_per_second(cache, ops, "new")
+    cache.close()
+    return rate
+
+
+def run_benchmark(sizes: List[int], ops: int, legacy_ops: int, backend: str) -> List[Tuple[int, str, float]]:
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        Config.CACHE_DIR = workdir
+        for size in sizes:
+            # 旧实现每次 set 为 O(n)，超大规模时只跑少量操作
+            results.append((size, "legacy-scan", _bench_legacy(size, max(5, legacy_ops * 1000 // max(size, 1000)))))
+            for policy in available_policies():
+                results.append((size, f"{backend}-{policy}", _bench_manager(size, ops, backend, policy, workdir)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cache set throughput under eviction")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--ops", type=int, default=20000, help="Sets per case once the cache is full")
+    parser.add_argument("--legacy-ops", type=int, default=200, help="Sets for the legacy scan at 1k entries")
+    parser.add_argument("--backend", default="memory", help="Cache backend (memory/log/sqlite/json)")
+    args = parser.parse_args()
+
+    print(f"{'entries':>10}  {'implementation':<16}{'sets/s':>14}")
+    for size, name, rate in run_benchmark(args.sizes, args.ops, args.legacy_ops, args.backend):
+        print(f"{size:>10}  {name:<16}{rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark rowid-based corpus sampling against the legacy ORDER BY RANDOM() queries.
+
+Usage:
+    python -m scripts.benchmark_corpus_sampling --db data/names_corpus.db --iterations 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import time
+from typing import Callable, Dict, List, Tuple
+
+from src.data.corpus_loader import CorpusLoader
+
+
+def _legacy_queries(db_path: str) -> Dict[str, Callable[[], list]]:
+    conn = sqlite3.connect(db_path)
+
+    def run(sql: str, params: tuple) -> Callable[[], list]:
+        return lambda: conn.execute(sql, params).fetchall()
+
+    return {
+        "modern": run("SELECT name, gender FROM chinese_names ORDER BY RANDOM() LIMIT ?", (20,)),
+        "modern_male": run(
+            "SELECT name, gender FROM chinese_names WHERE gender = ? ORDER BY RANDOM() LIMIT ?", ("男", 20)
+        ),
+        "modern_female": run(
+            "SELECT name, gender FROM chinese_names WHERE gender = ? ORDER BY RANDOM() LIMIT ?", ("女", 20)
+        ),
+        "ancient": run("SELECT name FROM ancient_names ORDER BY RANDOM() LIMIT ?", (20,)),
+        "chengyu": run("SELECT idiom, category FROM idioms ORDER BY RANDOM() LIMIT ?", (20,)),
+        "chengyu_boy": run(
+            "SELECT idiom, category FROM idioms WHERE category = ? ORDER BY RANDOM() LIMIT ?", ("男孩", 20)
+        ),
+    }
+
+
+def _sampler_queries(loader: CorpusLoader) -> Dict[str, Callable[[], list]]:
+    return {
+        "modern": lambda: loader.get_random_names(count=20),
+        "modern_male": lambda: loader.get_random_names(count=20, gender="男"),
+        "modern_female": lambda: loader.get_random_names(count=20, gender="女"),
+        "ancient": lambda: loader.get_random_names(count=20, style="ancient"),
+        "chengyu": lambda: loader.get_chengyu_for_naming(count=20),
+        "chengyu_boy": lambda: loader.get_chengyu_for_naming(count=20, category="男孩"),
+    }
+
+
+def _time_ms(func: Callable[[], list], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def run_benchmark(db_path: str, iterations: int) -> List[Tuple[str, float, float]]:
+    loader = CorpusLoader(db_path)
+    legacy = _legacy_queries(db_path)
+    sampled = _sampler_queries(loader)
+
+    # 预热：加载 rowid 集合，单独统计一次性构建耗时
+    warmup_start = time.perf_counter()
+    for func in sampled.values():
+        func()
+    print(f"sampler warm-up (rowid load): {(time.perf_counter() - warmup_start) * 1000:.1f} ms")
+
+    results = []
+    for case in legacy:
+        results.append((case, _time_ms(legacy[case], iterations), _time_ms(sampled[case], iterations)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark corpus random sampling")
+    parser.add_argument("--db", default="data/names_corpus.db", help="names_corpus.db path")
+    parser.add_argument("--iterations", type=int, default=50, help="Iterations per case")
+    args = parser.parse_args()
+
+    print(f"{'case':<16}{'ORDER BY RANDOM() ms':>22}{'rowid sampler ms':>20}{'speedup':>10}")
+    for case, legacy_ms, sampler_ms in run_benchmark(args.db, args.iterations):
+        speedup = legacy_ms / sampler_ms if sampler_ms else float("inf")
+        print(f"{case:<16}{legacy_ms:>22.3f}{sampler_ms:>20.3f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
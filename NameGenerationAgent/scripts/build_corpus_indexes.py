@@ -0,0 +1,246 @@
+"""
+Inspect names_corpus.db, create missing covering indexes for CorpusLoader's hot queries,
+build the name_char_postings character -> rowid table used by search_names_by_char,
+run ANALYZE/VACUUM and report EXPLAIN QUERY PLAN for every loader query before and after.
+
+CorpusLoader opens the corpus with immutable=1, so restart the service after running this.
+
+Usage:
+    python -m scripts.build_corpus_indexes --db data/names_corpus.db
+    python -m scripts.build_corpus_indexes --db data/names_corpus.db --dry-run --check
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from src.data.corpus_loader import CHAR_POSTINGS_TABLE, _like_key
+
+# (index name, table, columns) —— 列顺序即索引键顺序，尾部列用于覆盖查询
+INDEX_SPECS: List[Tuple[str, str, Tuple[str, ...]]] = [
+    ("idx_chinese_names_name_gender", "chinese_names", ("name", "gender")),
+    ("idx_chinese_names_gender_name", "chinese_names", ("gender", "name")),
+    ("idx_ancient_names_name_dynasty", "ancient_names", ("name", "dynasty")),
+    ("idx_family_names_name_origin", "family_names", ("name", "origin", "frequency")),
+    ("idx_family_names_origin_frequency", "family_names", ("origin", "frequency", "name")),
+    ("idx_idioms_category_idiom", "idioms", ("category", "idiom")),
+    ("idx_english_names_gender", "english_names", ("gender", "chinese_name", "english_name")),
+]
+
+# (label, sql, params, full scan expected) —— 与 CorpusLoader 中的查询保持一致
+LOADER_QUERIES: List[Tuple[str, str, tuple, bool]] = [
+    ("load_names", "SELECT name, gender FROM chinese_names LIMIT ?", (100,), True),
+    ("load_ancient_names", "SELECT name FROM ancient_names LIMIT ?", (100,), True),
+    ("load_chengyu", "SELECT idiom FROM idioms LIMIT ?", (100,), True),
+    ("load_family_names",
+     "SELECT name, frequency, origin FROM family_names WHERE origin = ? ORDER BY frequency DESC LIMIT ?",
+     ("Chinese", 100), False),
+    ("load_english_names",
+     "SELECT chinese_name, english_name, gender FROM english_names WHERE gender = ? LIMIT ?", ("男性", 100), False),
+    ("sampler_load_chinese_names", "SELECT rowid, gender FROM chinese_names ORDER BY rowid", (), True),
+    ("sampler_load_ancient_names", "SELECT rowid FROM ancient_names ORDER BY rowid", (), True),
+    ("sampler_load_idioms", "SELECT rowid, category FROM idioms ORDER BY rowid", (), True),
+    ("fetch_rows_by_rowid",
+     "SELECT rowid AS _rowid, name, gender FROM chinese_names WHERE rowid IN (?,?,?)", (1, 2, 3), False),
+    ("search_names_by_char_like",
+     "SELECT name, gender FROM chinese_names WHERE name LIKE ? AND gender = ? ORDER BY rowid LIMIT ?",
+     ("%林%", "男", 5), True),
+    ("search_names_by_char_postings",
+     f"SELECT n.name, n.gender FROM {CHAR_POSTINGS_TABLE} p JOIN chinese_names n ON n.rowid = p.name_rowid "
+     "WHERE p.ch = ? ORDER BY p.name_rowid LIMIT ?", ("林", 5), False),
+    ("search_names_by_char_postings_gender",
+     f"SELECT n.name, n.gender FROM {CHAR_POSTINGS_TABLE} p JOIN chinese_names n ON n.rowid = p.name_rowid "
+     "WHERE p.ch = ? AND p.gender = ? ORDER BY p.name_rowid LIMIT ?", ("林", "男", 5), False),
+    ("search_names_by_substring_postings",
+     f"SELECT n.name, n.gender FROM {CHAR_POSTINGS_TABLE} p JOIN chinese_names n ON n.rowid = p.name_rowid "
+     "WHERE p.ch = ? AND n.name LIKE ? ORDER BY p.name_rowid LIMIT ?", ("扬", "%清扬%", 5), False),
+    ("get_stats_chinese_gender", "SELECT gender, COUNT(*) FROM chinese_names GROUP BY gender", (), True),
+    ("get_stats_english_gender", "SELECT gender, COUNT(*) FROM english_names GROUP BY gender", (), True),
+    ("exists_modern", "SELECT COUNT(*) FROM chinese_names WHERE name = ?", ("林清扬",), False),
+    ("exists_ancient", "SELECT COUNT(*) FROM ancient_names WHERE name = ?", ("李白",), False),
+    ("exists_in_dynasty",
+     "SELECT COUNT(*) FROM ancient_names WHERE name = ? AND dynasty = ?", ("李白", "唐"), False),
+    ("lookup_names_modern",
+     "SELECT DISTINCT name FROM chinese_names WHERE name IN (?,?,?)", ("林清扬", "李白", "苏轼"), False),
+    ("lookup_names_ancient",
+     "SELECT DISTINCT name, dynasty FROM ancient_names WHERE name IN (?,?,?)", ("林清扬", "李白", "苏轼"), False),
+    ("get_surname_frequency",
+     "SELECT frequency FROM family_names WHERE name = ? AND origin = ?", ("王", "Chinese"), False),
+    ("char_index_build", "SELECT name FROM chinese_names", (), True),
+    ("dynasty_char_index_build",
+     "SELECT name, dynasty FROM ancient_names WHERE dynasty IS NOT NULL", (), True),
+]
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(table)})")]
+
+
+def _index_columns(conn: sqlite3.Connection, table: str) -> Dict[str, List[str]]:
+    indexes = {}
+    for row in conn.execute(f"PRAGMA index_list({_quote(table)})").fetchall():
+        indexes[row[1]] = [info[2] for info in conn.execute(f"PRAGMA index_info({_quote(row[1])})")]
+    return indexes
+
+
+def find_missing_indexes(conn: sqlite3.Connection) -> List[Tuple[str, str, Tuple[str, ...]]]:
+    """返回表和列都存在、但尚无同前缀索引的索引定义"""
+    missing = []
+    for name, table, columns in INDEX_SPECS:
+        table_columns = _table_columns(conn, table)
+        if not table_columns or any(col not in table_columns for col in columns):
+            continue
+        existing = _index_columns(conn, table).values()
+        if any(tuple(cols[:len(columns)]) == columns for cols in existing):
+            continue
+        missing.append((name, table, columns))
+    return missing
+
+
+def _iter_postings(conn: sqlite3.Connection) -> Iterator[Tuple[str, int, str]]:
+    for rowid, name, gender in conn.execute("SELECT rowid, name, gender FROM chinese_names"):
+        for key in {_like_key(ch) for ch in (name or "")}:
+            yield key, rowid, gender
+
+
+def build_char_postings(conn: sqlite3.Connection, rebuild: bool = False) -> bool:
+    """
+    构建 字符 -> chinese_names.rowid 倒排表（表已存在且不要求重建时跳过）
+
+    Returns:
+        是否新建了倒排表
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (CHAR_POSTINGS_TABLE,)
+    ).fetchone()
+    if exists and not rebuild:
+        return False
+    if not _table_columns(conn, "chinese_names"):
+        return False
+
+    table = _quote(CHAR_POSTINGS_TABLE)
+    conn.execute("BEGIN")
+    try:
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(
+            f"CREATE TABLE {table} (ch TEXT NOT NULL, name_rowid INTEGER NOT NULL, gender TEXT, "
+            "PRIMARY KEY (ch, name_rowid)) WITHOUT ROWID"
+        )
+        conn.executemany(f"INSERT INTO {table} (ch, name_rowid, gender) VALUES (?, ?, ?)", _iter_postings(conn))
+        conn.execute(
+            f"CREATE INDEX {_quote('idx_' + CHAR_POSTINGS_TABLE + '_gender')} ON {table} (ch, gender, name_rowid)"
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return True
+
+
+def explain(conn: sqlite3.Connection, sql: str, params: Sequence) -> List[str]:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def is_full_scan(plan: List[str]) -> bool:
+    return any(detail.startswith("SCAN") for detail in plan)
+
+
+def explain_loader_queries(conn: sqlite3.Connection,
+                           queries: Sequence[Tuple[str, str, tuple, bool]] = None) -> Dict[str, Dict]:
+    """对 CorpusLoader 的每条查询执行 EXPLAIN QUERY PLAN（表或列不存在的查询会被跳过）"""
+    report = {}
+    for label, sql, params, scan_expected in queries or LOADER_QUERIES:
+        try:
+            plan = explain(conn, sql, params)
+        except sqlite3.OperationalError as e:
+            report[label] = {"plan": [f"skipped: {e}"], "full_scan": False, "scan_expected": scan_expected}
+            continue
+        report[label] = {"plan": plan, "full_scan": is_full_scan(plan), "scan_expected": scan_expected}
+    return report
+
+
+def build_indexes(db_path: str, dry_run: bool = False, vacuum: bool = True,
+                  postings: bool = True, rebuild_postings: bool = False) -> Dict:
+    """
+    为语料库创建缺失的覆盖索引与字符倒排表
+
+    Returns:
+        {'created': [索引名/表名], 'before': 查询计划, 'after': 查询计划}
+    """
+    if not Path(db_path).exists():
+        raise FileNotFoundError(f"Corpus database not found: {db_path}")
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        before = explain_loader_queries(conn)
+        missing = find_missing_indexes(conn)
+        created = []
+        if not dry_run:
+            for name, table, columns in missing:
+                column_sql = ", ".join(_quote(col) for col in columns)
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote(name)} ON {_quote(table)} ({column_sql})")
+                created.append(name)
+            if postings and build_char_postings(conn, rebuild=rebuild_postings):
+                created.append(CHAR_POSTINGS_TABLE)
+            conn.execute("ANALYZE")
+            if vacuum:
+                conn.execute("VACUUM")
+        after = explain_loader_queries(conn)
+        return {
+            "missing": [name for name, _, _ in missing],
+            "created": created,
+            "before": before,
+            "after": after,
+        }
+    finally:
+        conn.close()
+
+
+def unexpected_scans(report: Dict[str, Dict]) -> List[str]:
+    return [label for label, item in report.items() if item["full_scan"] and not item["scan_expected"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create covering indexes for names_corpus.db")
+    parser.add_argument("--db", default="data/names_corpus.db", help="names_corpus.db path")
+    parser.add_argument("--dry-run", action="store_true", help="Only report missing indexes and query plans")
+    parser.add_argument("--no-vacuum", action="store_true", help="Skip VACUUM after creating indexes")
+    parser.add_argument("--skip-postings", action="store_true", help="Do not build the character postings table")
+    parser.add_argument("--rebuild-postings", action="store_true", help="Rebuild the character postings table")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any indexed query still does a full scan")
+    args = parser.parse_args()
+
+    result = build_indexes(
+        args.db,
+        dry_run=args.dry_run,
+        vacuum=not args.no_vacuum,
+        postings=not args.skip_postings,
+        rebuild_postings=args.rebuild_postings,
+    )
+
+    print(f"missing indexes: {', '.join(result['missing']) or 'none'}")
+    print(f"created: {', '.join(result['created']) or 'none'}")
+    for label in result["before"]:
+        before = result["before"][label]
+        after = result["after"][label]
+        status = "expected scan" if after["scan_expected"] else ("FULL SCAN" if after["full_scan"] else "ok")
+        print(f"\n[{status}] {label}")
+        print(f"  before: {' | '.join(before['plan'])}")
+        print(f"  after:  {' | '.join(after['plan'])}")
+
+    remaining = unexpected_scans(result["after"])
+    if remaining:
+        print(f"\nqueries still doing full scans: {', '.join(remaining)}")
+        if args.check:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
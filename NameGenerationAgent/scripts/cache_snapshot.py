@@ -0,0 +1,52 @@
+"""
+Dump the generation cache to a compact binary snapshot, or load a snapshot back.
+
+Entries keep their original write time, so restored entries expire on the same schedule
+as before; entries already past CACHE_TTL + CACHE_MAX_STALE are skipped. Values are copied
+in their stored (encoded, compressed) form and the whole stream is zlib-compressed.
+
+Take a snapshot before redeploying and restore it on the new host (or let the service do it
+at startup with CACHE_WARMUP_ENABLED=true, which restores CACHE_SNAPSHOT_FILE if present).
+
+Usage:
+    python -m scripts.cache_snapshot snapshot
+    python -m scripts.cache_snapshot restore --file /backup/cache.snapshot --overwrite
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from config.settings import Config
+from src.utils.cache_manager import CacheManager
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["snapshot", "restore"])
+    parser.add_argument("--file", default=Config.CACHE_SNAPSHOT_FILE, help="snapshot file path")
+    parser.add_argument("--backend", default=None, help="cache backend (defaults to CACHE_BACKEND)")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="restore: replace entries that already exist in the cache")
+    args = parser.parse_args(argv)
+
+    cache = CacheManager(backend=args.backend)
+    started = time.perf_counter()
+    try:
+        if args.command == "snapshot":
+            result = cache.snapshot(args.file)
+        else:
+            result = cache.restore(args.file, overwrite=args.overwrite)
+    finally:
+        cache.close()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    print(f"{args.command} {args.file} ({cache.backend.name}): "
+          + ", ".join(f"{key}={value}" for key, value in result.items())
+          + f", elapsed={elapsed_ms:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
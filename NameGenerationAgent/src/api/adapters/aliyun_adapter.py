@@ -38,7 +38,7 @@ class AliyunAdapter(BaseAPIAdapter):
             return []
 
         try:
-            resp = requests.get(
+            resp = self.session.get(
                 self.MODEL_LIST_URL,
                 headers=self.config.get_headers(),
                 timeout=10,
@@ -125,7 +125,7 @@ class AliyunAdapter(BaseAPIAdapter):
         payload["model"] = model_name
 
         try:
-            resp = requests.post(
+            resp = self.session.post(
                 self.CHAT_COMPLETIONS_URL,
                 headers=self.config.get_headers(),
                 json=payload,
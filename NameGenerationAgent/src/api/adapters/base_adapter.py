@@ -5,9 +5,11 @@ API 适配器基类。
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List
 import re
+import threading
 
 import requests
 
+from ..http_session import create_http_session, get_session_stats, resolve_session_options
 from ...utils.logging_helper import get_logger
 
 logger = get_logger(__name__)
@@ -22,6 +24,26 @@ class BaseAPIAdapter(ABC):
         self.base_url = config.base_url
         self.api_key = config.api_key
         self.enabled = config.enabled
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """本适配器共用的 HTTP 会话（长连接池 + 传输层重试），首次使用时创建"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = create_http_session(**resolve_session_options(self.name, self.config))
+        return self._session
+
+    def get_http_stats(self) -> Dict[str, Any]:
+        """连接复用统计（尚未发出请求时全部为 0）"""
+        return get_session_stats(self._session)
+
+    def close(self):
+        """关闭连接池"""
+        if self._session is not None:
+            self._session.close()
 
     @abstractmethod
     def generate_names(self, prompt: str, **kwargs) -> Dict[str, Any]:
@@ -53,9 +75,9 @@ class BaseAPIAdapter(ABC):
         try:
             logger.info(f"发送请求到 {self.name}: {url}")
             if method.upper() == "GET":
-                response = requests.get(url, headers=headers, timeout=req_timeout)
+                response = self.session.get(url, headers=headers, timeout=req_timeout)
             else:
-                response = requests.post(url, headers=headers, json=data, timeout=req_timeout)
+                response = self.session.post(url, headers=headers, json=data, timeout=req_timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as exc:
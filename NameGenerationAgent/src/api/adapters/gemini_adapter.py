@@ -38,7 +38,7 @@ class GeminiAdapter(BaseAPIAdapter):
         # Gemini提供模型列表API
         try:
             url = f"{self.base_url}/v1beta/models?key={self.api_key}"
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
 
             if response.status_code != 200:
                 logger.warning(f"获取Gemini模型列表失败: {response.status_code}")
@@ -121,7 +121,7 @@ class GeminiAdapter(BaseAPIAdapter):
                 ],
                 'generationConfig': {
                     'temperature': self.temperature,
-                    'maxOutputTokens': self.max_tokens,
+                    'maxOutputTokens': kwargs.get('max_tokens', self.max_tokens),
                     'topP': 0.8,
                     'topK': 10
                 }
@@ -129,7 +129,7 @@ class GeminiAdapter(BaseAPIAdapter):
 
             # 发送请求
             logger.info(f"正在调用Gemini API (model={model})...")
-            response = requests.post(
+            response = self.session.post(
                 url,
                 headers=headers,
                 json=data,
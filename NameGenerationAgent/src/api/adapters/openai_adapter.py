@@ -40,7 +40,7 @@ class OpenAIAdapter(BaseAPIAdapter):
                 'Authorization': f'Bearer {self.api_key}'
             }
 
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/models",
                 headers=headers,
                 timeout=10
@@ -131,13 +131,13 @@ class OpenAIAdapter(BaseAPIAdapter):
                         'content': prompt
                     }
                 ],
-                'max_tokens': self.max_tokens,
+                'max_tokens': kwargs.get('max_tokens', self.max_tokens),
                 'temperature': self.temperature
             }
 
             # 发送请求
             logger.info(f"正在调用OpenAI API (model={model})...")
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/chat/completions",
                 headers=headers,
                 json=data,
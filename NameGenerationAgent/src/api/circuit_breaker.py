@@ -0,0 +1,175 @@
+"""
+按平台熔断
+连续失败达到阈值后熔断（open），冷却期内直接跳过该平台，不再为每个请求等待连接超时；
+冷却结束后进入半开（half_open），只放行一个探测请求：成功则恢复（closed），失败则重新熔断
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import Config
+from .adapters.base_adapter import APIException
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(APIException):
+    """平台处于熔断状态，本次调用被跳过"""
+
+
+class CircuitBreaker:
+    """单个平台的熔断器"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, cooldown_seconds: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            name: 平台名
+            failure_threshold: 连续失败多少次后熔断
+            cooldown_seconds: 熔断后多久放行探测请求；探测请求超过该时间未返回时允许再发一个
+            clock: 单调时钟（测试时可替换）
+        """
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown_seconds = max(0.0, float(cooldown_seconds))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._stats = {'times_opened': 0, 'rejected': 0, 'probes': 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def is_open(self) -> bool:
+        """冷却期内（不会放行任何请求）返回 True；不占用探测名额"""
+        with self._lock:
+            return self._state == OPEN and self._clock() < self._opened_at + self.cooldown_seconds
+
+    def allow_request(self) -> bool:
+        """是否放行本次调用；半开状态下只放行一个探测请求"""
+        with self._lock:
+            now = self._clock()
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if now < self._opened_at + self.cooldown_seconds:
+                    self._stats['rejected'] += 1
+                    return False
+                self._state = HALF_OPEN
+                self._probe_started = None
+            if self._probe_started is not None and now < self._probe_started + self.cooldown_seconds:
+                self._stats['rejected'] += 1
+                return False
+            self._probe_started = now
+            self._stats['probes'] += 1
+        logger.info(f"{self.name} 熔断冷却结束，发送探测请求")
+        return True
+
+    def release_probe(self):
+        """探测请求未真正发出（如被限流拒绝）时归还探测名额，下一个请求可立即探测"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probe_started is not None:
+                self._probe_started = None
+                self._stats['probes'] -= 1
+
+    def record_success(self):
+        with self._lock:
+            recovered = self._state != CLOSED
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_started = None
+        if recovered:
+            logger.info(f"{self.name} 探测成功，熔断恢复")
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            # 熔断前已发出的调用随后失败，不延长冷却期
+            if self._state == OPEN or (self._state == CLOSED and self._failures < self.failure_threshold):
+                return
+            reopened = self._state == HALF_OPEN
+            self._state = OPEN
+            self._opened_at = self._clock()
+            self._probe_started = None
+            self._stats['times_opened'] += 1
+        if reopened:
+            logger.warning(f"{self.name} 探测失败，继续熔断 {self.cooldown_seconds:g} 秒")
+        else:
+            logger.warning(f"{self.name} 连续失败 {self.failure_threshold} 次，熔断 {self.cooldown_seconds:g} 秒")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = 0.0
+            if self._state == OPEN:
+                retry_in = max(0.0, self._opened_at + self.cooldown_seconds - self._clock())
+            return {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'cooldown_seconds': self.cooldown_seconds,
+                'retry_in_seconds': round(retry_in, 1),
+                **self._stats,
+            }
+
+
+class CircuitBreakerRegistry:
+    """按平台名懒创建熔断器；关闭时所有调用都放行"""
+
+    def __init__(self, enabled: bool = True, failure_threshold: int = 5, cooldown_seconds: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.enabled = enabled
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(
+                    name, self.failure_threshold, self.cooldown_seconds, self._clock)
+            return breaker
+
+    def is_open(self, name: str) -> bool:
+        return self.enabled and self.get(name).is_open()
+
+    def allow_request(self, name: str) -> bool:
+        return not self.enabled or self.get(name).allow_request()
+
+    def release_probe(self, name: str):
+        if self.enabled:
+            self.get(name).release_probe()
+
+    def record_success(self, name: str):
+        if self.enabled:
+            self.get(name).record_success()
+
+    def record_failure(self, name: str):
+        if self.enabled:
+            self.get(name).record_failure()
+
+    def get_stats(self, name: str) -> Dict[str, Any]:
+        stats = self.get(name).get_stats()
+        stats['enabled'] = self.enabled
+        return stats
+
+
+def create_circuit_breakers() -> CircuitBreakerRegistry:
+    """按配置创建熔断器集合"""
+    return CircuitBreakerRegistry(
+        enabled=Config.CIRCUIT_BREAKER_ENABLED,
+        failure_threshold=Config.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        cooldown_seconds=Config.CIRCUIT_BREAKER_COOLDOWN,
+    )
@@ -0,0 +1,251 @@
+"""
+对冲请求
+先调用优先级最高的平台；若超过对冲延迟仍未返回，则并行调用下一个平台，采用最先返回的有效结果，
+其余调用的结果被丢弃（已发出的 HTTP 请求无法中止，会在其超时后结束）。
+对冲延迟取该平台近期成功调用耗时的 p95（样本足够时），否则取固定的 HEDGE_DELAY_MS，从调用实际开始时计时。
+首选调用与失败后的正常降级各自在独立线程中执行，不受对冲线程池大小限制；
+只有对冲调用使用有上限的线程池，线程池占满时跳过对冲而不是排队
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from config.settings import Config
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LatencyTracker:
+    """按平台记录最近若干次成功调用的耗时"""
+
+    def __init__(self, window: int = 100):
+        self.window = max(1, int(window))
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, latency_ms: float):
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self.window)).append(float(latency_ms))
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            return len(self._samples.get(name, ()))
+
+    def percentile(self, name: str, q: float = 0.95) -> Optional[float]:
+        """最近样本的分位数（毫秒），没有样本时返回 None"""
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            names = list(self._samples)
+        return {
+            name: {'samples': self.count(name), 'p50_ms': self.percentile(name, 0.5),
+                   'p95_ms': self.percentile(name)}
+            for name in names
+        }
+
+
+class HedgedRunner:
+    """对冲调用执行器"""
+
+    def __init__(self, enabled: bool = False, delay_ms: float = 8000, max_hedges: int = 1,
+                 use_p95: bool = True, min_samples: int = 20, workers: int = 8):
+        """
+        Args:
+            enabled: 是否启用对冲（关闭时由调用方按顺序逐个尝试）
+            delay_ms: 默认对冲延迟（毫秒）
+            max_hedges: 单次请求最多额外发起的对冲调用数（失败后的正常降级不计入）
+            use_p95: 样本足够时用该平台的 p95 耗时作为对冲延迟
+            min_samples: 使用 p95 所需的最少样本数
+            workers: 同时进行的对冲调用数上限（进程内共享）
+        """
+        self.enabled = enabled
+        self.delay_ms = max(0.0, float(delay_ms))
+        self.max_hedges = max(0, int(max_hedges))
+        self.use_p95 = use_p95
+        self.min_samples = max(1, int(min_samples))
+        self.workers = max(1, int(workers))
+        self.latency = LatencyTracker()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_slots = threading.BoundedSemaphore(self.workers)
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def hedge_delay(self, name: str) -> float:
+        """该平台的对冲延迟（秒）"""
+        if self.use_p95 and self.latency.count(name) >= self.min_samples:
+            return self.latency.percentile(name) / 1000
+        return self.delay_ms / 1000
+
+    @staticmethod
+    def _start_thread(func: Callable, *args) -> Future:
+        """在独立线程中执行调用（首选调用与正常降级）"""
+        future: Future = Future()
+
+        def runner():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=runner, name='hedge-primary', daemon=True).start()
+        return future
+
+    def _submit_hedge(self, func: Callable, *args) -> Optional[Future]:
+        """在对冲线程池中执行调用；没有空闲线程时返回 None（不排队）"""
+        if not self._hedge_slots.acquire(blocking=False):
+            return None
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='hedge')
+
+        def run_hedge():
+            try:
+                return func(*args)
+            finally:
+                self._hedge_slots.release()
+
+        try:
+            return self._executor.submit(run_hedge)
+        except Exception:
+            self._hedge_slots.release()
+            raise
+
+    def run(self, candidates: List[str], call: Callable[[str, int], Any],
+            is_valid: Callable[[Any], bool]) -> Tuple[Optional[str], Any, Optional[Exception]]:
+        """
+        按候选顺序调用，返回 (胜出的平台, 结果, 最后一个错误)
+
+        Args:
+            candidates: 按优先级排列的平台名
+            call: call(平台名, 在候选中的序号)，失败时抛出异常
+            is_valid: 判断结果是否可直接采用；都无效时返回最先得到的无效结果
+        """
+        self._count('requests')
+        pending: Dict[Future, Tuple[str, int]] = {}
+        started_at: Dict[int, float] = {}
+        next_index = 0
+        hedges = 0
+        hedging = True
+        fallback: Optional[Tuple[str, Any]] = None
+        last_error: Optional[Exception] = None
+
+        def timed_call(name: str, index: int):
+            started_at[index] = time.monotonic()
+            return call(name, index)
+
+        def launch(as_hedge: bool = False) -> bool:
+            nonlocal next_index
+            name = candidates[next_index]
+            if as_hedge:
+                future = self._submit_hedge(timed_call, name, next_index)
+                if future is None:
+                    return False
+            else:
+                future = self._start_thread(timed_call, name, next_index)
+            pending[future] = (name, next_index)
+            next_index += 1
+            return True
+
+        if candidates:
+            launch()
+        while pending:
+            timeout = None
+            if hedging and hedges < self.max_hedges and next_index < len(candidates):
+                last_name = candidates[next_index - 1]
+                # 对冲延迟从最近发起的调用实际开始时计时
+                began = started_at.get(next_index - 1)
+                timeout = self.hedge_delay(last_name)
+                if began is not None:
+                    timeout = max(0.0, began + timeout - time.monotonic())
+
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                waiting_on = candidates[next_index - 1]
+                if launch(as_hedge=True):
+                    hedges += 1
+                    self._count('hedges_launched')
+                    logger.info(f"{waiting_on} 超过对冲延迟未返回，并行调用 {candidates[next_index - 1]}")
+                else:
+                    hedging = False
+                    self._count('hedges_skipped')
+                    logger.info(f"对冲线程已占满，{waiting_on} 不再发起对冲")
+                continue
+
+            for future in done:
+                name, index = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    result = None
+                if result is not None and is_valid(result):
+                    self._record_winner(name, index, hedges, len(pending))
+                    return name, result, last_error
+                if result is not None and fallback is None:
+                    fallback = (name, result)
+                # 失败的调用由下一个平台接替（正常降级，不计入对冲数）
+                if next_index < len(candidates):
+                    launch()
+
+        self._count('no_valid_result')
+        if fallback is not None:
+            return fallback[0], fallback[1], last_error
+        return None, None, last_error
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _record_winner(self, name: str, index: int, hedges: int, abandoned: int):
+        with self._lock:
+            if hedges:
+                self._stats['hedged_requests'] += 1
+            self._stats['hedge_wins' if index > 0 else 'primary_wins'] += 1
+            self._stats['abandoned_calls'] += abandoned
+            self._wins[name] = self._wins.get(name, 0) + 1
+        if hedges:
+            logger.info(f"对冲请求由 {name} 胜出（已发起 {hedges} 个对冲调用）")
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {
+                'requests': 0, 'hedged_requests': 0, 'hedges_launched': 0, 'primary_wins': 0,
+                'hedge_wins': 0, 'abandoned_calls': 0, 'no_valid_result': 0, 'hedges_skipped': 0,
+            }
+            self._wins: Dict[str, int] = {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats['wins_by_provider'] = dict(self._wins)
+        stats.update({
+            'enabled': self.enabled,
+            'delay_ms': self.delay_ms,
+            'max_hedges': self.max_hedges,
+            'use_p95': self.use_p95,
+            'latency': self.latency.snapshot(),
+        })
+        return stats
+
+
+def create_hedged_runner() -> HedgedRunner:
+    """按配置创建对冲执行器"""
+    return HedgedRunner(
+        enabled=Config.HEDGE_ENABLED,
+        delay_ms=Config.HEDGE_DELAY_MS,
+        max_hedges=Config.HEDGE_MAX_HEDGES,
+        use_p95=Config.HEDGE_USE_P95,
+        min_samples=Config.HEDGE_P95_MIN_SAMPLES,
+        workers=Config.HEDGE_WORKERS,
+    )
@@ -0,0 +1,159 @@
+"""
+适配器共用的 HTTP 会话
+每个适配器持有一个 requests.Session，连接池保持长连接，生成请求与 list_models 复用同一批 TCP/TLS 连接；
+传输层用 urllib3 Retry 重试 429/5xx：生成请求（POST）只重试 429 和带 Retry-After 的 503——
+502/504 时上游可能已经执行并计费，读超时同理，均不重试；连接失败默认不重试，交给熔断器快速失败。
+池大小与重试参数可按平台用环境变量覆盖，如 ALIYUN_HTTP_POOL_MAXSIZE、PAIOU_HTTP_MAX_RETRIES
+"""
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from config.settings import Config
+
+# 可按平台覆盖的选项 -> (Config 默认值属性, 类型)
+_OPTIONS = {
+    'pool_connections': ('HTTP_POOL_CONNECTIONS', int),
+    'pool_maxsize': ('HTTP_POOL_MAXSIZE', int),
+    'max_retries': ('HTTP_MAX_RETRIES', int),
+    'connect_retries': ('HTTP_CONNECT_RETRIES', int),
+    'backoff_factor': ('HTTP_RETRY_BACKOFF', float),
+    'retry_statuses': ('HTTP_RETRY_STATUSES', str),
+}
+
+
+def resolve_session_options(provider: str, config: Any = None) -> Dict[str, Any]:
+    """
+    解析某个平台的连接池与重试参数
+
+    优先级：环境变量 <PROVIDER>_HTTP_<OPTION> > 平台配置对象上的 http_<option> 属性 > Config.HTTP_* 默认值
+    """
+    options = {}
+    for option, (default_attr, cast) in _OPTIONS.items():
+        env_value = os.environ.get(f"{provider.upper()}_HTTP_{option.upper()}")
+        value = env_value if env_value not in (None, '') else getattr(config, f"http_{option}", None)
+        if value is None:
+            value = getattr(Config, default_attr)
+        options[option] = cast(value)
+    return options
+
+
+def _counting_pool(base, stats: '_Stats'):
+    """记录新建连接数与请求次数（含重试）的连接池类"""
+
+    class CountingPool(base):
+        def _new_conn(self):
+            stats.add('connections_opened')
+            return super()._new_conn()
+
+        def urlopen(self, *args, **kwargs):
+            stats.add('attempts')
+            return super().urlopen(*args, **kwargs)
+
+    CountingPool.__name__ = f"Counting{base.__name__}"
+    return CountingPool
+
+
+class _Stats:
+    """线程安全计数"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.values = {'requests': 0, 'attempts': 0, 'connections_opened': 0, 'errors': 0}
+
+    def add(self, name: str, amount: int = 1):
+        with self._lock:
+            self.values[name] += amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.values)
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """统计连接复用情况的 HTTPAdapter"""
+
+    def __init__(self, *args, **kwargs):
+        self.stats = _Stats()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool(HTTPConnectionPool, self.stats),
+            'https': _counting_pool(HTTPSConnectionPool, self.stats),
+        }
+
+    def send(self, request, **kwargs):
+        self.stats.add('requests')
+        try:
+            return super().send(request, **kwargs)
+        except requests.exceptions.RequestException:
+            self.stats.add('errors')
+            raise
+
+
+class ProviderRetry(Retry):
+    """
+    按方法区分可重试状态码的 Retry
+
+    GET 按 status_forcelist 重试；POST 生成请求只在确定未被处理时重试：429，或带 Retry-After 的 503。
+    502/504 可能在上游已经生成并计费后才返回，重试会重复计费
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method and method.upper() == 'POST' and not (
+                status_code == 429 or (status_code == 503 and has_retry_after)):
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def create_http_session(pool_connections: int = 4, pool_maxsize: int = 16, max_retries: int = 2,
+                        backoff_factor: float = 0.5, retry_statuses: str = '429,502,503,504',
+                        connect_retries: int = 0) -> requests.Session:
+    """
+    创建带连接池与传输层重试的会话
+
+    Args:
+        pool_connections: 缓存的连接池数量（按主机）
+        pool_maxsize: 每个主机保持的连接数上限（应不小于并发请求数）
+        max_retries: retry_statuses 中状态码的重试次数（POST 另有限制，见 ProviderRetry），0 表示不重试
+        backoff_factor: 重试退避系数（秒），遵循响应中的 Retry-After
+        retry_statuses: GET 需要重试的状态码，逗号分隔
+        connect_retries: 连接失败的重试次数，默认 0：平台不可达时尽快失败，由熔断器跳过
+    """
+    statuses = [int(code) for code in str(retry_statuses).split(',') if code.strip()]
+    retry = ProviderRetry(
+        total=max_retries,
+        connect=min(connect_retries, max_retries),
+        read=0,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=statuses,
+        allowed_methods=frozenset({'GET', 'POST'}),
+        raise_on_status=False,
+    )
+    adapter = PooledHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session_stats(session: Optional[requests.Session]) -> Dict[str, Any]:
+    """会话的连接复用统计：请求数、实际尝试次数（含重试）、新建连接数、复用次数"""
+    stats = _Stats().snapshot()
+    adapters = session.adapters.values() if session is not None else ()
+    # http:// 与 https:// 挂载的是同一个 adapter
+    for adapter in {id(a): a for a in adapters if isinstance(a, PooledHTTPAdapter)}.values():
+        for name, value in adapter.stats.snapshot().items():
+            stats[name] += value
+    stats['retries'] = max(0, stats['attempts'] - stats['requests'])
+    stats['reused'] = max(0, stats['attempts'] - stats['connections_opened'])
+    stats['reuse_rate'] = round(stats['reused'] / stats['attempts'], 4) if stats['attempts'] else 0.0
+    return stats
@@ -0,0 +1,214 @@
+"""
+按平台限流
+每个平台一个限流器：并发数上限（信号量）+ 每分钟请求数、每分钟 token 数两个令牌桶，参数来自 APIConfig 的
+max_in_flight / requests_per_minute / tokens_per_minute（0 表示不限制）。
+额度用完时最多排队 RATE_LIMIT_MAX_WAIT 秒；预计等待更久时立即抛出 RateLimitExceeded，由调用方换下一个平台，
+避免把突发流量打到上游换来 429
+"""
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from config.settings import Config
+from .adapters.base_adapter import APIException
+
+# 生成一个姓名（含寓意）大约消耗的输出 token，用于调用前预估
+TOKENS_PER_NAME = 80
+
+
+class RateLimitExceeded(APIException):
+    """平台额度已用完，且在允许的排队时间内无法恢复"""
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中日韩字符每个算 1 个，其余字符每 4 个算 1 个"""
+    cjk = sum(1 for ch in text if '\u2e80' <= ch <= '\u9fff' or '\uf900' <= ch <= '\ufaff')
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def estimate_request_tokens(prompt: str, count: int, max_tokens: Optional[int] = None) -> int:
+    """调用前预估本次请求的 token 数：提示词 + 预计输出（不超过 max_tokens）"""
+    output = TOKENS_PER_NAME * max(1, int(count))
+    if max_tokens:
+        output = min(output, int(max_tokens))
+    return estimate_tokens(prompt) + output
+
+
+def estimate_result_tokens(prompt: str, result: Dict[str, Any]) -> int:
+    """调用后按返回的姓名估算实际 token 数（上游未返回 usage）"""
+    output = json.dumps(result.get('names') or [], ensure_ascii=False)
+    return estimate_tokens(prompt) + estimate_tokens(output)
+
+
+class TokenBucket:
+    """容量为一分钟额度的令牌桶"""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """取出 amount 个令牌还需等待的秒数（超过容量的按容量计）"""
+        self._refill()
+        missing = min(amount, self.capacity) - self._tokens
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float):
+        """取出令牌；amount 为负数时归还（对调用后的实际用量做校正），余额允许为负"""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens - min(amount, self.capacity))
+
+
+class ProviderLimiter:
+    """单个平台的并发与速率限制"""
+
+    def __init__(self, name: str, max_in_flight: int = 0, requests_per_minute: float = 0,
+                 tokens_per_minute: float = 0, max_wait: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            name: 平台名
+            max_in_flight: 同时进行的调用数上限
+            requests_per_minute: 每分钟请求数
+            tokens_per_minute: 每分钟 token 数（输入 + 输出的估算值）
+            max_wait: 默认最长排队时间（秒）
+            clock: 单调时钟（测试时可替换）
+        """
+        self.name = name
+        self.max_in_flight = max(0, int(max_in_flight or 0))
+        self.max_wait = max(0.0, float(max_wait))
+        self._clock = clock
+        self._requests = TokenBucket(requests_per_minute, clock) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute, clock) if tokens_per_minute else None
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._waits: Deque[float] = deque(maxlen=200)
+        self.reset_stats()
+
+    @property
+    def in_flight(self) -> int:
+        with self._cond:
+            return self._in_flight
+
+    def _rate_wait(self, tokens: int) -> float:
+        waits = [0.0]
+        if self._requests is not None:
+            waits.append(self._requests.wait_time(1))
+        if self._tokens is not None:
+            waits.append(self._tokens.wait_time(tokens))
+        return max(waits)
+
+    def acquire(self, tokens: int = 0, max_wait: Optional[float] = None) -> float:
+        """
+        占用一个调用名额并扣除额度，返回排队耗时（秒）
+
+        额度不足时等待；预计等待超过 max_wait 时立即抛出 RateLimitExceeded，不做无谓的等待
+        """
+        max_wait = self.max_wait if max_wait is None else max(0.0, float(max_wait))
+        started = self._clock()
+        deadline = started + max_wait
+        queued = False
+        with self._cond:
+            while True:
+                now = self._clock()
+                slot_free = not self.max_in_flight or self._in_flight < self.max_in_flight
+                rate_wait = self._rate_wait(tokens)
+                if slot_free and rate_wait <= 0:
+                    break
+                if now + rate_wait > deadline or (not slot_free and now >= deadline):
+                    self._stats['rejected'] += 1
+                    reason = '并发数已满' if not slot_free else f'速率额度不足（需等待 {rate_wait:.1f} 秒）'
+                    raise RateLimitExceeded(f"{self.name} {reason}，换用其他平台")
+                queued = True
+                self._cond.wait(rate_wait if slot_free else deadline - now)
+            self._in_flight += 1
+            if self._requests is not None:
+                self._requests.take(1)
+            if self._tokens is not None:
+                self._tokens.take(tokens)
+            waited = max(0.0, self._clock() - started) if queued else 0.0
+            self._stats['acquired'] += 1
+            if queued:
+                self._stats['queued'] += 1
+                self._stats['total_wait_ms'] += waited * 1000
+                self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], waited * 1000)
+            self._waits.append(waited * 1000)
+        return waited
+
+    def release(self, estimated_tokens: int = 0, actual_tokens: Optional[int] = None):
+        """释放调用名额；提供实际 token 用量时按差额校正令牌桶"""
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            if self._tokens is not None and actual_tokens is not None:
+                self._tokens.take(actual_tokens - estimated_tokens)
+            self._cond.notify_all()
+
+    def reset_stats(self):
+        with self._cond:
+            self._stats = {'acquired': 0, 'queued': 0, 'rejected': 0, 'total_wait_ms': 0.0, 'max_wait_ms': 0.0}
+            self._waits.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats: Dict[str, Any] = dict(self._stats)
+            waits = sorted(self._waits)
+            stats['in_flight'] = self._in_flight
+        stats['avg_wait_ms'] = round(stats['total_wait_ms'] / stats['acquired'], 1) if stats['acquired'] else 0.0
+        stats['p95_wait_ms'] = round(waits[min(len(waits) - 1, int(0.95 * len(waits)))], 1) if waits else 0.0
+        stats['total_wait_ms'] = round(stats['total_wait_ms'], 1)
+        stats['max_wait_ms'] = round(stats['max_wait_ms'], 1)
+        stats.update({
+            'max_in_flight': self.max_in_flight,
+            'requests_per_minute': self._requests.capacity if self._requests else 0,
+            'tokens_per_minute': self._tokens.capacity if self._tokens else 0,
+        })
+        return stats
+
+
+class RateLimiterRegistry:
+    """按平台懒创建限流器，参数取自适配器的配置对象"""
+
+    def __init__(self, enabled: bool = True, max_wait: float = 2.0, clock: Callable[[], float] = time.monotonic):
+        self.enabled = enabled
+        self.max_wait = max_wait
+        self._clock = clock
+        self._limiters: Dict[str, ProviderLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, config: Any = None) -> Optional[ProviderLimiter]:
+        """未启用限流时返回 None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            limiter = self._limiters.get(name)
+            if limiter is None:
+                limiter = self._limiters[name] = ProviderLimiter(
+                    name,
+                    max_in_flight=getattr(config, 'max_in_flight', 0),
+                    requests_per_minute=getattr(config, 'requests_per_minute', 0),
+                    tokens_per_minute=getattr(config, 'tokens_per_minute', 0),
+                    max_wait=self.max_wait,
+                    clock=self._clock,
+                )
+            return limiter
+
+    def reset_stats(self):
+        with self._lock:
+            limiters = list(self._limiters.values())
+        for limiter in limiters:
+            limiter.reset_stats()
+
+
+def create_rate_limiters() -> RateLimiterRegistry:
+    """按配置创建限流器集合"""
+    return RateLimiterRegistry(enabled=Config.RATE_LIMIT_ENABLED, max_wait=Config.RATE_LIMIT_MAX_WAIT)
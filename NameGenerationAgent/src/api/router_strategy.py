@@ -1,5 +1,9 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+import json
+import math
+import os
 import threading
+import time
 from .adapters.base_adapter import BaseAPIAdapter
 
 class RouterStrategy:
@@ -124,6 +128,147 @@ class CapabilityRouterStrategy(RouterStrategy):
             return [preferred_api] + [a for a in ordered if a != preferred_api]
         return ordered
 
+def route_model(adapter: Any, requested_model: Optional[str] = None) -> str:
+    # 统计的模型维度：转发了请求中的模型时取该模型，否则取平台默认模型；不按上游返回的降级模型记账，
+    # 记录与排序都用这个函数，保证写入的键就是排序时读取的键
+    return str(requested_model or getattr(getattr(adapter, 'config', None), 'model', '') or '')
+
+class _EwmaStats:
+    def __init__(self, latency_ms: float, samples: int = 0, error_rate: float = 0.0, parse_rate: float = 1.0, updated_at: float = 0.0):
+        self.latency_ms = float(latency_ms)
+        self.samples = int(samples)
+        self.error_rate = float(error_rate)
+        self.parse_rate = float(parse_rate)
+        self.updated_at = float(updated_at)
+    def update(self, alpha: float, latency_ms: float, success: bool, parsed: bool) -> None:
+        # 首个样本直接取值，之后按 EWMA 平滑；解析成功率只统计调用成功的样本
+        a = 1.0 if self.samples == 0 else alpha
+        self.latency_ms += a * (float(latency_ms) - self.latency_ms)
+        self.error_rate += a * ((0.0 if success else 1.0) - self.error_rate)
+        if success:
+            self.parse_rate += a * ((1.0 if parsed else 0.0) - self.parse_rate)
+        self.samples += 1
+        self.updated_at = time.time()
+    def valid_rate(self) -> float:
+        return (1.0 - self.error_rate) * self.parse_rate
+    def to_dict(self) -> Dict[str, Any]:
+        return {'samples': self.samples, 'latency_ms': round(self.latency_ms, 1), 'error_rate': round(self.error_rate, 4),
+                'parse_rate': round(self.parse_rate, 4), 'valid_rate': round(self.valid_rate(), 4), 'updated_at': self.updated_at}
+
+class AdaptiveRouterStrategy(RouterStrategy):
+    # 按 (平台, 模型) 维护耗时、错误率、解析成功率的 EWMA，每次调用按“得到有效结果的期望耗时”排序：
+    # 期望耗时 = (平均耗时 + 无效概率 × 先验耗时) / 有效结果概率：每次无效结果都要再等一次耗时并换平台重试，
+    # 先验耗时近似换平台的代价，避免“秒失败”的平台因耗时低排到前面；再减去 UCB 探索项，让样本少的平台也有机会被选中
+    MIN_VALID_RATE = 0.02
+    def __init__(self, default_order: Optional[List[str]] = None, weights: Optional[Dict[str, float]] = None,
+                 alpha: float = 0.2, exploration: float = 0.3, prior_latency_ms: float = 5000.0,
+                 stats_file: Optional[str] = None, save_every: int = 20):
+        super().__init__(default_order, weights)
+        self.alpha = min(1.0, max(0.01, float(alpha)))
+        self.exploration = max(0.0, float(exploration))
+        self.prior_latency_ms = max(1.0, float(prior_latency_ms))
+        self.stats_file = stats_file or None
+        self.save_every = max(0, int(save_every))
+        self._stats: Dict[Tuple[str, str], _EwmaStats] = {}
+        self._total = 0
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        if self.stats_file and os.path.exists(self.stats_file):
+            self.load(self.stats_file)
+    def _prior(self, api: str) -> _EwmaStats:
+        # 未见过的平台按 ROUTER_WEIGHTS 缩放先验耗时，权重越高越靠前
+        weight = self.weights.get(api)
+        latency = self.prior_latency_ms / weight if weight and weight > 0 else self.prior_latency_ms
+        return _EwmaStats(latency)
+    @staticmethod
+    def _model_of(adapters: Dict[str, BaseAPIAdapter], api: str, preferred_api: Optional[str], context: Optional[Dict[str, Any]]) -> str:
+        # 请求中的模型只转发给指定平台；未指定平台时转发给排在第一的平台，因此按每个平台都可能收到该模型来评估
+        requested = (context or {}).get('model')
+        if preferred_api and api != preferred_api:
+            requested = None
+        return route_model(adapters.get(api), requested)
+    def record(self, api: str, model: Optional[str], latency_ms: float, success: bool, parsed: bool = True) -> None:
+        with self._lock:
+            key = (api, model or '')
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _EwmaStats(self._prior(api).latency_ms)
+            stats.update(self.alpha, latency_ms, success, parsed)
+            self._total += 1
+            self._unsaved += 1
+            due = bool(self.stats_file and self.save_every and self._unsaved >= self.save_every)
+        if due:
+            self.save()
+    def expected_cost_ms(self, api: str, model: str = '') -> float:
+        with self._lock:
+            stats = self._stats.get((api, model)) or self._prior(api)
+            total = self._total
+        valid_rate = stats.valid_rate()
+        cost = (stats.latency_ms + (1.0 - valid_rate) * self.prior_latency_ms) / max(self.MIN_VALID_RATE, valid_rate)
+        bonus = self.exploration * math.sqrt(math.log(total + 1) / (stats.samples + 1))
+        return cost * max(0.05, 1.0 - bonus)
+    def get_priority(self, adapters: Dict[str, BaseAPIAdapter], preferred_api: Optional[str] = None, context: Optional[Dict[str, Any]] = None) -> List[str]:
+        available = list(adapters.keys())
+        if not available:
+            return []
+        default_index = {api: i for i, api in enumerate(self.default_order)}
+        costs = {api: self.expected_cost_ms(api, self._model_of(adapters, api, preferred_api, context)) for api in available}
+        ordered = sorted(available, key=lambda a: (costs[a], default_index.get(a, len(self.default_order)), a))
+        if preferred_api and preferred_api in ordered:
+            return [preferred_api] + [a for a in ordered if a != preferred_api]
+        return ordered
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'version': 1, 'total': self._total,
+                    'stats': [dict(provider=api, model=model, **stats.to_dict()) for (api, model), stats in sorted(self._stats.items())]}
+    def seed(self, data: Dict[str, Any], overwrite: bool = False) -> int:
+        # data 为 snapshot() 的格式；默认不覆盖已有样本，可用于按历史数据预置
+        loaded = 0
+        with self._lock:
+            for item in data.get('stats', []) if isinstance(data, dict) else []:
+                try:
+                    key = (str(item['provider']), str(item.get('model') or ''))
+                    stats = _EwmaStats(item['latency_ms'], item.get('samples', 1), item.get('error_rate', 0.0),
+                                       item.get('parse_rate', 1.0), item.get('updated_at', 0.0))
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if key in self._stats and not overwrite:
+                    continue
+                self._stats[key] = stats
+                loaded += 1
+            self._total = max(self._total, sum(s.samples for s in self._stats.values()))
+        return loaded
+    def load(self, path: str) -> int:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return self.seed(json.load(f))
+        except (OSError, ValueError):
+            return 0
+    def save(self, path: Optional[str] = None) -> bool:
+        path = path or self.stats_file
+        if not path:
+            return False
+        data = self.snapshot()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except OSError:
+            return False
+        with self._lock:
+            self._unsaved = 0
+        return True
+    def get_stats(self) -> Dict[str, Any]:
+        data = self.snapshot()
+        for item in data['stats']:
+            item['expected_cost_ms'] = round(self.expected_cost_ms(item['provider'], item['model']), 1)
+        data.update({'strategy': 'adaptive', 'alpha': self.alpha, 'exploration': self.exploration, 'stats_file': self.stats_file})
+        return data
+
 def _parse_weights(s: Optional[str]) -> Dict[str, float]:
     if not s:
         return {}
@@ -143,9 +288,11 @@ def _parse_weights(s: Optional[str]) -> Dict[str, float]:
             continue
     return result
 
-def get_router_strategy(name: str, default_order: Optional[List[str]] = None, weights_raw: Optional[str] = None) -> RouterStrategy:
+def get_router_strategy(name: str, default_order: Optional[List[str]] = None, weights_raw: Optional[str] = None, **options: Any) -> RouterStrategy:
     weights = _parse_weights(weights_raw)
     n = (name or 'priority').strip().lower()
+    if n == 'adaptive':
+        return AdaptiveRouterStrategy(default_order, weights, **options)
     if n == 'weighted':
         return WeightedRouterStrategy(default_order, weights)
     if n == 'roundrobin' or n == 'round_robin':
@@ -2,13 +2,26 @@
 统一API客户端
 """
 
+import atexit
 import random
 import time
 import traceback
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from ..utils.background_refresh import BackgroundRefresher
+from ..utils.cache_codec import strip_debug_fields
+from ..utils.cache_keys import semantic_cache_key
+from ..utils.single_flight import SingleFlight
 from .adapters.base_adapter import APIException, BaseAPIAdapter
-from .router_strategy import get_router_strategy
+from .circuit_breaker import CircuitOpenError, create_circuit_breakers
+from .rate_limiter import (
+    RateLimitExceeded,
+    create_rate_limiters,
+    estimate_request_tokens,
+    estimate_result_tokens,
+)
+from .hedging import create_hedged_runner
+from .router_strategy import get_router_strategy, route_model
 
 
 # 延迟导入，避免循环导入问题
@@ -59,6 +72,12 @@ def get_settings():
     try:
         from ...config.settings import Config as _Config
 
+        return _Config
+    except ImportError:
+        pass
+    try:
+        from config.settings import Config as _Config
+
         return _Config
     except ImportError:
 
@@ -72,7 +91,10 @@ def get_settings():
 def get_cache_manager():
     """获取缓存管理器"""
     try:
-        from ...utils.cache_manager import CacheManager
+        try:
+            from ...utils.cache_manager import CacheManager
+        except ImportError:
+            from ..utils.cache_manager import CacheManager
 
         return CacheManager()
     except ImportError:
@@ -91,9 +113,14 @@ def get_cache_manager():
                     self.misses += 1
                     return None
 
-            def set(self, key, value):
+            def set(self, key, value, latency_ms=None):
                 self.cache[key] = value
 
+            def reset_stats(self):
+                """清零命中统计"""
+                self.hits = 0
+                self.misses = 0
+
             def get_stats(self):
                 """获取缓存统计信息"""
                 total_requests = self.hits + self.misses
@@ -127,6 +154,20 @@ class UnifiedAPIClient:
     def __init__(self):
         self.adapters = {}
         self.cache_manager = get_cache_manager()
+        # 相同的进行中请求只调用一次上游
+        self.single_flight = SingleFlight(
+            getattr(get_settings(), "SINGLE_FLIGHT_MAX_WAIT", 30.0)
+        )
+        # 返回过期缓存后在后台重新生成
+        self.refresher = BackgroundRefresher(
+            getattr(get_settings(), "CACHE_REFRESH_WORKERS", 2)
+        )
+        # 对冲：慢平台超过延迟后并行调用下一个平台
+        self.hedger = create_hedged_runner()
+        # 熔断：连续失败的平台在冷却期内直接跳过
+        self.breakers = create_circuit_breakers()
+        # 限流：按平台限制并发数与每分钟请求/token 数
+        self.limiters = create_rate_limiters()
         self._initialize_adapters()
         self._initialize_router()
 
@@ -170,13 +211,31 @@ class UnifiedAPIClient:
         ]
         try:
             self.router_strategy = get_router_strategy(
-                strategy_name, default_order, weights_raw
+                strategy_name,
+                default_order,
+                weights_raw,
+                **self._router_options(settings, strategy_name),
             )
             logger.info(f"路由策略已启用: {strategy_name}")
+            # 自适应策略的统计在退出时落盘，重启后继续使用
+            if getattr(self.router_strategy, "stats_file", None):
+                atexit.register(self.router_strategy.save)
         except Exception as e:
             self.router_strategy = get_router_strategy("priority", default_order, "")
             logger.warning(f"路由策略初始化失败，使用默认策略: {str(e)}")
 
+    @staticmethod
+    def _router_options(settings: Any, strategy_name: str) -> Dict[str, Any]:
+        if str(strategy_name).strip().lower() != "adaptive":
+            return {}
+        return {
+            "alpha": getattr(settings, "ROUTER_ADAPTIVE_ALPHA", 0.2),
+            "exploration": getattr(settings, "ROUTER_ADAPTIVE_EXPLORATION", 0.3),
+            "prior_latency_ms": getattr(settings, "ROUTER_ADAPTIVE_PRIOR_LATENCY_MS", 5000),
+            "stats_file": getattr(settings, "ROUTER_STATS_FILE", None),
+            "save_every": getattr(settings, "ROUTER_STATS_SAVE_EVERY", 20),
+        }
+
     def generate_names(
         self,
         prompt: str,
@@ -184,60 +243,110 @@ class UnifiedAPIClient:
         preferred_api: Optional[str] = None,
         use_cache: bool = True,
         use_mock_on_failure: bool = True,
+        cache_signature: Optional[Dict[str, Any]] = None,
         **kwargs,
     ) -> Dict[str, Any]:
-        """生成姓名"""
+        """
+        生成姓名
+
+        cache_signature 为规范化的请求参数（见 utils.cache_keys），提供时按其计算缓存键，
+        否则按提示词计算（提示词含随机示例时几乎不会命中）。
+        返回结果中的 stale 表示是否为过期缓存（此时已在后台刷新）
+        """
 
         # 检查缓存
+        cache_key = self._resolve_cache_key(prompt, count, kwargs, cache_signature)
         if use_cache:
-            cache_key = self._generate_cache_key(prompt, count, kwargs)
-            cached_result = self.cache_manager.get(cache_key)
+            cached_result, stale = self._get_cached(
+                cache_key, prompt, count, kwargs, cache_signature
+            )
             if cached_result:
-                logger.info("从缓存中获取结果")
-                return cached_result
-
-        # 获取API优先级列表
-        api_priority = self._get_api_priority(preferred_api, kwargs)
-
-        # 尝试调用API
-        last_error = None
-        for index, api_name in enumerate(api_priority):
-            if api_name not in self.adapters:
-                continue
-
-            try:
-                logger.info(f"尝试使用 {api_name} API生成姓名")
-                adapter_kwargs = self._build_adapter_kwargs(
-                    api_name=api_name,
-                    preferred_api=preferred_api,
-                    attempt_index=index,
-                    kwargs=kwargs,
-                )
-                result = self.adapters[api_name].generate_names(
-                    prompt, **adapter_kwargs
-                )
+                if stale:
+                    logger.info("缓存结果已过期，先返回旧结果并在后台刷新")
+                    self._schedule_refresh(cache_key, prompt, count, preferred_api, kwargs)
+                else:
+                    logger.info("从缓存中获取结果")
+                return dict(cached_result, stale=stale)
+
+        # 并发的相同请求合并为一次上游调用
+        flight_key = (cache_key, preferred_api, use_cache, use_mock_on_failure)
+        result, shared = self.single_flight.do(
+            flight_key,
+            lambda: self._generate_uncached(
+                prompt, count, preferred_api, use_cache, use_mock_on_failure, cache_key, kwargs
+            ),
+        )
+        if shared:
+            logger.info("与进行中的相同请求合并，共享其结果")
+        result.setdefault("stale", False)
+        return result
 
-                # 限制返回的姓名数量
-                if "names" in result and len(result["names"]) > count:
-                    result["names"] = result["names"][:count]
+    def _schedule_refresh(
+        self,
+        cache_key: str,
+        prompt: str,
+        count: int,
+        preferred_api: Optional[str],
+        kwargs: Dict[str, Any],
+    ):
+        """后台重新生成并写回缓存（失败时不写入模拟数据，保留旧结果）"""
+        flight_key = (cache_key, preferred_api, True, False)
+        self.refresher.submit(
+            cache_key,
+            lambda: self.single_flight.do(
+                flight_key,
+                lambda: self._generate_uncached(
+                    prompt, count, preferred_api, True, False, cache_key, kwargs
+                ),
+            ),
+        )
 
-                # 缓存结果
-                if use_cache:
-                    self.cache_manager.set(cache_key, result)
+    def _generate_uncached(
+        self,
+        prompt: str,
+        count: int,
+        preferred_api: Optional[str],
+        use_cache: bool,
+        use_mock_on_failure: bool,
+        cache_key: str,
+        kwargs: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """按优先级调用上游API（启用对冲时并行调用慢平台之后的平台），全部失败时按需返回模拟数据"""
+        # 获取API优先级列表（跳过冷却期内的熔断平台）
+        ranked = [
+            api_name
+            for api_name in self._get_api_priority(preferred_api, kwargs)
+            if api_name in self.adapters
+        ]
+        # 请求中的模型只转发给指定的平台（未指定时为排名第一的平台），与熔断后的实际调用顺序无关
+        model_api = preferred_api or (ranked[0] if ranked else None)
+        api_priority = ranked
+        open_circuits = [a for a in api_priority if self.breakers.is_open(a)]
+        if open_circuits:
+            logger.info(f"跳过熔断中的平台: {', '.join(open_circuits)}")
+            api_priority = [a for a in api_priority if a not in open_circuits]
+            last_error = CircuitOpenError(f"平台熔断中: {', '.join(open_circuits)}")
+        else:
+            last_error = None
 
-                logger.info(
-                    f"成功使用 {api_name} API生成 {len(result.get('names', []))} 个姓名"
-                )
-                return result
+        def call(api_name: str, index: int) -> Tuple[Dict[str, Any], float]:
+            return self._call_adapter(api_name, prompt, count, model_api, kwargs)
 
-            except APIException as e:
-                logger.warning(f"{api_name} API调用失败: {str(e)}")
-                last_error = e
-                continue
-            except Exception as e:
-                logger.error(f"{api_name} API调用出现未知错误: {str(e)}")
-                last_error = e
-                continue
+        if self.hedger.enabled and len(api_priority) > 1:
+            api_name, outcome, error = self.hedger.run(
+                api_priority, call, lambda outcome: bool(outcome[0].get("names"))
+            )
+            last_error = error or last_error
+            if outcome is not None:
+                return self._accept_result(api_name, *outcome, use_cache, cache_key)
+        else:
+            for index, api_name in enumerate(api_priority):
+                try:
+                    outcome = call(api_name, index)
+                except Exception as e:
+                    last_error = e
+                    continue
+                return self._accept_result(api_name, *outcome, use_cache, cache_key)
 
         # 所有API都失败
         if use_mock_on_failure:
@@ -246,7 +355,7 @@ class UnifiedAPIClient:
 
             # 缓存模拟结果
             if use_cache:
-                self.cache_manager.set(cache_key, mock_result)
+                self.cache_manager.set(cache_key, self._cacheable(mock_result))
 
             return mock_result
         else:
@@ -265,22 +374,132 @@ class UnifiedAPIClient:
                 "api_name": "none",
             }
 
+    def _call_adapter(
+        self,
+        api_name: str,
+        prompt: str,
+        count: int,
+        model_api: Optional[str],
+        kwargs: Dict[str, Any],
+    ) -> Tuple[Dict[str, Any], float]:
+        """调用单个平台，返回 (结果, 耗时毫秒)；失败时记录日志并抛出异常"""
+        adapter = self.adapters[api_name]
+        config = getattr(adapter, "config", None)
+        # 先检查熔断再占用限流额度：熔断跳过的调用不消耗请求数与并发名额
+        # 半开状态下只有一个请求能作为探测放行，其余立即降级到下一个平台
+        if not self.breakers.allow_request(api_name):
+            raise CircuitOpenError(f"{api_name} 熔断中，跳过")
+        # 额度用完时短暂排队，预计等待过久则抛出 RateLimitExceeded，由调用方换下一个平台
+        limiter = self.limiters.get(api_name, config)
+        if limiter is None:
+            return self._invoke_adapter(api_name, adapter, prompt, count, model_api, kwargs)
+
+        estimated_tokens = estimate_request_tokens(
+            prompt, count, kwargs.get("max_tokens") or getattr(config, "max_tokens", None)
+        )
+        try:
+            waited = limiter.acquire(estimated_tokens)
+        except RateLimitExceeded as e:
+            logger.warning(str(e))
+            # 调用没有发出，归还可能占用的探测名额
+            self.breakers.release_probe(api_name)
+            raise
+        if waited > 0:
+            logger.info(f"{api_name} 限流排队 {waited * 1000:.0f} 毫秒")
+        actual_tokens = None
+        try:
+            result, latency_ms = self._invoke_adapter(
+                api_name, adapter, prompt, count, model_api, kwargs
+            )
+            actual_tokens = estimate_result_tokens(prompt, result)
+            return result, latency_ms
+        finally:
+            limiter.release(estimated_tokens, actual_tokens)
+
+    def _invoke_adapter(
+        self,
+        api_name: str,
+        adapter: BaseAPIAdapter,
+        prompt: str,
+        count: int,
+        model_api: Optional[str],
+        kwargs: Dict[str, Any],
+    ) -> Tuple[Dict[str, Any], float]:
+        adapter_kwargs = self._build_adapter_kwargs(
+            api_name=api_name,
+            model_api=model_api,
+            kwargs=kwargs,
+        )
+        model = route_model(adapter, adapter_kwargs.get("model"))
+        started = time.perf_counter()
+        try:
+            logger.info(f"尝试使用 {api_name} API生成姓名")
+            result = adapter.generate_names(prompt, **adapter_kwargs)
+            latency_ms = (time.perf_counter() - started) * 1000
+        except Exception as e:
+            if isinstance(e, APIException):
+                logger.warning(f"{api_name} API调用失败: {str(e)}")
+            else:
+                logger.error(f"{api_name} API调用出现未知错误: {str(e)}")
+            self.breakers.record_failure(api_name)
+            self._record_route(
+                api_name, model, (time.perf_counter() - started) * 1000, False, False
+            )
+            raise
+
+        self.breakers.record_success(api_name)
+        self.hedger.latency.record(api_name, latency_ms)
+        self._record_route(
+            api_name,
+            model,
+            latency_ms,
+            result.get("success", True) is not False,
+            bool(result.get("names")),
+        )
+        # 限制返回的姓名数量
+        if "names" in result and len(result["names"]) > count:
+            result["names"] = result["names"][:count]
+        return result, latency_ms
+
+    def _record_route(
+        self, api_name: str, model: str, latency_ms: float, success: bool, parsed: bool
+    ):
+        """把调用结果反馈给自适应路由策略（其他策略没有 record 方法）"""
+        record = getattr(self.router_strategy, "record", None)
+        if record is None:
+            return
+        try:
+            record(api_name, model, latency_ms, success, parsed)
+        except Exception as e:
+            logger.warning(f"记录路由统计失败: {str(e)}")
+
+    def _accept_result(
+        self,
+        api_name: str,
+        result: Dict[str, Any],
+        latency_ms: float,
+        use_cache: bool,
+        cache_key: str,
+    ) -> Dict[str, Any]:
+        # 缓存结果（连同本次调用耗时，命中时计入节省的耗时）
+        if use_cache:
+            self.cache_manager.set(cache_key, self._cacheable(result), latency_ms=latency_ms)
+
+        logger.info(f"成功使用 {api_name} API生成 {len(result.get('names', []))} 个姓名")
+        return result
+
     def _build_adapter_kwargs(
         self,
         api_name: str,
-        preferred_api: Optional[str],
-        attempt_index: int,
+        model_api: Optional[str],
         kwargs: Dict[str, Any],
     ) -> Dict[str, Any]:
         adapter_kwargs = dict(kwargs)
         if not adapter_kwargs.get("model"):
             return adapter_kwargs
 
-        is_requested_api = preferred_api and api_name == preferred_api
-        is_first_attempt_without_preference = (
-            preferred_api is None and attempt_index == 0
-        )
-        if is_requested_api or is_first_attempt_without_preference:
+        # 模型名只对 model_api 有效，降级到其他平台时使用其默认模型
+        if model_api and api_name == model_api:
             return adapter_kwargs
 
         adapter_kwargs.pop("model", None)
@@ -382,10 +601,60 @@ class UnifiedAPIClient:
             "generated_at": time.time(),
         }
 
+    def _resolve_cache_key(
+        self,
+        prompt: str,
+        count: int,
+        kwargs: Dict[str, Any],
+        cache_signature: Optional[Dict[str, Any]],
+    ) -> str:
+        if cache_signature is not None:
+            return semantic_cache_key(cache_signature)
+        return self._generate_cache_key(prompt, count, kwargs)
+
+    def _get_cached(
+        self,
+        cache_key: str,
+        prompt: str,
+        count: int,
+        kwargs: Dict[str, Any],
+        cache_signature: Optional[Dict[str, Any]],
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        读取缓存，返回 (结果, 是否过期)
+
+        语义键未命中时回退到旧的提示词键，命中新鲜结果则迁移到语义键
+        """
+        cached_result, stale = self._read_cache(cache_key)
+        if cached_result or cache_signature is None:
+            return cached_result, stale
+        if not getattr(get_settings(), "CACHE_LEGACY_KEY_FALLBACK", True):
+            return None, False
+
+        legacy_key = self._generate_cache_key(prompt, count, kwargs)
+        cached_result, stale = self._read_cache(legacy_key)
+        if cached_result and not stale:
+            self.cache_manager.set(cache_key, cached_result)
+            logger.debug(f"旧缓存键迁移: {legacy_key} -> {cache_key}")
+        return cached_result, stale
+
+    @staticmethod
+    def _cacheable(result: Dict[str, Any]) -> Dict[str, Any]:
+        """写入缓存的结果：除非开启调试保留，否则去掉模型原始输出"""
+        return strip_debug_fields(
+            result, keep=getattr(get_settings(), "CACHE_KEEP_RAW_RESPONSE", False)
+        )
+
+    def _read_cache(self, key: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        get_with_state = getattr(self.cache_manager, "get_with_state", None)
+        if get_with_state is None:
+            return self.cache_manager.get(key), False
+        return get_with_state(key)
+
     def _generate_cache_key(
         self, prompt: str, count: int, kwargs: Dict[str, Any]
     ) -> str:
-        """生成缓存键"""
+        """按提示词生成缓存键（旧格式）"""
         import hashlib
 
         # 构建缓存键的组成部分
@@ -401,6 +670,10 @@ class UnifiedAPIClient:
     def get_api_status(self) -> Dict[str, Dict[str, Any]]:
         """获取API状态信息"""
         status = {}
+        router_stats = getattr(
+            getattr(self, "router_strategy", None), "get_stats", None
+        )
+        routing = router_stats()["stats"] if router_stats else None
 
         for name, adapter in self.adapters.items():
             status[name] = {
@@ -408,6 +681,16 @@ class UnifiedAPIClient:
                 "name": adapter.name,
                 "base_url": adapter.base_url,
             }
+            if hasattr(adapter, "get_http_stats"):
+                status[name]["http"] = adapter.get_http_stats()
+            status[name]["circuit"] = self.breakers.get_stats(name)
+            limiter = self.limiters.get(name, getattr(adapter, "config", None))
+            if limiter is not None:
+                status[name]["limiter"] = limiter.get_stats()
+            if routing is not None:
+                status[name]["routing"] = [
+                    item for item in routing if item["provider"] == name
+                ]
 
         return status
 
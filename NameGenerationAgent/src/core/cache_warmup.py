@@ -0,0 +1,184 @@
+"""
+缓存预热
+服务启动后在后台线程中：先从快照文件恢复缓存（如有），再把 generation_records 中最常见的请求
+按原参数重新走一遍 NameGenerator.generate_names，使重启后的第一批用户请求直接命中缓存/姓名池。
+同一提供方的调用按 CACHE_WARMUP_RATE_PER_MINUTE 限速，避免启动时集中消耗上游配额
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from config.settings import Config
+from src.core.record_service import BEIJING_TZ
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ProviderRateLimiter:
+    """按提供方限速：同一提供方相邻两次调用至少间隔 60 / rate_per_minute 秒"""
+
+    def __init__(self, rate_per_minute: float, sleep: Callable[[float], Any] = time.sleep,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate_per_minute: 每个提供方每分钟的调用上限，<= 0 表示不限速
+            sleep: 等待函数（可传入 Event.wait 以便随时中断）
+            clock: 单调时钟
+        """
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self._sleep = sleep
+        self._clock = clock
+        self._next_at: Dict[str, float] = {}
+
+    def wait(self, provider: str) -> float:
+        """等到该提供方可以调用为止，返回等待的秒数"""
+        now = self._clock()
+        delay = max(0.0, self._next_at.get(provider, now) - now)
+        if delay:
+            self._sleep(delay)
+        self._next_at[provider] = max(now, self._next_at.get(provider, now)) + self.interval
+        return delay
+
+
+class CacheWarmer:
+    """缓存预热任务（快照恢复 + 热门请求重放）"""
+
+    def __init__(self, name_generator, record_service=None, top_n: int = 50,
+                 rate_per_minute: float = 20, since_days: int = 7,
+                 snapshot_file: Optional[str] = None):
+        """
+        Args:
+            name_generator: 姓名生成器
+            record_service: 生成记录服务，为 None 时只恢复快照
+            top_n: 重放的请求数量
+            rate_per_minute: 每个提供方每分钟的重放次数上限
+            since_days: 只统计最近若干天的记录，<= 0 表示不限
+            snapshot_file: 启动时恢复的快照文件，不存在时跳过
+        """
+        self.name_generator = name_generator
+        self.record_service = record_service
+        self.top_n = max(0, int(top_n))
+        self.rate_per_minute = rate_per_minute
+        self.since_days = since_days
+        self.snapshot_file = snapshot_file
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.limiter = ProviderRateLimiter(rate_per_minute, sleep=self._stop.wait)
+        self._stats: Dict[str, Any] = {
+            'state': 'idle', 'snapshot_restored': 0, 'planned': 0,
+            'replayed': 0, 'failed': 0, 'rate_limited_ms': 0.0, 'duration_ms': 0.0,
+        }
+
+    def load_requests(self) -> List[Dict[str, Any]]:
+        """最常见的请求（按出现次数降序）"""
+        if self.record_service is None or self.top_n <= 0:
+            return []
+        # 记录时间为北京时间（不带时区）
+        now = datetime.now(BEIJING_TZ).replace(tzinfo=None)
+        since = now - timedelta(days=self.since_days) if self.since_days > 0 else None
+        return self.record_service.top_request_signatures(limit=self.top_n, since=since)
+
+    def restore_snapshot(self) -> int:
+        """从快照文件恢复缓存，返回恢复的条目数"""
+        cache_manager = getattr(self.name_generator.unified_client, 'cache_manager', None)
+        if not self.snapshot_file or not os.path.exists(self.snapshot_file) \
+                or not hasattr(cache_manager, 'restore'):
+            return 0
+        return cache_manager.restore(self.snapshot_file)['restored']
+
+    def replay(self, request: Dict[str, Any]) -> bool:
+        """
+        按记录中的参数重新生成一次（结果写入缓存/姓名池），返回是否成功
+
+        平台与模型使用用户当初指定的值（未指定时为默认路由），与原请求得到相同的缓存键；
+        实际提供服务的平台只用于限速
+        """
+        provider = request.get('api_name') or 'default'
+        waited = self.limiter.wait(provider)
+        self._stats['rate_limited_ms'] += round(waited * 1000, 3)
+        if self._stop.is_set():
+            return False
+        result = self.name_generator.generate_names(
+            description=request['description'],
+            count=request['count'],
+            cultural_style=request['cultural_style'],
+            gender=request['gender'],
+            age=request['age'],
+            preferred_api=request.get('preferred_api') or None,
+            model=request.get('model') or None,
+            use_mock_on_failure=False,
+        )
+        return bool(result.get('success'))
+
+    def run(self) -> Dict[str, Any]:
+        """同步执行预热，返回统计"""
+        started = time.perf_counter()
+        self._stats['state'] = 'running'
+        try:
+            self._stats['snapshot_restored'] = self.restore_snapshot()
+        except Exception as e:
+            logger.warning(f"恢复缓存快照失败: {str(e)}")
+
+        try:
+            requests = self.load_requests()
+        except Exception as e:
+            logger.warning(f"读取热门请求失败: {str(e)}")
+            requests = []
+        self._stats['planned'] = len(requests)
+
+        for request in requests:
+            if self._stop.is_set():
+                break
+            try:
+                ok = self.replay(request)
+            except Exception as e:
+                logger.warning(f"预热请求失败 {request.get('description')}: {str(e)}")
+                ok = False
+            self._stats['replayed' if ok else 'failed'] += 1
+
+        self._stats['state'] = 'stopped' if self._stop.is_set() else 'done'
+        self._stats['duration_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        logger.info(f"缓存预热结束: {self._stats}")
+        return self.get_stats()
+
+    def start(self) -> bool:
+        """在后台守护线程中执行预热，已启动时返回 False"""
+        if self._thread is not None:
+            return False
+        self._thread = threading.Thread(target=self.run, name='cache-warmup', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """中止预热（正在进行的那次生成会完成）"""
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats.update({'top_n': self.top_n, 'rate_per_minute': self.rate_per_minute})
+        return stats
+
+
+def start_cache_warmup(name_generator, record_service=None) -> Optional[CacheWarmer]:
+    """按配置在后台启动缓存预热（CACHE_WARMUP_ENABLED 关闭时返回 None）"""
+    if not Config.CACHE_WARMUP_ENABLED:
+        return None
+    warmer = CacheWarmer(
+        name_generator,
+        record_service=record_service,
+        top_n=Config.CACHE_WARMUP_TOP_N,
+        rate_per_minute=Config.CACHE_WARMUP_RATE_PER_MINUTE,
+        since_days=Config.CACHE_WARMUP_SINCE_DAYS,
+        snapshot_file=Config.CACHE_SNAPSHOT_FILE,
+    )
+    name_generator.cache_warmer = warmer
+    warmer.start()
+    logger.info(f"缓存预热已在后台启动（前 {warmer.top_n} 个热门请求）")
+    return warmer
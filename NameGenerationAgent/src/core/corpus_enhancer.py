@@ -2,15 +2,27 @@
 基于语料库的姓名生成增强器
 结合大语言模型和人名语料库，提供更智能的姓名推荐
 """
-import random
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
+from config.settings import Config
 from ..data.corpus_loader import get_corpus_loader
+from .example_pool import ExamplePoolManager, PoolKey
+from .name_scoring import NameScoringEngine, ScoringWeights
+
+# 使用古代人名作为示例的风格
+ANCIENT_EXAMPLE_STYLES = ('chinese_traditional', 'fantasy_chinese')
 
 class CorpusEnhancer:
     """语料库增强器"""
     
     def __init__(self):
         self.corpus_loader = get_corpus_loader()
+        self.example_pools = ExamplePoolManager(
+            self._example_loader,
+            pool_size=Config.EXAMPLE_POOL_SIZE,
+            max_pools=Config.EXAMPLE_POOL_MAX_POOLS,
+            refresh_interval=Config.EXAMPLE_POOL_REFRESH_SECONDS,
+        )
+        self.scoring_engine = NameScoringEngine(self.corpus_loader)
     
     def enhance_prompt(self, base_prompt: str, description: str, options: Dict = None) -> str:
         """
@@ -34,18 +46,6 @@ class CorpusEnhancer:
         # 获取文化风格
         cultural_style = options.get('cultural_style', 'chinese_modern')
 
-        # 根据风格获取示例（仅对中文风格添加示例）
-        examples = []
-        if cultural_style in ['chinese_traditional', 'chinese_modern', 'chinese_classic']:
-            examples = self._get_style_examples(cultural_style, gender_zh)
-
-        # 在基础提示词后面添加语料库示例
-        enhanced = base_prompt
-
-        if examples:
-            enhanced += f"\n\n参考以下真实姓名示例：{', '.join(examples[:5])}"
-            enhanced += "\n请确保生成的姓名符合中文姓名的常见结构和习惯，避免生僻字组合。"
-
         preferred_surname = (options.get('preferred_surname') or '').strip() if isinstance(options, dict) else ''
         preferred_era = (options.get('preferred_era') or '').strip() if isinstance(options, dict) else ''
         era_map = {
@@ -67,6 +67,19 @@ class CorpusEnhancer:
             '近现代': '近现代', '近代': '近现代', '现代': '近现代'
         }
         era_zh = era_map.get(preferred_era, '')
+
+        # 根据风格获取示例（仅对中文风格添加示例）
+        examples = []
+        if cultural_style in ['chinese_traditional', 'chinese_modern', 'chinese_classic']:
+            examples = self._get_style_examples(cultural_style, gender_zh, era_zh)
+
+        # 在基础提示词后面添加语料库示例
+        enhanced = base_prompt
+
+        if examples:
+            enhanced += f"\n\n参考以下真实姓名示例：{', '.join(examples[:5])}"
+            enhanced += "\n请确保生成的姓名符合中文姓名的常见结构和习惯，避免生僻字组合。"
+
         if preferred_surname:
             enhanced += f"\n若可能，请优先使用姓氏：{preferred_surname}。"
         if era_zh:
@@ -157,8 +170,6 @@ class CorpusEnhancer:
         options = options or {}
         preferred_surname = (options.get('preferred_surname') or '').strip()
         cultural_style = options.get('cultural_style', 'chinese_modern')
-        surname_weight = float(options.get('surname_weight', 1.0) or 1.0)
-        era_weight = float(options.get('era_weight', 1.0) or 1.0)
         preferred_era = (options.get('preferred_era') or '').strip()
         era_map = {
             'tang': '唐',
@@ -178,8 +189,9 @@ class CorpusEnhancer:
             '清': '清'
         }
         era_zh = era_map.get(preferred_era, '')
+        dynasty_zh = era_zh if era_zh and era_zh != '近现代' else None
 
-        cleaned = []
+        candidates = []
         for item in generated_names:
             n = (item.get('name') or '').strip()
             m = (item.get('meaning') or '').strip()
@@ -189,59 +201,51 @@ class CorpusEnhancer:
                 continue
             if m in ['例如', '示例', '参考', '根据角色描述生成']:
                 continue
-            exists = self.corpus_loader.name_exists(n)
-            base_score = self.corpus_loader.char_presence_score(n)
+            candidates.append((n, m, item))
 
-            era_bonus = 0
-            ancient_pref = cultural_style in ['chinese_traditional', 'chinese_classic']
-            if era_zh and era_zh != '近现代':
-                if self.corpus_loader.exists_in_dynasty(n, era_zh):
-                    era_bonus = int(2500 * era_weight)
-                elif self.corpus_loader.exists_ancient(n):
-                    era_bonus = int(1000 * era_weight)
-            else:
-                if ancient_pref and self.corpus_loader.exists_ancient(n):
-                    era_bonus = int(2000 * era_weight)
-                elif (not ancient_pref) and self.corpus_loader.exists_modern(n):
-                    era_bonus = int(2000 * era_weight)
-                elif self.corpus_loader.exists_ancient(n) or self.corpus_loader.exists_modern(n):
-                    era_bonus = int(500 * era_weight)
-
-            surname_bonus = 0
-            if preferred_surname and n.startswith(preferred_surname):
-                surname_bonus = int(3000 * surname_weight)
-
-            total_score = base_score + era_bonus + surname_bonus
-            cleaned.append({
-                'name': n,
-                'meaning': m,
-                'source': item.get('source', ''),
-                'exists': exists,
-                'score': total_score
-            })
-
-        cleaned.sort(key=lambda x: (not x['exists'], -x['score'], x['name']))
-        return [{'name': c['name'], 'meaning': c['meaning'], 'source': 'corpus_rank'} for c in cleaned]
+        # 批量收集特征并统一打分排序
+        names = [n for n, _, _ in candidates]
+        order = self.scoring_engine.rank(
+            names,
+            dynasty=dynasty_zh,
+            cultural_style=cultural_style,
+            preferred_surname=preferred_surname,
+            weights=ScoringWeights.from_options(options),
+        )
+        return [{'name': candidates[i][0], 'meaning': candidates[i][1], 'source': 'corpus_rank'} for i in order]
     
-    def _get_style_examples(self, style: str, gender: str = None) -> List[str]:
+    def _get_style_examples(self, style: str, gender: str = None, era: str = None) -> List[str]:
         """
-        根据风格获取示例姓名
+        根据风格获取示例姓名（从预抽取的示例池中抽样）
         
         Args:
             style: 文化风格
             gender: 性别
+            era: 朝代（中文，如 '唐'），仅对古代人名生效
             
         Returns:
             示例姓名列表
         """
-        if style in ['chinese_traditional', 'fantasy_chinese']:
-            # 使用古代人名
-            names = self.corpus_loader.load_ancient_names(limit=1000)
-            return random.sample(names, min(10, len(names)))
+        if style in ANCIENT_EXAMPLE_STYLES:
+            # 使用古代人名（无性别标注）
+            dynasty = era if era and era != '近现代' else None
+            return self.example_pools.sample(('ancient', None, dynasty), 10)
         else:
-            # 使用现代人名
-            names_data = self.corpus_loader.get_random_names(count=20, gender=gender)
-            return [n['name'] for n in names_data]
+            # 使用现代人名（无朝代信息）
+            return self.example_pools.sample(('modern', gender, None), 20)
+
+    def _example_loader(self, key: PoolKey) -> Callable[[int], List[str]]:
+        """根据池键返回抽取示例的函数"""
+        style, gender, dynasty = key
+
+        def load(count: int) -> List[str]:
+            names = self.corpus_loader.get_random_names(count=count, gender=gender, style=style, dynasty=dynasty)
+            if not names and dynasty:
+                # 该朝代没有数据时退回全部古代人名
+                names = self.corpus_loader.get_random_names(count=count, style=style)
+            return [n['name'] for n in names]
+
+        return load
     
     def get_corpus_stats(self) -> Dict:
         """获取语料库统计信息"""
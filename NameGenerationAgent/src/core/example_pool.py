@@ -0,0 +1,160 @@
+"""
+风格示例姓名池
+按 (风格, 性别, 朝代) 预先抽取一批示例姓名保存在内存中，请求时只从池中抽样；
+后台线程按固定间隔重新抽取，池数量与每池大小均有上限，内存占用有界
+"""
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+PoolKey = Tuple[Hashable, ...]
+
+
+class ExamplePool:
+    """单个组合的示例池（刷新时整体替换，读取无需加锁）"""
+
+    def __init__(self, loader: Callable[[int], List[str]], size: int):
+        """
+        初始化示例池
+
+        Args:
+            loader: 抽取示例的函数，参数为需要的数量
+            size: 池大小上限
+        """
+        self._loader = loader
+        self.size = max(1, int(size))
+        self._names: Tuple[str, ...] = ()
+        self.refreshed_at = 0.0
+        self.refresh_count = 0
+
+    def refresh(self):
+        """重新抽取一批示例并替换当前池"""
+        names = tuple(dict.fromkeys(n for n in self._loader(self.size) if n))[:self.size]
+        self._names = names
+        self.refreshed_at = time.monotonic()
+        self.refresh_count += 1
+
+    def sample(self, k: int) -> List[str]:
+        """从池中随机抽取 k 个示例（代价只与 k 有关）"""
+        names = self._names
+        return random.sample(names, min(max(0, int(k)), len(names)))
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class ExamplePoolManager:
+    """示例池管理器：按键懒加载示例池，LRU 淘汰多余的池，并在后台定期轮换"""
+
+    def __init__(self, loader_factory: Callable[[PoolKey], Callable[[int], List[str]]],
+                 pool_size: int = 200, max_pools: int = 64, refresh_interval: float = 300.0):
+        """
+        初始化管理器
+
+        Args:
+            loader_factory: 根据池键返回抽取函数
+            pool_size: 每个池保存的示例数量
+            max_pools: 同时保留的池数量上限
+            refresh_interval: 后台轮换间隔（秒），<= 0 表示不启动后台线程
+        """
+        self._loader_factory = loader_factory
+        self.pool_size = max(1, int(pool_size))
+        self.max_pools = max(1, int(max_pools))
+        self.refresh_interval = float(refresh_interval)
+
+        self._pools: 'OrderedDict[PoolKey, ExamplePool]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {'samples': 0, 'pool_builds': 0, 'evictions': 0, 'rotations': 0, 'refresh_errors': 0}
+
+    def _get_pool(self, key: PoolKey) -> ExamplePool:
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is not None:
+                self._pools.move_to_end(key)
+                return pool
+        # 在锁外构建，避免阻塞其它组合的读取
+        pool = ExamplePool(self._loader_factory(key), self.pool_size)
+        pool.refresh()
+        with self._lock:
+            existing = self._pools.get(key)
+            if existing is not None:
+                return existing
+            self._pools[key] = pool
+            self._stats['pool_builds'] += 1
+            while len(self._pools) > self.max_pools:
+                self._pools.popitem(last=False)
+                self._stats['evictions'] += 1
+        self._ensure_rotation()
+        return pool
+
+    def sample(self, key: PoolKey, k: int) -> List[str]:
+        """
+        从指定组合的池中抽取 k 个示例
+
+        Args:
+            key: 池键，如 (风格, 性别, 朝代)
+            k: 数量
+
+        Returns:
+            示例姓名列表
+        """
+        names = self._get_pool(key).sample(k)
+        with self._lock:
+            self._stats['samples'] += 1
+        return names
+
+    def refresh_all(self):
+        """立即轮换所有已存在的池"""
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            try:
+                pool.refresh()
+            except Exception:
+                with self._lock:
+                    self._stats['refresh_errors'] += 1
+        with self._lock:
+            self._stats['rotations'] += 1
+
+    def _ensure_rotation(self):
+        if self.refresh_interval <= 0 or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._rotate_loop, name='example-pool-rotation', daemon=True)
+            self._thread.start()
+
+    def _rotate_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh_all()
+
+    def stop(self):
+        """停止后台轮换线程"""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=1.0)
+
+    def clear(self):
+        """清空所有池"""
+        with self._lock:
+            self._pools.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取池数量、条目数与抽样统计"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats.update({
+                'pools': len(self._pools),
+                'entries': sum(len(pool) for pool in self._pools.values()),
+                'pool_size': self.pool_size,
+                'max_pools': self.max_pools,
+                'refresh_interval': self.refresh_interval,
+                'rotating': self._thread is not None,
+            })
+        return stats
@@ -5,6 +5,15 @@ from typing import Dict, Any, List, Optional
 import random
 import time
 
+from config.settings import Config
+from ..api.rate_limiter import TOKENS_PER_NAME
+from ..utils.cache_keys import build_request_signature, semantic_cache_key
+from .name_pool import POOL_KEY_PREFIX, NamePool
+
+# 单次请求的最少输出 token；超量生成时按姓名数量放大，避免返回被截断
+MIN_MAX_TOKENS = 2000
+MAX_TOKENS_HEADROOM = 1.25
+
 # 语料库增强器（可选）
 def get_corpus_enhancer():
     """获取语料库增强器"""
@@ -50,6 +59,9 @@ def get_unified_client():
                             'hit_rate': 0.0,
                             'total_requests': 0
                         }
+
+                    def reset_stats(self):
+                        pass
                 
                 return MockCache()
         
@@ -136,6 +148,17 @@ class NameGenerator:
         self.input_validator = get_input_validator()
         self.response_validator = get_response_validator()
         self.corpus_enhancer = get_corpus_enhancer()
+        self.name_pool = self._create_name_pool()
+        # 启动预热任务（见 cache_warmup.start_cache_warmup）
+        self.cache_warmer = None
+
+    def _create_name_pool(self) -> Optional[NamePool]:
+        """姓名池存放在统一客户端的缓存管理器中，客户端没有缓存管理器时不启用"""
+        cache_manager = getattr(self.unified_client, 'cache_manager', None)
+        if cache_manager is None or callable(cache_manager):
+            return None
+        return NamePool(cache_manager, factor=Config.NAME_POOL_FACTOR,
+                        max_names=Config.NAME_POOL_MAX_NAMES, shown_limit=Config.NAME_POOL_SHOWN_LIMIT)
     
     def generate_names(self, description: str, count: int = 5,
                       cultural_style: str = 'chinese_modern',
@@ -147,63 +170,60 @@ class NameGenerator:
                       preferred_surname: Optional[str] = None,
                       surname_weight: float = 1.0,
                       era_weight: float = 1.0,
-                      preferred_era: Optional[str] = None) -> Dict[str, Any]:
-        """生成姓名"""
+                      preferred_era: Optional[str] = None,
+                      user_id: Optional[Any] = None) -> Dict[str, Any]:
+        """生成姓名（user_id 用于姓名池的"已展示"记录）"""
         
         try:
             # 验证输入参数
             self._validate_inputs(description, count, cultural_style, gender, age)
             
-            # 构建提示词
-            corpus_examples = []
-            if self.corpus_enhancer:
-                try:
-                    keywords = self._extract_keywords(description)
-                    suggestions = self.corpus_enhancer.get_name_suggestions(keywords, gender=gender, count=5)
-                    corpus_examples = [s['name'] for s in suggestions]
-                except Exception:
-                    corpus_examples = []
-            prompt = self.prompt_templates.build_prompt(
+            signature = build_request_signature(
                 description=description,
                 count=count,
                 cultural_style=cultural_style,
                 gender=gender,
                 age=age,
-                corpus_examples=corpus_examples,
-                enhancement_type='realistic'
-            )
-
-            # 使用语料库增强器增强提示词（在基础提示词基础上添加示例）
-            if self.corpus_enhancer:
-                try:
-                    options = {
-                        'gender': gender,
-                        'cultural_style': cultural_style,
-                        'preferred_surname': (preferred_surname or '').strip(),
-                        'preferred_era': (preferred_era or '').strip()
-                    }
-                    prompt = self.corpus_enhancer.enhance_prompt(
-                        base_prompt=prompt,
-                        description=description,
-                        options=options
-                    )
-                except Exception as e:
-                    logger.warning(f"语料库增强失败，使用基础提示词: {str(e)}")
-                    # 如果增强失败，继续使用基础提示词
-
-            logger.info(f"开始生成姓名，描述: {description[:50]}...")
-            
-            # 调用API生成姓名
-            api_result = self.unified_client.generate_names(
-                prompt=prompt,
-                count=count,
-                preferred_api=preferred_api,
+                surname=preferred_surname,
+                era=preferred_era,
                 model=model,
-                use_cache=use_cache,
-                use_mock_on_failure=use_mock_on_failure,
-                temperature=0.7,
-                max_tokens=2000
+                strip_punctuation=Config.CACHE_KEY_NORMALIZE_DESCRIPTION,
             )
+
+            # 相同请求优先从超量生成的姓名池中取该用户未看过的姓名
+            pool = self.name_pool if use_cache and self.name_pool is not None and self.name_pool.enabled else None
+            api_result = pool.take(signature, count, user_id) if pool else None
+
+            model_request = {
+                'description': description,
+                'cultural_style': cultural_style,
+                'gender': gender,
+                'age': age,
+                'preferred_surname': preferred_surname,
+                'preferred_era': preferred_era,
+                'preferred_api': preferred_api,
+                'model': model,
+                'signature': signature,
+            }
+
+            if api_result is None:
+                # 调用API生成姓名（使用姓名池时由池负责缓存）
+                api_result = self._request_model(
+                    count=pool.request_count(count) if pool else count,
+                    use_cache=use_cache and pool is None,
+                    use_mock_on_failure=use_mock_on_failure,
+                    **model_request
+                )
+
+                if pool and api_result.get('success') and api_result.get('api_name') != 'mock':
+                    pool.put(signature, api_result)
+                    api_result = pool.take(signature, count, user_id, allow_repeats=True) or api_result
+                if len(api_result.get('names') or []) > count:
+                    api_result['names'] = api_result['names'][:count]
+            else:
+                logger.info(f"从姓名池获取 {len(api_result['names'])} 个姓名")
+                if api_result.get('stale'):
+                    self._schedule_pool_refresh(pool.request_count(count), model_request)
             
             # 验证API响应
             validation_result = self.response_validator.validate_api_response(api_result)
@@ -242,6 +262,89 @@ class NameGenerator:
                 'names': []
             }
     
+    def _request_model(self, description: str, count: int, cultural_style: str, gender: str, age: str,
+                       preferred_surname: Optional[str], preferred_era: Optional[str],
+                       preferred_api: Optional[str], model: Optional[str], signature: Dict[str, Any],
+                       use_cache: bool, use_mock_on_failure: bool) -> Dict[str, Any]:
+        """构建提示词并调用统一客户端生成 count 个姓名"""
+        prompt = self._build_prompt(description, count, cultural_style, gender, age,
+                                    preferred_surname, preferred_era)
+
+        logger.info(f"开始生成姓名，描述: {description[:50]}...")
+
+        return self.unified_client.generate_names(
+            prompt=prompt,
+            count=count,
+            preferred_api=preferred_api,
+            model=model,
+            use_cache=use_cache,
+            use_mock_on_failure=use_mock_on_failure,
+            cache_signature=signature,
+            temperature=0.7,
+            max_tokens=self._max_tokens_for(count)
+        )
+
+    @staticmethod
+    def _max_tokens_for(count: int) -> int:
+        """按请求的姓名数量估算输出 token 上限（每个姓名 TOKENS_PER_NAME，另留余量）"""
+        return max(MIN_MAX_TOKENS, int(count * TOKENS_PER_NAME * MAX_TOKENS_HEADROOM))
+
+    def _schedule_pool_refresh(self, request_count: int, model_request: Dict[str, Any]):
+        """姓名池已过期：在后台重新生成并替换池（失败时保留旧池）"""
+        refresher = getattr(self.unified_client, 'refresher', None)
+        if refresher is None:
+            return
+
+        def refill():
+            result = self._request_model(count=request_count, use_cache=False,
+                                         use_mock_on_failure=False, **model_request)
+            if result.get('success') and result.get('api_name') != 'mock':
+                self.name_pool.put(model_request['signature'], result)
+
+        refresher.submit(semantic_cache_key(model_request['signature'], prefix=POOL_KEY_PREFIX), refill)
+
+    def _build_prompt(self, description: str, count: int, cultural_style: str,
+                      gender: str, age: str, preferred_surname: Optional[str],
+                      preferred_era: Optional[str]) -> str:
+        """构建提示词（基础模板 + 语料库示例增强）"""
+        corpus_examples = []
+        if self.corpus_enhancer:
+            try:
+                keywords = self._extract_keywords(description)
+                suggestions = self.corpus_enhancer.get_name_suggestions(keywords, gender=gender, count=5)
+                corpus_examples = [s['name'] for s in suggestions]
+            except Exception:
+                corpus_examples = []
+        prompt = self.prompt_templates.build_prompt(
+            description=description,
+            count=count,
+            cultural_style=cultural_style,
+            gender=gender,
+            age=age,
+            corpus_examples=corpus_examples,
+            enhancement_type='realistic'
+        )
+
+        # 使用语料库增强器增强提示词（在基础提示词基础上添加示例）
+        if self.corpus_enhancer:
+            try:
+                options = {
+                    'gender': gender,
+                    'cultural_style': cultural_style,
+                    'preferred_surname': (preferred_surname or '').strip(),
+                    'preferred_era': (preferred_era or '').strip()
+                }
+                prompt = self.corpus_enhancer.enhance_prompt(
+                    base_prompt=prompt,
+                    description=description,
+                    options=options
+                )
+            except Exception as e:
+                logger.warning(f"语料库增强失败，使用基础提示词: {str(e)}")
+                # 如果增强失败，继续使用基础提示词
+
+        return prompt
+
     def _validate_inputs(self, description: str, count: int,
                         cultural_style: str, gender: str, age: str):
         """验证输入参数"""
@@ -302,6 +405,7 @@ class NameGenerator:
             'api_name': api_result.get('api_name', 'unknown'),
             'model': api_result.get('model', 'unknown'),
             'description': description,
+            'stale': bool(api_result.get('stale', False)),
             'generated_at': time.time()
         }
     
@@ -445,11 +549,39 @@ class NameGenerator:
     
     def get_generation_stats(self) -> Dict[str, Any]:
         """获取生成统计信息"""
+        single_flight = getattr(self.unified_client, 'single_flight', None)
+        refresher = getattr(self.unified_client, 'refresher', None)
+        hedger = getattr(self.unified_client, 'hedger', None)
+        router = getattr(self.unified_client, 'router_strategy', None)
         return {
             'available_apis': len(self.unified_client.get_available_apis()),
             'api_status': self.unified_client.get_api_status(),
-            'cache_stats': self.unified_client.cache_manager.get_stats()
+            'cache_stats': self.unified_client.cache_manager.get_stats(),
+            'name_pool': self.name_pool.get_stats() if self.name_pool else {'enabled': False},
+            'single_flight': single_flight.get_stats() if single_flight else {},
+            'background_refresh': refresher.get_stats() if refresher else {},
+            'cache_warmup': self.cache_warmer.get_stats() if self.cache_warmer else {},
+            'hedging': hedger.get_stats() if hedger else {},
+            'routing': router.get_stats() if hasattr(router, 'get_stats') else {}
         }
 
+    def reset_generation_stats(self):
+        """清零缓存命中与姓名池计数"""
+        self.unified_client.cache_manager.reset_stats()
+        if self.name_pool:
+            self.name_pool.reset_stats()
+        single_flight = getattr(self.unified_client, 'single_flight', None)
+        if single_flight:
+            single_flight.reset_stats()
+        refresher = getattr(self.unified_client, 'refresher', None)
+        if refresher:
+            refresher.reset_stats()
+        hedger = getattr(self.unified_client, 'hedger', None)
+        if hedger:
+            hedger.reset_stats()
+        limiters = getattr(self.unified_client, 'limiters', None)
+        if limiters:
+            limiters.reset_stats()
+
 # 全局姓名生成器实例
 name_generator = NameGenerator()
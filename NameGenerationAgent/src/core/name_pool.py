@@ -0,0 +1,164 @@
+"""
+超量生成姓名池
+一次向模型请求 factor × count 个姓名，返回 count 个，其余按请求签名存入缓存；
+之后相同的请求直接从池中取出该用户尚未看过的姓名，取完再调用模型
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.settings import Config
+from ..utils.cache_codec import strip_debug_fields
+from ..utils.cache_keys import SEMANTIC_KEY_VERSION, semantic_cache_key, signature_digest
+
+POOL_KEY_PREFIX = 'pool'
+SHOWN_KEY_PREFIX = 'shown'
+
+
+def _name_of(item: Any) -> str:
+    return (item.get('name') or '').strip() if isinstance(item, dict) else ''
+
+
+class ShownStore:
+    """
+    各用户"已展示"姓名的进程内存储，与生成结果缓存分开计数和淘汰
+
+    条目数超过 max_entries 时淘汰最久未使用的记录，写入超过 ttl 秒的记录视为不存在；
+    调用方负责加锁
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 3600,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl)
+        self._clock = clock
+        self._entries: 'OrderedDict[str, Tuple[float, List[str]]]' = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[List[str]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        written, names = entry
+        if self.ttl > 0 and self._clock() - written > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return names
+
+    def set(self, key: str, names: List[str]):
+        self._entries[key] = (self._clock(), names)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class NamePool:
+    """
+    按请求签名存放超量生成结果的姓名池（存储在 CacheManager 中，随缓存 TTL 过期）
+
+    每个用户的"已展示"姓名记录在独立的 ShownStore 中（键为 shown:v1:<用户>:<签名摘要>），
+    不占用生成结果缓存的容量，用户再多也不会把缓存的模型结果挤出去；
+    记录只在本进程内有效，多进程部署时同一用户落到不同进程可能重复看到同一姓名
+    """
+
+    def __init__(self, cache_manager, factor: int = 3, max_names: int = 40, shown_limit: int = 200,
+                 shown_store: Optional[ShownStore] = None):
+        """
+        初始化姓名池
+
+        Args:
+            cache_manager: 存放池的缓存管理器
+            factor: 超量倍数，小于等于 1 表示关闭
+            max_names: 单次向模型请求（即单个池）的姓名数量上限
+            shown_limit: 每个用户每个签名保留的已展示姓名数量上限
+            shown_store: 已展示记录的存储，默认按 NAME_POOL_SHOWN_MAX_ENTRIES 与 CACHE_TTL 创建
+        """
+        self.cache_manager = cache_manager
+        self.factor = factor
+        self.max_names = max_names
+        self.shown_limit = shown_limit
+        if shown_store is None:
+            shown_store = ShownStore(Config.NAME_POOL_SHOWN_MAX_ENTRIES, Config.CACHE_TTL)
+        self.shown_store = shown_store
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def enabled(self) -> bool:
+        return self.factor > 1
+
+    def request_count(self, count: int) -> int:
+        """向模型请求的姓名数量"""
+        if not self.enabled:
+            return count
+        return max(count, min(count * self.factor, self.max_names))
+
+    def _shown_key(self, signature: Dict[str, Any], user_id: Any) -> str:
+        return f"{SHOWN_KEY_PREFIX}:{SEMANTIC_KEY_VERSION}:{user_id}:{signature_digest(signature)}"
+
+    def take(self, signature: Dict[str, Any], count: int, user_id: Any = None,
+             allow_repeats: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        从池中取出 count 个该用户未看过的姓名
+
+        池不存在或剩余不足 count 时返回 None（allow_repeats 为 True 时用看过的姓名补足）；
+        池已过期但仍在 CACHE_MAX_STALE 窗口内时照常取用，结果的 stale 为 True，由调用方在后台重新生成
+        """
+        with self._lock:
+            pool, stale = self.cache_manager.get_with_state(semantic_cache_key(signature, prefix=POOL_KEY_PREFIX))
+            if not pool or not pool.get('names'):
+                self._stats['pool_misses'] += 1
+                return None
+
+            shown_key = self._shown_key(signature, user_id) if user_id is not None else None
+            shown: List[str] = list(self.shown_store.get(shown_key) or []) if shown_key else []
+            seen = set(shown)
+            fresh = [item for item in pool['names'] if _name_of(item) not in seen]
+            if len(fresh) < count:
+                if not allow_repeats:
+                    self._stats['pool_misses'] += 1
+                    return None
+                fresh += [item for item in pool['names'] if _name_of(item) in seen]
+
+            selected = fresh[:count]
+            if shown_key:
+                shown.extend(_name_of(item) for item in selected)
+                self.shown_store.set(shown_key, shown[-self.shown_limit:])
+
+            self._stats['pool_hits'] += 1
+            self._stats['names_served'] += len(selected)
+            result = {key: value for key, value in pool.items() if key != 'names'}
+            result.update({'names': selected, 'from_pool': True, 'stale': stale})
+            return result
+
+    def put(self, signature: Dict[str, Any], result: Dict[str, Any]):
+        """用新生成的结果替换池（按姓名去重）"""
+        names, seen = [], set()
+        for item in result.get('names', []):
+            name = _name_of(item)
+            if name and name not in seen:
+                seen.add(name)
+                names.append(item)
+        pool = {key: value for key, value in result.items() if key not in ('names', 'from_pool', 'stale')}
+        pool = strip_debug_fields(pool, keep=Config.CACHE_KEEP_RAW_RESPONSE)
+        pool['names'] = names[:self.max_names]
+        with self._lock:
+            self.cache_manager.set(semantic_cache_key(signature, prefix=POOL_KEY_PREFIX), pool)
+            self._stats['refills'] += 1
+
+    def reset_stats(self):
+        self._stats = {'pool_hits': 0, 'pool_misses': 0, 'refills': 0, 'names_served': 0}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['shown_entries'] = len(self.shown_store)
+            stats['shown_evictions'] = self.shown_store.evictions
+        stats.update({'enabled': self.enabled, 'factor': self.factor, 'max_names': self.max_names})
+        return stats
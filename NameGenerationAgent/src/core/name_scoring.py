@@ -0,0 +1,161 @@
+"""
+姓名候选批量打分引擎
+一次性收集整批候选的特征（存在性、字符出现分、朝代命中、姓氏匹配、姓氏频次），
+再按权重统一计算得分并排序；安装了 NumPy 时使用数组运算，否则回退到纯 Python，两者结果一致
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖
+    np = None
+
+# 各项加分基数（乘以对应权重后取整）
+DYNASTY_HIT_BONUS = 2500  # 指定朝代中存在
+DYNASTY_ANCIENT_BONUS = 1000  # 指定朝代但仅在其它朝代存在
+STYLE_MATCH_BONUS = 2000  # 存在于与风格一致的语料（古代/现代）
+OTHER_CORPUS_BONUS = 500  # 仅存在于另一类语料
+SURNAME_MATCH_BONUS = 3000  # 以偏好姓氏开头
+
+# 偏好古代人名的风格
+ANCIENT_PREF_STYLES = ('chinese_traditional', 'chinese_classic')
+
+
+class ScoringWeights:
+    """打分权重"""
+
+    def __init__(self, era_weight: float = 1.0, surname_weight: float = 1.0,
+                 surname_frequency_weight: float = 0.0):
+        """
+        Args:
+            era_weight: 朝代/风格加分权重
+            surname_weight: 偏好姓氏加分权重
+            surname_frequency_weight: 姓氏频次加分权重（频次 × 权重），默认 0 不参与排序
+        """
+        self.era_weight = era_weight
+        self.surname_weight = surname_weight
+        self.surname_frequency_weight = surname_frequency_weight
+
+    @classmethod
+    def from_options(cls, options: Dict[str, Any]) -> 'ScoringWeights':
+        """从生成选项中读取权重（与原有解析方式一致）"""
+        return cls(
+            era_weight=float(options.get('era_weight', 1.0) or 1.0),
+            surname_weight=float(options.get('surname_weight', 1.0) or 1.0),
+            surname_frequency_weight=float(options.get('surname_frequency_weight', 0.0) or 0.0),
+        )
+
+
+def split_surname(name: str, frequencies: Dict[str, int], preferred_surname: str = '') -> str:
+    """推断姓名中的姓氏：优先使用偏好姓氏，其次识别复姓，否则取首字"""
+    if preferred_surname and name.startswith(preferred_surname):
+        return preferred_surname
+    if len(name) > 2 and name[:2] in frequencies:
+        return name[:2]
+    return name[:1]
+
+
+def gather_features(loader, names: Sequence[str], dynasty: Optional[str] = None,
+                    preferred_surname: str = '') -> Dict[str, List[Any]]:
+    """
+    批量收集候选特征（查询次数与候选数量无关）
+
+    Args:
+        loader: CorpusLoader 实例
+        names: 候选姓名
+        dynasty: 指定朝代（中文），None 表示不按朝代
+        preferred_surname: 偏好姓氏
+
+    Returns:
+        特征名 -> 与 names 等长的列表
+    """
+    lookup = loader.lookup_names(names, dynasty=dynasty)
+    frequencies = loader.get_surname_frequencies()
+    flags = [lookup[n] for n in names]
+    return {
+        'modern': [f['modern'] for f in flags],
+        'ancient': [f['ancient'] for f in flags],
+        'in_dynasty': [f['in_dynasty'] for f in flags],
+        'char_score': loader.char_presence_scores(names),
+        'surname_match': [bool(preferred_surname) and n.startswith(preferred_surname) for n in names],
+        'surname_frequency': [frequencies.get(split_surname(n, frequencies, preferred_surname), 0) for n in names],
+    }
+
+
+class NameScoringEngine:
+    """批量打分与排序"""
+
+    def __init__(self, loader, use_numpy: Optional[bool] = None):
+        """
+        Args:
+            loader: CorpusLoader 实例
+            use_numpy: None 表示可用时使用 NumPy；False 强制纯 Python
+        """
+        self.loader = loader
+        self.backend = 'numpy' if np is not None and use_numpy is not False else 'python'
+
+    @staticmethod
+    def _era_rule(dynasty: Optional[str], cultural_style: str, era_weight: float):
+        """返回 (主要命中特征, 次要命中特征, 主要加分, 次要加分)"""
+        if dynasty:
+            return ('in_dynasty', 'ancient',
+                    int(DYNASTY_HIT_BONUS * era_weight), int(DYNASTY_ANCIENT_BONUS * era_weight))
+        if cultural_style in ANCIENT_PREF_STYLES:
+            primary, secondary = 'ancient', 'modern'
+        else:
+            primary, secondary = 'modern', 'ancient'
+        return primary, secondary, int(STYLE_MATCH_BONUS * era_weight), int(OTHER_CORPUS_BONUS * era_weight)
+
+    def score(self, names: Sequence[str], dynasty: Optional[str] = None,
+              cultural_style: str = 'chinese_modern', preferred_surname: str = '',
+              weights: Optional[ScoringWeights] = None) -> Dict[str, List[Any]]:
+        """
+        计算整批候选的得分
+
+        Returns:
+            特征字典，额外包含 'exists' 与 'score'
+        """
+        weights = weights or ScoringWeights()
+        features = gather_features(self.loader, names, dynasty, preferred_surname)
+        primary, secondary, primary_bonus, secondary_bonus = self._era_rule(
+            dynasty, cultural_style, weights.era_weight
+        )
+        surname_bonus = int(SURNAME_MATCH_BONUS * weights.surname_weight)
+        frequency_weight = weights.surname_frequency_weight
+
+        if self.backend == 'numpy':
+            modern = np.array(features['modern'], dtype=bool)
+            ancient = np.array(features['ancient'], dtype=bool)
+            hit = np.array(features[primary], dtype=bool)
+            near = np.array(features[secondary], dtype=bool)
+            era = np.where(hit, primary_bonus, np.where(near, secondary_bonus, 0))
+            surname = np.where(np.array(features['surname_match'], dtype=bool), surname_bonus, 0)
+            frequency = np.trunc(np.array(features['surname_frequency'], dtype=np.float64) * frequency_weight)
+            total = np.array(features['char_score'], dtype=np.int64) + era + surname + frequency.astype(np.int64)
+            features['exists'] = (modern | ancient).tolist()
+            features['score'] = [int(v) for v in total.tolist()]
+        else:
+            features['exists'] = [m or a for m, a in zip(features['modern'], features['ancient'])]
+            features['score'] = [
+                char
+                + (primary_bonus if hit else secondary_bonus if near else 0)
+                + (surname_bonus if match else 0)
+                + int(freq * frequency_weight)
+                for char, hit, near, match, freq in zip(
+                    features['char_score'], features[primary], features[secondary],
+                    features['surname_match'], features['surname_frequency'],
+                )
+            ]
+        return features
+
+    def rank(self, names: Sequence[str], **kwargs) -> List[int]:
+        """
+        返回按 (存在优先, 得分降序, 姓名) 排序后的候选下标
+
+        Args:
+            names: 候选姓名
+            **kwargs: 传给 score 的参数
+        """
+        features = self.score(names, **kwargs)
+        exists, scores = features['exists'], features['score']
+        return sorted(range(len(names)), key=lambda i: (not exists[i], -scores[i], names[i]))
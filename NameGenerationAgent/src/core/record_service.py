@@ -46,6 +46,8 @@ class RecordService:
         api_name: str,
         model: str,
         names: List[Dict],
+        requested_api: str = "",
+        requested_model: str = "",
     ) -> Dict:
         names_json = json.dumps(names or [], ensure_ascii=False)
         row = GenerationRecord(
@@ -57,6 +59,8 @@ class RecordService:
             request_count=max(1, int(request_count or 1)),
             api_name=api_name or "",
             model=model or "",
+            requested_api=requested_api or "",
+            requested_model=requested_model or "",
             names_json=names_json,
         )
         with self.SessionLocal() as session:
@@ -156,6 +160,50 @@ class RecordService:
             )
             return int(session.execute(stmt).scalar_one() or 0)
 
+    def top_request_signatures(
+        self, limit: int = 50, since: Optional[datetime] = None
+    ) -> List[Dict]:
+        """Most frequent request shapes, for cache warm-up.
+
+        Grouped by what the user asked for (requested_api/requested_model, empty for default
+        routing) so a replay builds the same cache key as the original request; api_name is
+        the provider that most recently served the shape, used only for rate limiting.
+        """
+        columns = (
+            GenerationRecord.description,
+            GenerationRecord.cultural_style,
+            GenerationRecord.gender,
+            GenerationRecord.age,
+            GenerationRecord.request_count,
+            GenerationRecord.requested_api,
+            GenerationRecord.requested_model,
+        )
+        hits = func.count(GenerationRecord.id)
+        served_by = func.max(GenerationRecord.api_name)
+        stmt = select(*columns, served_by, hits).where(GenerationRecord.api_name != "mock")
+        if since is not None:
+            stmt = stmt.where(GenerationRecord.created_at >= since)
+        stmt = (
+            stmt.group_by(*columns)
+            .order_by(hits.desc(), func.max(GenerationRecord.created_at).desc())
+            .limit(max(1, int(limit or 1)))
+        )
+        with self.SessionLocal() as session:
+            return [
+                {
+                    "description": row.description,
+                    "cultural_style": row.cultural_style,
+                    "gender": row.gender,
+                    "age": row.age,
+                    "count": int(row.request_count),
+                    "preferred_api": row.requested_api or "",
+                    "model": row.requested_model or "",
+                    "api_name": row[-2] or "",
+                    "hits": int(row[-1]),
+                }
+                for row in session.execute(stmt)
+            ]
+
     def delete_record(self, record_id: int) -> bool:
         with self.SessionLocal() as session:
             result = session.execute(
@@ -0,0 +1,201 @@
+"""
+语料库数据库连接管理
+为只读的 names_corpus.db 维护一个有上限的连接池：查询时借出连接，取完结果后归还，
+避免每次查询都重新 connect，也不会随请求线程数无限增长
+"""
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+# 默认连接参数
+DEFAULT_CACHE_SIZE_KB = 64 * 1024  # 页缓存 64MB
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024  # 内存映射 256MB
+DEFAULT_CACHED_STATEMENTS = 256  # 每个连接缓存的预编译语句数
+DEFAULT_POOL_SIZE = 4  # 池中最多保持的连接数
+DEFAULT_CHECKOUT_TIMEOUT = 5.0  # 池满时等待归还的最长时间（秒）
+
+
+class PooledCursor:
+    """持有借出连接的游标；结果取完（fetchone/fetchall/迭代结束）或游标被回收时归还连接"""
+
+    def __init__(self, cursor: sqlite3.Cursor, release):
+        self._cursor = cursor
+        self._release = release
+
+    def fetchone(self) -> Optional[sqlite3.Row]:
+        try:
+            return self._cursor.fetchone()
+        finally:
+            self.close()
+
+    def fetchall(self) -> List[sqlite3.Row]:
+        try:
+            return self._cursor.fetchall()
+        finally:
+            self.close()
+
+    def __iter__(self) -> Iterator[sqlite3.Row]:
+        try:
+            yield from self._cursor
+        finally:
+            self.close()
+
+    def close(self):
+        release, self._release = self._release, None
+        if release is not None:
+            try:
+                self._cursor.close()
+            finally:
+                release()
+
+    def __del__(self):
+        self.close()
+
+
+class CorpusConnectionManager:
+    """语料库只读连接池"""
+
+    def __init__(self, db_path: Union[str, Path],
+                 cache_size_kb: int = DEFAULT_CACHE_SIZE_KB,
+                 mmap_size: int = DEFAULT_MMAP_SIZE,
+                 cached_statements: int = DEFAULT_CACHED_STATEMENTS,
+                 immutable: bool = True,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 checkout_timeout: float = DEFAULT_CHECKOUT_TIMEOUT):
+        """
+        初始化连接管理器
+
+        Args:
+            db_path: 数据库文件路径
+            cache_size_kb: 每个连接的页缓存大小（KB）
+            mmap_size: 内存映射大小（字节），0 表示关闭
+            cached_statements: 每个连接缓存的预编译语句数量
+            immutable: 是否以 immutable 方式打开（数据库运行期间不会被修改时使用）
+            pool_size: 池中最多保持的连接数
+            checkout_timeout: 连接全部借出时等待归还的时间（秒）；超时后临时打开一个连接，用完即关闭，
+                避免同一线程嵌套查询时互相等待
+        """
+        self.db_path = Path(db_path)
+        self.cache_size_kb = int(cache_size_kb)
+        self.mmap_size = int(mmap_size)
+        self.cached_statements = int(cached_statements)
+        self.immutable = immutable
+        self.pool_size = max(1, int(pool_size))
+        self.checkout_timeout = max(0.0, float(checkout_timeout))
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._pooled = 0  # 池持有的连接数（空闲 + 借出）
+        self._generation = 0  # close_all 后递增，旧连接归还时直接关闭
+        self._connections_opened = 0
+        self._queries_served = 0
+        self._checkout_waits = 0
+        self._overflow_opened = 0
+
+    def _build_uri(self) -> str:
+        uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+        if self.immutable:
+            uri += "&immutable=1"
+        return uri
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._build_uri(),
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.row_factory = sqlite3.Row  # 使结果可以用列名访问
+        conn.execute(f"PRAGMA cache_size = -{self.cache_size_kb}")
+        conn.execute(f"PRAGMA mmap_size = {self.mmap_size}")
+        conn.execute("PRAGMA query_only = 1")
+        with self._lock:
+            self._connections_opened += 1
+        return conn
+
+    def _checkout(self):
+        """借出一个连接，返回 (连接, 归还函数)"""
+        generation = self._generation
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+        if conn is None:
+            with self._lock:
+                can_open = self._pooled < self.pool_size
+                if can_open:
+                    self._pooled += 1
+                else:
+                    self._checkout_waits += 1
+            if can_open:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._pooled -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.checkout_timeout)
+                except queue.Empty:
+                    return self._checkout_overflow()
+        return conn, lambda: self._return(conn, generation)
+
+    def _checkout_overflow(self):
+        conn = self._open()
+        with self._lock:
+            self._overflow_opened += 1
+        return conn, conn.close
+
+    def _return(self, conn: sqlite3.Connection, generation: int):
+        with self._lock:
+            stale = generation != self._generation
+            if stale:
+                self._pooled -= 1
+        if stale:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> PooledCursor:
+        """借出连接执行查询；返回的游标取完结果后归还连接"""
+        conn, release = self._checkout()
+        try:
+            cursor = conn.execute(sql, params)
+        except Exception:
+            release()
+            raise
+        with self._lock:
+            self._queries_served += 1
+        return PooledCursor(cursor, release)
+
+    def close_all(self):
+        """关闭所有空闲连接；借出中的连接在归还时关闭"""
+        with self._lock:
+            self._generation += 1
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._pooled -= 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取连接统计信息"""
+        with self._lock:
+            return {
+                'connections_opened': self._connections_opened,
+                'connections_alive': self._pooled,
+                'connections_idle': self._idle.qsize(),
+                'pool_size': self.pool_size,
+                'checkout_waits': self._checkout_waits,
+                'overflow_opened': self._overflow_opened,
+                'queries_served': self._queries_served,
+            }
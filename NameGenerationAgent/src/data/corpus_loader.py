@@ -6,19 +6,61 @@ import os
 import random
 import sqlite3
 import threading
-from typing import List, Dict, Optional, Union
+from typing import Any, List, Dict, Iterable, Optional, Sequence, Union
 from pathlib import Path
 
+from config.settings import Config
+from .corpus_db import CorpusConnectionManager
+from .corpus_membership import CorpusMembershipCache, MembershipIndex, dynasty_key
+from .corpus_sampler import ALL_ROWS, RowidSampler, fetch_rows_by_rowid
+
+
+# 字符 -> 人名 rowid 倒排表
+CHAR_POSTINGS_TABLE = 'name_char_postings'
+
+
+def _like_key(ch: str) -> str:
+    """与 SQLite LIKE 语义一致的字符键（仅 ASCII 字母大小写不敏感）"""
+    return ch.lower() if ch.isascii() else ch
+
+
+def _build_char_counter(names: Iterable[Optional[str]]) -> Dict[str, int]:
+    """
+    统计每个字符出现在多少个姓名中（等价于 COUNT(*) ... WHERE name LIKE '%ch%'）
+
+    Args:
+        names: 姓名序列
+
+    Returns:
+        字符 -> 包含该字符的姓名数量
+    """
+    counter: Dict[str, int] = {}
+    non_null = 0
+    non_empty = 0
+    for name in names:
+        if name is None:
+            continue
+        non_null += 1
+        if name:
+            non_empty += 1
+        for key in {_like_key(ch) for ch in name}:
+            counter[key] = counter.get(key, 0) + 1
+    # LIKE 通配符：'%%%' 匹配所有非空值，'%_%' 匹配至少一个字符的值
+    counter['%'] = non_null
+    counter['_'] = non_empty
+    return counter
+
 
 class CorpusLoader:
     """语料库加载器（使用SQLite数据库）"""
 
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, membership_mode: str = None):
         """
         初始化语料库加载器
 
         Args:
             db_path: 数据库文件路径，默认为 data/names_corpus.db
+            membership_mode: 成员缓存模式（off/auto/set/bloom），默认读取配置
         """
         if db_path is None:
             # 默认路径：项目根目录的data目录
@@ -34,14 +76,46 @@ class CorpusLoader:
                 f"请运行 python data/convert_csv_to_sqlite.py 生成数据库"
             )
 
-        # 缓存连接（每次查询时创建新连接以避免线程安全问题）
-        self._connection = None
-
-    def _get_connection(self) -> sqlite3.Connection:
-        """获取数据库连接"""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row  # 使结果可以用列名访问
-        return conn
+        # 有上限的只读连接池
+        self._db = CorpusConnectionManager(self.db_path, pool_size=Config.CORPUS_DB_POOL_SIZE)
+
+        # 字符频次索引（首次使用时构建一次）
+        self._char_index: Optional[Dict[str, int]] = None
+        self._dynasty_char_index: Optional[Dict[str, Dict[str, int]]] = None
+        self._surname_frequencies: Dict[str, Dict[str, int]] = {}
+        self._index_lock = threading.Lock()
+
+        # 数据库结构元数据缓存（列、索引、行数）
+        self._schema: Optional[Dict[str, Dict[str, Any]]] = None
+
+        # 随机采样器（rowid 集合首次使用时加载）
+        self._modern_sampler = RowidSampler(self._execute, 'chinese_names', 'gender')
+        self._ancient_sampler = RowidSampler(self._execute, 'ancient_names')
+        self._dynasty_sampler = RowidSampler(self._execute, 'ancient_names', 'dynasty')
+        self._idiom_sampler = RowidSampler(self._execute, 'idioms', 'category')
+
+        # 姓名成员缓存（首次批量查询时构建）
+        self._membership = CorpusMembershipCache(
+            self._execute,
+            mode=membership_mode or Config.CORPUS_MEMBERSHIP_MODE,
+            max_bytes=Config.CORPUS_MEMBERSHIP_MAX_MB * 1024 * 1024,
+            error_rate=Config.CORPUS_MEMBERSHIP_ERROR_RATE,
+            max_build_seconds=Config.CORPUS_MEMBERSHIP_MAX_BUILD_SECONDS,
+            has_dynasty=lambda: self._has_column('ancient_names', 'dynasty'),
+            row_count=self.get_table_row_count,
+        )
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        """通过连接管理器执行查询"""
+        return self._db.execute(sql, params)
+
+    def get_connection_stats(self) -> Dict[str, int]:
+        """获取连接数与查询数统计"""
+        return self._db.get_stats()
+
+    def close(self):
+        """关闭所有数据库连接"""
+        self._db.close_all()
 
     def load_names(self, with_gender: bool = False, limit: int = None) -> Union[List[str], List[Dict[str, str]]]:
         """
@@ -54,24 +128,17 @@ class CorpusLoader:
         Returns:
             人名列表，如果with_gender=True则返回字典列表
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        try:
-            query = "SELECT name, gender FROM chinese_names"
-            if limit:
-                query += " LIMIT ?"
-                cursor.execute(query, (limit,))
-            else:
-                cursor.execute(query)
-            rows = cursor.fetchall()
+        query = "SELECT name, gender FROM chinese_names"
+        if limit:
+            query += " LIMIT ?"
+            rows = self._execute(query, (limit,)).fetchall()
+        else:
+            rows = self._execute(query).fetchall()
 
-            if with_gender:
-                return [{'name': row['name'], 'gender': row['gender']} for row in rows]
-            else:
-                return [row['name'] for row in rows]
-        finally:
-            conn.close()
+        if with_gender:
+            return [{'name': row['name'], 'gender': row['gender']} for row in rows]
+        else:
+            return [row['name'] for row in rows]
 
     def load_ancient_names(self, limit: int = None) -> List[str]:
         """
@@ -83,19 +150,13 @@ class CorpusLoader:
         Returns:
             古代人名列表
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        try:
-            query = "SELECT name FROM ancient_names"
-            if limit:
-                query += " LIMIT ?"
-                cursor.execute(query, (limit,))
-            else:
-                cursor.execute(query)
-            return [row['name'] for row in cursor.fetchall()]
-        finally:
-            conn.close()
+        query = "SELECT name FROM ancient_names"
+        if limit:
+            query += " LIMIT ?"
+            cursor = self._execute(query, (limit,))
+        else:
+            cursor = self._execute(query)
+        return [row['name'] for row in cursor.fetchall()]
 
     def load_chengyu(self, limit: int = None) -> List[str]:
         """
@@ -107,19 +168,13 @@ class CorpusLoader:
         Returns:
             成语列表
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        try:
-            query = "SELECT idiom FROM idioms"
-            if limit:
-                query += " LIMIT ?"
-                cursor.execute(query, (limit,))
-            else:
-                cursor.execute(query)
-            return [row['idiom'] for row in cursor.fetchall()]
-        finally:
-            conn.close()
+        query = "SELECT idiom FROM idioms"
+        if limit:
+            query += " LIMIT ?"
+            cursor = self._execute(query, (limit,))
+        else:
+            cursor = self._execute(query)
+        return [row['idiom'] for row in cursor.fetchall()]
 
     def load_family_names(self, limit: int = None, origin: str = 'Chinese') -> List[Dict[str, any]]:
         """
@@ -132,26 +187,20 @@ class CorpusLoader:
         Returns:
             姓氏字典列表 [{'name': '王', 'frequency': 9520, 'origin': 'Chinese'}, ...]
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        try:
-            query = "SELECT name, frequency, origin FROM family_names WHERE origin = ?"
-            params = [origin]
+        query = "SELECT name, frequency, origin FROM family_names WHERE origin = ?"
+        params = [origin]
 
-            if limit:
-                query += " ORDER BY frequency DESC LIMIT ?"
-                params.append(limit)
-            else:
-                query += " ORDER BY frequency DESC"
+        if limit:
+            query += " ORDER BY frequency DESC LIMIT ?"
+            params.append(limit)
+        else:
+            query += " ORDER BY frequency DESC"
 
-            cursor.execute(query, params)
-            return [
-                {'name': row['name'], 'frequency': row['frequency'], 'origin': row['origin']}
-                for row in cursor.fetchall()
-            ]
-        finally:
-            conn.close()
+        cursor = self._execute(query, params)
+        return [
+            {'name': row['name'], 'frequency': row['frequency'], 'origin': row['origin']}
+            for row in cursor.fetchall()
+        ]
 
     def load_english_names(self, gender: str = None, limit: int = None) -> List[Dict[str, str]]:
         """
@@ -164,30 +213,25 @@ class CorpusLoader:
         Returns:
             英文人名字典列表 [{'chinese': '约翰', 'english': 'John', 'gender': '男性'}, ...]
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        query = "SELECT chinese_name, english_name, gender FROM english_names"
+        params = []
 
-        try:
-            query = "SELECT chinese_name, english_name, gender FROM english_names"
-            params = []
+        if gender:
+            query += " WHERE gender = ?"
+            params.append(gender)
 
-            if gender:
-                query += " WHERE gender = ?"
-                params.append(gender)
-
-            if limit:
-                query += " LIMIT ?"
-                params.append(limit)
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
 
-            cursor.execute(query, params)
-            return [
-                {'chinese': row['chinese_name'], 'english': row['english_name'], 'gender': row['gender']}
-                for row in cursor.fetchall()
-            ]
-        finally:
-            conn.close()
+        cursor = self._execute(query, params)
+        return [
+            {'chinese': row['chinese_name'], 'english': row['english_name'], 'gender': row['gender']}
+            for row in cursor.fetchall()
+        ]
 
-    def get_random_names(self, count: int = 10, gender: str = None, style: str = 'modern') -> List[Dict[str, str]]:
+    def get_random_names(self, count: int = 10, gender: str = None, style: str = 'modern',
+                         dynasty: str = None) -> List[Dict[str, str]]:
         """
         随机获取人名
 
@@ -195,55 +239,46 @@ class CorpusLoader:
             count: 数量
             gender: 性别过滤 ('男', '女', None表示不过滤)
             style: 风格 ('modern'现代, 'ancient'古代)
+            dynasty: 朝代过滤（仅古代人名，且 ancient_names 有 dynasty 列时生效）
 
         Returns:
             人名字典列表
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        try:
-            if style == 'ancient':
-                # 古代人名没有性别标注
-                query = "SELECT name FROM ancient_names ORDER BY RANDOM() LIMIT ?"
-                cursor.execute(query, (count,))
-                return [{'name': row['name'], 'gender': '未知', 'style': 'ancient'} for row in cursor.fetchall()]
+        if style == 'ancient':
+            # 古代人名没有性别标注
+            if dynasty and self._has_column('ancient_names', 'dynasty'):
+                rowids = self._dynasty_sampler.sample(count, dynasty)
             else:
-                # 现代人名
-                query = "SELECT name, gender FROM chinese_names"
-                params = []
-
-                if gender:
-                    query += " WHERE gender = ?"
-                    params.append(gender)
-
-                query += " ORDER BY RANDOM() LIMIT ?"
-                params.append(count)
-
-                cursor.execute(query, params)
-                return [
-                    {'name': row['name'], 'gender': row['gender'], 'style': 'modern'}
-                    for row in cursor.fetchall()
-                ]
-        finally:
-            conn.close()
+                rowids = self._ancient_sampler.sample(count)
+            rows = fetch_rows_by_rowid(self._execute, 'ancient_names', ['name'], rowids)
+            return [{'name': row['name'], 'gender': '未知', 'style': 'ancient'} for row in rows]
+        else:
+            # 现代人名
+            rowids = self._modern_sampler.sample(count, gender if gender else ALL_ROWS)
+            rows = fetch_rows_by_rowid(self._execute, 'chinese_names', ['name', 'gender'], rowids)
+            return [
+                {'name': row['name'], 'gender': row['gender'], 'style': 'modern'}
+                for row in rows
+            ]
 
     def search_names_by_char(self, char: str, gender: str = None, limit: int = 20) -> List[Dict[str, str]]:
         """
         根据字符搜索人名
 
+        存在 name_char_postings 倒排表时（由 scripts/build_corpus_indexes.py 生成）走索引查询，
+        否则回退到 LIKE 扫描；两种方式均按 rowid 顺序返回相同结果
+
         Args:
-            char: 搜索的字符
+            char: 搜索的字符（也支持多字子串）
             gender: 性别过滤 ('男', '女')
             limit: 返回数量限制
 
         Returns:
             匹配的人名列表
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        try:
+        if self._can_use_char_postings(char):
+            rows = self._search_by_char_postings(char, gender, int(limit))
+        else:
             query = "SELECT name, gender FROM chinese_names WHERE name LIKE ?"
             params = [f'%{char}%']
 
@@ -251,13 +286,42 @@ class CorpusLoader:
                 query += " AND gender = ?"
                 params.append(gender)
 
-            query += " LIMIT ?"
+            query += " ORDER BY rowid LIMIT ?"
             params.append(int(limit))
 
-            cursor.execute(query, params)
-            return [{'name': row['name'], 'gender': row['gender']} for row in cursor.fetchall()]
-        finally:
-            conn.close()
+            rows = self._execute(query, params).fetchall()
+        return [{'name': row['name'], 'gender': row['gender']} for row in rows]
+
+    def _can_use_char_postings(self, text: str) -> bool:
+        # LIKE 通配符无法用倒排表精确表达，交给 LIKE 处理
+        if not text or '%' in text or '_' in text:
+            return False
+        return self._has_table(CHAR_POSTINGS_TABLE)
+
+    def _search_by_char_postings(self, text: str, gender: Optional[str], limit: int) -> List[sqlite3.Row]:
+        keys = {_like_key(ch) for ch in text}
+        if len(text) == 1:
+            # 单字：倒排表本身即为精确结果
+            anchor = keys.pop()
+            verify_sql, verify_params = "", []
+        else:
+            # 多字子串：从最稀有的字的倒排表出发，再用 LIKE 校验子串
+            char_index = self._get_char_index()
+            anchor = min(keys, key=lambda k: char_index.get(k, 0))
+            verify_sql, verify_params = " AND n.name LIKE ?", [f'%{text}%']
+
+        query = (
+            f"SELECT n.name, n.gender FROM {CHAR_POSTINGS_TABLE} p "
+            "JOIN chinese_names n ON n.rowid = p.name_rowid WHERE p.ch = ?"
+        )
+        params: List[Any] = [anchor]
+        if gender:
+            query += " AND p.gender = ?"
+            params.append(gender)
+        query += verify_sql + " ORDER BY p.name_rowid LIMIT ?"
+        params.extend(verify_params)
+        params.append(limit)
+        return self._execute(query, params).fetchall()
 
     def get_chengyu_for_naming(self, count: int = 10, category: str = None) -> List[Dict[str, str]]:
         """
@@ -270,140 +334,136 @@ class CorpusLoader:
         Returns:
             成语列表，包含成语和可提取的字
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        try:
-            query = "SELECT idiom, category FROM idioms"
-            params = []
-
-            if category:
-                query += " WHERE category = ?"
-                params.append(category)
-
-            query += " ORDER BY RANDOM() LIMIT ?"
-            params.append(int(count))
-
-            cursor.execute(query, params)
-
-            result = []
-            for row in cursor.fetchall():
-                chengyu = row['idiom']
-                if len(chengyu) == 4:  # 标准四字成语
-                    # 提取可用于取名的字（通常是后两个字）
-                    name_chars = chengyu[2:4]
-                    result.append({
-                        'chengyu': chengyu,
-                        'category': row['category'],
-                        'suggested_chars': name_chars,
-                        'full_chars': list(chengyu)
-                    })
-
-            return result
-        finally:
-            conn.close()
-
-    def get_stats(self) -> Dict[str, int]:
+        rowids = self._idiom_sampler.sample(int(count), category if category else ALL_ROWS)
+        rows = fetch_rows_by_rowid(self._execute, 'idioms', ['idiom', 'category'], rowids)
+
+        result = []
+        for row in rows:
+            chengyu = row['idiom']
+            if len(chengyu) == 4:  # 标准四字成语
+                # 提取可用于取名的字（通常是后两个字）
+                name_chars = chengyu[2:4]
+                result.append({
+                    'chengyu': chengyu,
+                    'category': row['category'],
+                    'suggested_chars': name_chars,
+                    'full_chars': list(chengyu)
+                })
+
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
         """
         获取语料库统计信息
 
         Returns:
             统计字典
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        try:
-            stats = {}
-
-            # 各表记录数
-            tables = [
-                ('chinese_names', '现代人名总数'),
-                ('ancient_names', '古代人名总数'),
-                ('family_names', '姓氏总数'),
-                ('idioms', '成语总数'),
-                ('japanese_names', '日文人名总数'),
-                ('english_names', '英文人名总数'),
-                ('relationships', '称呼关系总数')
-            ]
-
-            for table, label in tables:
-                cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                stats[label] = cursor.fetchone()[0]
-
-            # 中文人名性别分布
-            cursor.execute("SELECT gender, COUNT(*) FROM chinese_names GROUP BY gender")
-            for row in cursor.fetchall():
-                gender = row[0] or '未知'
-                stats[f'中文人名-{gender}'] = row[1]
-
-            # 英文人名性别分布
-            cursor.execute("SELECT gender, COUNT(*) FROM english_names GROUP BY gender")
-            for row in cursor.fetchall():
-                gender = row[0] or '未知'
-                stats[f'英文人名-{gender}'] = row[1]
-
-            # 数据库文件大小
-            db_size_mb = self.db_path.stat().st_size / (1024 * 1024)
-            stats['数据库大小(MB)'] = round(db_size_mb, 2)
-
-            return stats
-        finally:
-            conn.close()
+        stats = {}
+
+        # 各表记录数
+        tables = [
+            ('chinese_names', '现代人名总数'),
+            ('ancient_names', '古代人名总数'),
+            ('family_names', '姓氏总数'),
+            ('idioms', '成语总数'),
+            ('japanese_names', '日文人名总数'),
+            ('english_names', '英文人名总数'),
+            ('relationships', '称呼关系总数')
+        ]
+
+        for table, label in tables:
+            stats[label] = self.get_table_row_count(table)
+
+        # 中文人名性别分布
+        for row in self._execute("SELECT gender, COUNT(*) FROM chinese_names GROUP BY gender").fetchall():
+            gender = row[0] or '未知'
+            stats[f'中文人名-{gender}'] = row[1]
+
+        # 英文人名性别分布
+        for row in self._execute("SELECT gender, COUNT(*) FROM english_names GROUP BY gender").fetchall():
+            gender = row[0] or '未知'
+            stats[f'英文人名-{gender}'] = row[1]
+
+        # 数据库文件大小
+        db_size_mb = self.db_path.stat().st_size / (1024 * 1024)
+        stats['数据库大小(MB)'] = round(db_size_mb, 2)
+
+        # 连接复用情况
+        connection_stats = self._db.get_stats()
+        stats['数据库连接数'] = connection_stats['connections_opened']
+        stats['数据库查询数'] = connection_stats['queries_served']
+
+        # 表结构、行数与索引
+        stats['schema'] = self.get_schema()
+
+        return stats
 
     def name_exists(self, name: str) -> bool:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT COUNT(*) FROM chinese_names WHERE name = ?", (name,))
-            cnt1 = cursor.fetchone()[0]
-            cursor.execute("SELECT COUNT(*) FROM ancient_names WHERE name = ?", (name,))
-            cnt2 = cursor.fetchone()[0]
-            return (cnt1 + cnt2) > 0
-        finally:
-            conn.close()
+        cnt1 = self._execute("SELECT COUNT(*) FROM chinese_names WHERE name = ?", (name,)).fetchone()[0]
+        cnt2 = self._execute("SELECT COUNT(*) FROM ancient_names WHERE name = ?", (name,)).fetchone()[0]
+        return (cnt1 + cnt2) > 0
 
     def exists_modern(self, name: str) -> bool:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT COUNT(*) FROM chinese_names WHERE name = ?", (name,))
-            return cursor.fetchone()[0] > 0
-        finally:
-            conn.close()
+        return self._execute("SELECT COUNT(*) FROM chinese_names WHERE name = ?", (name,)).fetchone()[0] > 0
 
     def exists_ancient(self, name: str) -> bool:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT COUNT(*) FROM ancient_names WHERE name = ?", (name,))
-            return cursor.fetchone()[0] > 0
-        finally:
-            conn.close()
+        return self._execute("SELECT COUNT(*) FROM ancient_names WHERE name = ?", (name,)).fetchone()[0] > 0
+
+    def _get_char_index(self) -> Dict[str, int]:
+        """获取现代人名字符频次索引"""
+        if self._char_index is None:
+            with self._index_lock:
+                if self._char_index is None:
+                    rows = self._execute("SELECT name FROM chinese_names")
+                    self._char_index = _build_char_counter(row[0] for row in rows)
+        return self._char_index
+
+    def _get_dynasty_char_index(self) -> Dict[str, Dict[str, int]]:
+        """获取按朝代划分的古代人名字符频次索引"""
+        if self._dynasty_char_index is None:
+            with self._index_lock:
+                if self._dynasty_char_index is None:
+                    grouped: Dict[str, List[str]] = {}
+                    rows = self._execute("SELECT name, dynasty FROM ancient_names WHERE dynasty IS NOT NULL")
+                    for name, dynasty in rows:
+                        grouped.setdefault(dynasty, []).append(name)
+                    self._dynasty_char_index = {
+                        dynasty: _build_char_counter(names) for dynasty, names in grouped.items()
+                    }
+        return self._dynasty_char_index
 
     def char_presence_score(self, name: str) -> int:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            total = 0
-            for ch in name:
-                cursor.execute("SELECT COUNT(*) FROM chinese_names WHERE name LIKE ?", (f"%{ch}%",))
-                total += cursor.fetchone()[0]
-            return total
-        finally:
-            conn.close()
+        index = self._get_char_index()
+        return sum(index.get(_like_key(ch), 0) for ch in name)
+
+    def char_presence_scores(self, names: Iterable[str]) -> List[int]:
+        """批量计算字符出现分数（与逐个调用 char_presence_score 结果一致）"""
+        index = self._get_char_index()
+        return [sum(index.get(_like_key(ch), 0) for ch in name) for name in names]
 
     def get_surname_frequency(self, surname: str, origin: str = 'Chinese') -> int:
         if not surname:
             return 0
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT frequency FROM family_names WHERE name = ? AND origin = ?", (surname, origin))
-            row = cursor.fetchone()
-            return int(row['frequency']) if row else 0
-        finally:
-            conn.close()
+        row = self._execute(
+            "SELECT frequency FROM family_names WHERE name = ? AND origin = ?", (surname, origin)
+        ).fetchone()
+        return int(row['frequency']) if row else 0
+
+    def get_surname_frequencies(self, origin: str = 'Chinese') -> Dict[str, int]:
+        """获取某来源全部姓氏的频次表（首次调用时一次性加载并缓存）"""
+        frequencies = self._surname_frequencies.get(origin)
+        if frequencies is None:
+            with self._index_lock:
+                frequencies = self._surname_frequencies.get(origin)
+                if frequencies is None:
+                    rows = self._execute(
+                        "SELECT name, frequency FROM family_names WHERE origin = ? AND name IS NOT NULL",
+                        (origin,),
+                    )
+                    frequencies = {row['name']: int(row['frequency'] or 0) for row in rows}
+                    self._surname_frequencies[origin] = frequencies
+        return frequencies
     
     _ALLOWED_TABLES = frozenset([
         'chinese_names', 'ancient_names', 'family_names',
@@ -411,24 +471,55 @@ class CorpusLoader:
         'themed_names',
     ])
 
+    def _load_schema(self) -> Dict[str, Dict[str, Any]]:
+        schema: Dict[str, Dict[str, Any]] = {}
+        tables = [row[0] for row in self._execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )]
+        for table in tables:
+            quoted = '"' + table.replace('"', '""') + '"'
+            columns = [row['name'] for row in self._execute(f"PRAGMA table_info({quoted})")]
+            indexes = {}
+            for index_row in self._execute(f"PRAGMA index_list({quoted})").fetchall():
+                index_name = index_row['name']
+                quoted_index = '"' + index_name.replace('"', '""') + '"'
+                indexes[index_name] = [
+                    info['name'] for info in self._execute(f"PRAGMA index_info({quoted_index})")
+                ]
+            row_count = self._execute(f"SELECT COUNT(*) FROM {quoted}").fetchone()[0]
+            schema[table] = {'columns': columns, 'indexes': indexes, 'row_count': row_count}
+        return schema
+
+    def get_schema(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取数据库结构元数据（每个加载器实例只查询一次）
+
+        Returns:
+            {表名: {'columns': [列名], 'indexes': {索引名: [列名]}, 'row_count': 行数}}
+        """
+        if self._schema is None:
+            with self._index_lock:
+                if self._schema is None:
+                    self._schema = self._load_schema()
+        return self._schema
+
+    def get_table_row_count(self, table: str) -> int:
+        """获取表的行数（表不存在时为 0）"""
+        return self.get_schema().get(table, {}).get('row_count', 0)
+
+    def _has_table(self, table: str) -> bool:
+        return table in self.get_schema()
+
+    def _has_index(self, table: str, columns: Sequence[str]) -> bool:
+        """表上是否存在以 columns 为前缀列的索引"""
+        wanted = list(columns)
+        indexes = self.get_schema().get(table, {}).get('indexes', {})
+        return any(cols[:len(wanted)] == wanted for cols in indexes.values())
+
     def _has_column(self, table: str, column: str) -> bool:
         if table not in self._ALLOWED_TABLES:
             return False
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(f"PRAGMA table_info({table})")
-            cols = cursor.fetchall()
-            for c in cols:
-                try:
-                    if c['name'] == column:
-                        return True
-                except Exception:
-                    if len(c) > 1 and c[1] == column:
-                        return True
-            return False
-        finally:
-            conn.close()
+        return column in self.get_schema().get(table, {}).get('columns', [])
     
     def _normalize_dynasty(self, label: str) -> Optional[str]:
         if not label:
@@ -465,30 +556,114 @@ class CorpusLoader:
             return False
         if not self._has_column('ancient_names', 'dynasty'):
             return False
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT COUNT(*) FROM ancient_names WHERE name = ? AND dynasty = ?", (name, d))
-            return cursor.fetchone()[0] > 0
-        finally:
-            conn.close()
+        return self._execute(
+            "SELECT COUNT(*) FROM ancient_names WHERE name = ? AND dynasty = ?", (name, d)
+        ).fetchone()[0] > 0
     
+    def _select_existing(self, table: str, names: List[str], chunk_size: int,
+                         with_dynasty: bool = False) -> Dict[str, set]:
+        """查询表中存在的姓名，返回 {姓名: 朝代集合}"""
+        found: Dict[str, set] = {}
+        columns = "name, dynasty" if with_dynasty else "name"
+        for start in range(0, len(names), chunk_size):
+            chunk = names[start:start + chunk_size]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._execute(
+                f"SELECT DISTINCT {columns} FROM {table} WHERE name IN ({placeholders})", chunk
+            )
+            for row in rows:
+                dynasties = found.setdefault(row[0], set())
+                if with_dynasty:
+                    dynasties.add(row[1])
+        return found
+
+    @staticmethod
+    def _resolve_with_index(index: Optional[MembershipIndex], names: List[str],
+                            result: Dict[str, Dict[str, bool]], flag: str) -> List[str]:
+        """用成员索引确定结果，返回仍需 SQLite 确认的姓名"""
+        if index is None:
+            return list(names)
+        pending = []
+        for n in names:
+            answer = index.check(n)
+            if answer is None:
+                pending.append(n)
+            else:
+                result[n][flag] = answer
+        return pending
+
+    def lookup_names(self, names: Iterable[str], dynasty: Optional[str] = None,
+                     chunk_size: int = 500) -> Dict[str, Dict[str, bool]]:
+        """
+        批量查询姓名在现代/古代/指定朝代人名库中的存在情况
+
+        优先使用成员缓存；缓存不可用或布隆过滤器判定"可能存在"时，
+        每张表只执行一次 WHERE name IN (...) 查询（超过 chunk_size 时分批）
+
+        Args:
+            names: 待查询的姓名
+            dynasty: 朝代（可选，支持英文或中文标签）
+            chunk_size: 每条 IN 查询的参数数量上限
+
+        Returns:
+            {姓名: {'modern': bool, 'ancient': bool, 'in_dynasty': bool}}
+        """
+        unique = list(dict.fromkeys(n for n in names if n))
+        result = {n: {'modern': False, 'ancient': False, 'in_dynasty': False} for n in unique}
+        if not unique:
+            return result
+
+        d = self._normalize_dynasty(dynasty) if dynasty else None
+        check_dynasty = bool(d) and self._has_column('ancient_names', 'dynasty')
+
+        indexes = self._membership.get() or {}
+        modern_index = indexes.get('modern')
+        ancient_index = indexes.get('ancient')
+        dynasty_index = indexes.get('dynasty')
+
+        modern_pending = self._resolve_with_index(modern_index, unique, result, 'modern')
+        ancient_pending = self._resolve_with_index(ancient_index, unique, result, 'ancient')
+        if check_dynasty:
+            for n in unique:
+                if not result[n]['ancient']:
+                    continue
+                answer = dynasty_index.check(dynasty_key(n, d)) if dynasty_index else None
+                if answer is None:
+                    ancient_pending.append(n)
+                else:
+                    result[n]['in_dynasty'] = answer
+
+        if modern_pending:
+            found = self._select_existing('chinese_names', modern_pending, chunk_size)
+            for n in modern_pending:
+                result[n]['modern'] = n in found
+                if modern_index:
+                    modern_index.record_confirmation(n in found)
+
+        if ancient_pending:
+            found = self._select_existing('ancient_names', ancient_pending, chunk_size, with_dynasty=check_dynasty)
+            for n in ancient_pending:
+                if not result[n]['ancient']:
+                    result[n]['ancient'] = n in found
+                    if ancient_index:
+                        ancient_index.record_confirmation(n in found)
+                if check_dynasty:
+                    result[n]['in_dynasty'] = d in found.get(n, ())
+
+        return result
+
+    def get_membership_stats(self) -> Dict[str, Any]:
+        """获取成员缓存统计（误判率、命中次数等）"""
+        return self._membership.get_stats()
+
     def dynasty_char_presence_score(self, name: str, dynasty: str) -> int:
         d = self._normalize_dynasty(dynasty)
         if not d:
             return 0
         if not self._has_column('ancient_names', 'dynasty'):
             return 0
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            total = 0
-            for ch in name:
-                cursor.execute("SELECT COUNT(*) FROM ancient_names WHERE name LIKE ? AND dynasty = ?", (f"%{ch}%", d))
-                total += cursor.fetchone()[0]
-            return total
-        finally:
-            conn.close()
+        index = self._get_dynasty_char_index().get(d, {})
+        return sum(index.get(_like_key(ch), 0) for ch in name)
 
 # 全局单例
 _corpus_loader = None
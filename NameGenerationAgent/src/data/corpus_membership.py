@@ -0,0 +1,226 @@
+"""
+语料库姓名成员缓存
+为 chinese_names、ancient_names 以及 (姓名, 朝代) 组合提供内存中的存在性判断：
+内存充足时使用 frozenset（精确），否则使用布隆过滤器（否定结果精确，肯定结果需 SQLite 确认）
+"""
+import hashlib
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+MODE_OFF = 'off'
+MODE_AUTO = 'auto'
+MODE_SET = 'set'
+MODE_BLOOM = 'bloom'
+
+# frozenset 模式下每个条目的估算内存（字符串对象 + 哈希表槽位）
+_SET_BYTES_PER_ENTRY = 120
+
+
+def dynasty_key(name: str, dynasty: str) -> str:
+    """(姓名, 朝代) 组合键"""
+    return f"{name}\x1f{dynasty}"
+
+
+class BuildTimeout(Exception):
+    """成员缓存构建超出时间预算"""
+
+
+class BloomFilter:
+    """简单的布隆过滤器（blake2b 双重哈希）"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, int(capacity))
+        error_rate = min(max(float(error_rate), 1e-6), 0.5)
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+
+class MembershipIndex:
+    """单个集合的成员索引，并记录命中统计"""
+
+    def __init__(self, kind: str, container: Any, entries: int, nbytes: int):
+        self.kind = kind
+        self._container = container
+        self.entries = entries
+        self.nbytes = nbytes
+        self._lock = threading.Lock()
+        self._stats = {
+            'lookups': 0,
+            'hits': 0,
+            'definite_negatives': 0,
+            'maybe': 0,
+            'false_positives': 0,
+        }
+
+    @property
+    def exact(self) -> bool:
+        return self.kind == MODE_SET
+
+    def check(self, key: str) -> Optional[bool]:
+        """
+        判断 key 是否存在
+
+        Returns:
+            True/False 为确定结果；None 表示布隆过滤器判定"可能存在"，需要 SQLite 确认
+        """
+        present = key in self._container
+        with self._lock:
+            self._stats['lookups'] += 1
+            if not present:
+                self._stats['definite_negatives'] += 1
+                return False
+            if self.exact:
+                self._stats['hits'] += 1
+                return True
+            self._stats['maybe'] += 1
+        return None
+
+    def record_confirmation(self, found: bool):
+        """记录一次"可能存在"经 SQLite 确认后的结果"""
+        with self._lock:
+            if found:
+                self._stats['hits'] += 1
+            else:
+                self._stats['false_positives'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        negatives = stats['definite_negatives'] + stats['false_positives']
+        stats.update({
+            'kind': self.kind,
+            'entries': self.entries,
+            'memory_bytes': self.nbytes,
+            'false_positive_rate': round(stats['false_positives'] / negatives, 6) if negatives else 0.0,
+        })
+        return stats
+
+
+class CorpusMembershipCache:
+    """语料库成员缓存（首次使用时构建）"""
+
+    def __init__(self, execute: Callable[..., Any], mode: str = MODE_AUTO,
+                 max_bytes: int = 256 * 1024 * 1024, error_rate: float = 0.01,
+                 max_build_seconds: float = 30.0, has_dynasty: Callable[[], bool] = lambda: True,
+                 row_count: Optional[Callable[[str], int]] = None):
+        """
+        初始化成员缓存
+
+        Args:
+            execute: 执行 SQL 的函数
+            mode: off / auto / set / bloom；auto 在估算内存不超过 max_bytes 时使用 set
+            max_bytes: 内存预算（字节）
+            error_rate: 布隆过滤器目标误判率
+            max_build_seconds: 构建时间预算，超时则放弃缓存并回退到 SQLite
+            has_dynasty: 判断 ancient_names 是否有 dynasty 列
+            row_count: 获取表行数的函数（默认执行 COUNT(*)）
+        """
+        self._execute = execute
+        self.mode = (mode or MODE_OFF).lower()
+        self.max_bytes = int(max_bytes)
+        self.error_rate = float(error_rate)
+        self.max_build_seconds = float(max_build_seconds)
+        self._has_dynasty = has_dynasty
+        self._row_count = row_count
+
+        self._indexes: Optional[Dict[str, MembershipIndex]] = None
+        self._state = 'disabled' if self.mode == MODE_OFF else 'pending'
+        self._error = ''
+        self._build_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[Dict[str, MembershipIndex]]:
+        """获取成员索引（modern / ancient / dynasty），不可用时返回 None"""
+        if self._state == 'pending':
+            with self._lock:
+                if self._state == 'pending':
+                    self._build()
+        return self._indexes
+
+    def _count(self, table: str) -> int:
+        if self._row_count is not None:
+            return self._row_count(table)
+        return self._execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def _build(self):
+        start = time.monotonic()
+        deadline = start + self.max_build_seconds
+        try:
+            sources = {
+                'modern': (self._count('chinese_names'), "SELECT name FROM chinese_names WHERE name IS NOT NULL"),
+                'ancient': (self._count('ancient_names'), "SELECT name FROM ancient_names WHERE name IS NOT NULL"),
+            }
+            if self._has_dynasty():
+                sources['dynasty'] = (
+                    sources['ancient'][0],
+                    "SELECT name, dynasty FROM ancient_names WHERE name IS NOT NULL AND dynasty IS NOT NULL",
+                )
+
+            kind = self.mode
+            if kind == MODE_AUTO:
+                estimated = sum(count for count, _ in sources.values()) * _SET_BYTES_PER_ENTRY
+                kind = MODE_SET if estimated <= self.max_bytes else MODE_BLOOM
+
+            indexes = {}
+            for label, (count, sql) in sources.items():
+                keys = self._iter_keys(sql, label == 'dynasty', deadline)
+                indexes[label] = self._build_index(kind, keys, count)
+            self._indexes = indexes
+            self._state = 'ready'
+        except Exception as e:
+            self._indexes = None
+            self._state = 'failed'
+            self._error = str(e)
+        finally:
+            self._build_seconds = round(time.monotonic() - start, 3)
+
+    def _iter_keys(self, sql: str, pairs: bool, deadline: float) -> Iterable[str]:
+        for i, row in enumerate(self._execute(sql)):
+            if i % 10000 == 0 and time.monotonic() > deadline:
+                raise BuildTimeout(f"成员缓存构建超过 {self.max_build_seconds} 秒")
+            yield dynasty_key(row[0], row[1]) if pairs else row[0]
+
+    def _build_index(self, kind: str, keys: Iterable[str], count: int) -> MembershipIndex:
+        if kind == MODE_BLOOM:
+            bloom = BloomFilter(count, self.error_rate)
+            for key in keys:
+                bloom.add(key)
+            return MembershipIndex(MODE_BLOOM, bloom, count, bloom.nbytes)
+        members = frozenset(keys)
+        return MembershipIndex(MODE_SET, members, len(members), len(members) * _SET_BYTES_PER_ENTRY)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取成员缓存状态与各索引的命中统计"""
+        stats: Dict[str, Any] = {
+            'mode': self.mode,
+            'state': self._state,
+            'build_seconds': self._build_seconds,
+            'max_bytes': self.max_bytes,
+            'error_rate': self.error_rate,
+        }
+        if self._error:
+            stats['error'] = self._error
+        if self._indexes:
+            stats['indexes'] = {label: index.get_stats() for label, index in self._indexes.items()}
+        return stats
@@ -0,0 +1,110 @@
+"""
+语料库随机采样器
+在内存中保存各分区的 rowid 集合，以 O(k) 代价均匀抽取 k 行，替代 ORDER BY RANDOM()
+"""
+import random
+import threading
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+RowidSet = Union[range, array]
+
+# 不做分区过滤时使用的键
+ALL_ROWS = object()
+
+
+def _compact_rowids(rowids: array) -> RowidSet:
+    """rowid 连续时压缩为 range，否则保留紧凑数组"""
+    if rowids and rowids[-1] - rowids[0] + 1 == len(rowids):
+        return range(rowids[0], rowids[-1] + 1)
+    return rowids
+
+
+class RowidSampler:
+    """按分区列保存 rowid 的均匀随机采样器（首次使用时加载）"""
+
+    def __init__(self, execute: Callable[..., Any], table: str,
+                 partition_column: Optional[str] = None):
+        """
+        初始化采样器
+
+        Args:
+            execute: 执行 SQL 的函数（通常为 CorpusLoader._execute）
+            table: 表名
+            partition_column: 分区列（如 gender、category），None 表示不分区
+        """
+        self._execute = execute
+        self.table = table
+        self.partition_column = partition_column
+        self._partitions: Optional[Dict[Any, RowidSet]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[Any, RowidSet]:
+        grouped: Dict[Any, array] = {ALL_ROWS: array('q')}
+        if self.partition_column:
+            rows = self._execute(
+                f"SELECT rowid, {self.partition_column} FROM {self.table} ORDER BY rowid"
+            )
+            for rowid, key in rows:
+                grouped[ALL_ROWS].append(rowid)
+                if key is not None:
+                    grouped.setdefault(key, array('q')).append(rowid)
+        else:
+            for (rowid,) in self._execute(f"SELECT rowid FROM {self.table} ORDER BY rowid"):
+                grouped[ALL_ROWS].append(rowid)
+        return {key: _compact_rowids(rowids) for key, rowids in grouped.items()}
+
+    def _get_partitions(self) -> Dict[Any, RowidSet]:
+        if self._partitions is None:
+            with self._lock:
+                if self._partitions is None:
+                    self._partitions = self._load()
+        return self._partitions
+
+    def size(self, partition: Any = ALL_ROWS) -> int:
+        """分区内的行数"""
+        return len(self._get_partitions().get(partition, ()))
+
+    def sample(self, k: int, partition: Any = ALL_ROWS) -> List[int]:
+        """
+        均匀随机抽取 k 个 rowid（不放回）
+
+        Args:
+            k: 抽取数量，超过分区大小时返回整个分区（随机顺序）
+            partition: 分区值，默认不过滤
+
+        Returns:
+            rowid 列表
+        """
+        rowids = self._get_partitions().get(partition, ())
+        k = max(0, min(int(k), len(rowids)))
+        return random.sample(rowids, k)
+
+
+def fetch_rows_by_rowid(execute: Callable[..., Any], table: str, columns: Sequence[str],
+                        rowids: Sequence[int], chunk_size: int = 500) -> List[Any]:
+    """
+    按 rowid 批量读取行，并保持 rowids 的顺序
+
+    Args:
+        execute: 执行 SQL 的函数
+        table: 表名
+        columns: 需要读取的列
+        rowids: rowid 列表
+        chunk_size: 每条 IN 查询的参数数量上限
+
+    Returns:
+        行列表（顺序与 rowids 一致）
+    """
+    by_rowid: Dict[int, Any] = {}
+    column_sql = ', '.join(columns)
+    for start in range(0, len(rowids), chunk_size):
+        chunk = list(rowids[start:start + chunk_size])
+        placeholders = ','.join('?' * len(chunk))
+        rows = execute(
+            f"SELECT rowid AS _rowid, {column_sql} FROM {table} WHERE rowid IN ({placeholders})",
+            chunk,
+        )
+        for row in rows:
+            by_rowid[row['_rowid']] = row
+    return [by_rowid[rowid] for rowid in rowids if rowid in by_rowid]
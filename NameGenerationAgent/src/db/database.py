@@ -7,7 +7,7 @@ from __future__ import annotations
 import os
 from typing import Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 Base = declarative_base()
@@ -65,3 +65,27 @@ def init_db(engine=None) -> None:
 
     active_engine = engine or get_engine()
     Base.metadata.create_all(bind=active_engine)
+    _add_missing_columns(active_engine)
+
+
+# Columns added after the first release; create_all does not alter existing tables.
+_ADDED_COLUMNS = {
+    "generation_records": {
+        "requested_api": "VARCHAR(100) NOT NULL DEFAULT ''",
+        "requested_model": "VARCHAR(200) NOT NULL DEFAULT ''",
+    },
+}
+
+
+def _add_missing_columns(engine) -> None:
+    inspector = inspect(engine)
+    for table, columns in _ADDED_COLUMNS.items():
+        if not inspector.has_table(table):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table)}
+        missing = [(name, ddl) for name, ddl in columns.items() if name not in existing]
+        if not missing:
+            continue
+        with engine.begin() as conn:
+            for name, ddl in missing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
@@ -76,6 +76,9 @@ class GenerationRecord(Base):
     request_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
     api_name: Mapped[str] = mapped_column(String(100), nullable=False, default="")
     model: Mapped[str] = mapped_column(String(200), nullable=False, default="")
+    # What the user asked for (empty = default routing); api_name/model above are what served it.
+    requested_api: Mapped[str] = mapped_column(String(100), nullable=False, default="", server_default="")
+    requested_model: Mapped[str] = mapped_column(String(200), nullable=False, default="", server_default="")
     names_json: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, default=utc_now, index=True
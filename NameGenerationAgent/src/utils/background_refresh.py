@@ -0,0 +1,81 @@
+"""
+后台刷新
+用于 stale-while-revalidate：先返回过期结果，再由后台线程重新生成并写回缓存
+"""
+import queue
+import threading
+from typing import Any, Callable, Dict, Hashable, Set
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class BackgroundRefresher:
+    """
+    按键去重的后台任务队列
+
+    同一个键在排队或执行期间再次提交会被忽略；队列满时丢弃新任务（下次命中过期数据时会再提交）。
+    工作线程为守护线程，首次提交时启动
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 64):
+        self.workers = max(1, workers)
+        self._queue: 'queue.Queue' = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._active: Set[Hashable] = set()
+        self._threads = []
+        self.reset_stats()
+
+    def submit(self, key: Hashable, func: Callable[[], Any]) -> bool:
+        """提交刷新任务，返回是否已入队"""
+        with self._lock:
+            if key in self._active:
+                self._stats['deduplicated'] += 1
+                return False
+            try:
+                self._queue.put_nowait((key, func))
+            except queue.Full:
+                self._stats['dropped'] += 1
+                return False
+            self._active.add(key)
+            self._stats['submitted'] += 1
+            self._ensure_workers()
+        return True
+
+    def _ensure_workers(self):
+        self._threads = [t for t in self._threads if t.is_alive()]
+        for index in range(len(self._threads), self.workers):
+            thread = threading.Thread(target=self._run, name=f"cache-refresh-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            key, func = self._queue.get()
+            outcome = 'failed'
+            try:
+                func()
+                outcome = 'completed'
+            except Exception as e:
+                logger.warning(f"后台刷新失败 {key}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._active.discard(key)
+                    self._stats[outcome] += 1
+                self._queue.task_done()
+
+    def join(self):
+        """等待已提交的任务全部完成"""
+        self._queue.join()
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {'submitted': 0, 'deduplicated': 0, 'dropped': 0, 'completed': 0, 'failed': 0}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._active)
+        stats['workers'] = self.workers
+        return stats
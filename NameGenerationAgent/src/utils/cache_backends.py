@@ -0,0 +1,725 @@
+"""
+缓存存储后端
+CacheManager 通过统一接口读写条目，可选：
+- sqlite: SQLite（WAL）单表存储，每次写入只影响一行，按需读取
+- log: 追加写日志文件，首次访问时回放，垃圾比例过高时原子替换压缩
+- json: 旧版整文件 JSON 存储（兼容保留）
+- memory: 纯内存，不落盘
+内存类后端使用 cache_eviction 中的 O(1) 淘汰结构与过期堆；SQLite 后端使用带索引的列。
+值可以是可 JSON 序列化的对象，也可以是编码后的字节串（见 cache_codec）：
+SQLite 存为 BLOB，内存后端原样保存，文件类后端以 base64 包装
+"""
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .cache_eviction import (
+    POLICY_FIFO, POLICY_LFU, POLICY_LRU, ExpiryHeap, create_eviction_policy,
+)
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# (值, 写入时间戳)
+CacheEntry = Tuple[Any, float]
+
+
+# 文件类后端中字节串值的包装键
+_BYTES_KEY = '__b64__'
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return {_BYTES_KEY: base64.b64encode(value).decode('ascii')}
+    return value
+
+
+def _from_json(value: Any) -> Any:
+    if isinstance(value, dict) and len(value) == 1 and _BYTES_KEY in value:
+        return base64.b64decode(value[_BYTES_KEY])
+    return value
+
+
+class CacheBackend:
+    """缓存后端接口"""
+
+    name = 'base'
+    # 是否可被多个进程同时使用（为 True 时 CacheManager 会在其前面加进程内 L1）
+    shared = False
+
+    def __init__(self, path: str, policy: str = POLICY_FIFO):
+        self.path = path
+        self.policy = (policy or POLICY_FIFO).lower()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """读取条目（计入淘汰策略的访问记录），不存在时返回 None"""
+        raise NotImplementedError
+
+    def contains(self, key: str) -> bool:
+        """是否存在该键（不计入访问记录）"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, timestamp: float) -> Optional[int]:
+        """写入（或覆盖）条目，返回写入的字节数（不序列化的后端返回 None）"""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> bool:
+        """删除条目，返回是否存在"""
+        raise NotImplementedError
+
+    def clear(self):
+        """清空全部条目"""
+        raise NotImplementedError
+
+    def count(self, exact: bool = False) -> int:
+        """条目总数（exact 为 True 时不使用缓存的计数）"""
+        raise NotImplementedError
+
+    def count_expired(self, cutoff: float) -> int:
+        """写入时间早于 cutoff 的条目数"""
+        raise NotImplementedError
+
+    def purge_expired(self, cutoff: float) -> List[str]:
+        """删除写入时间早于 cutoff 的条目，返回被删除的键"""
+        raise NotImplementedError
+
+    def evict(self) -> Optional[str]:
+        """按淘汰策略淘汰一个条目，返回被淘汰的键"""
+        raise NotImplementedError
+
+    def items(self, since: float = 0.0) -> List[Tuple[str, Any, float]]:
+        """写入时间不早于 since 的全部条目 (键, 值, 写入时间)，按写入时间升序（不计入访问记录，用于快照）"""
+        raise NotImplementedError
+
+    def touch(self, hits: Dict[str, Tuple[int, float]]):
+        """补记在上层（L1）命中的访问（键 -> (次数, 最后访问时间)），使 LRU/LFU 顺序反映这些读取"""
+        for key, (count, _) in sorted(hits.items(), key=lambda item: item[1][1]):
+            for _ in range(count):
+                self.get(key)
+
+    def get_epoch(self) -> int:
+        """失效纪元：共享后端在 delete/clear 后递增，供各进程的 L1 判断是否需要清空"""
+        return 0
+
+    def bump_epoch(self):
+        """递增失效纪元"""
+
+    def flush(self):
+        """将缓冲数据落盘"""
+
+    def close(self):
+        """释放资源"""
+        self.flush()
+
+    def get_info(self) -> Dict[str, Any]:
+        """后端描述信息（用于统计）"""
+        return {'backend': self.name, 'cache_file': self.path, 'eviction_policy': self.policy}
+
+
+class _DictBackend(CacheBackend):
+    """以内存字典保存全部条目的后端基类（淘汰与过期清理均不遍历全部条目）"""
+
+    def __init__(self, path: str, policy: str = POLICY_FIFO):
+        super().__init__(path, policy)
+        self._entries: Dict[str, CacheEntry] = {}
+        self._eviction = create_eviction_policy(self.policy)
+        self._expiry = ExpiryHeap()
+
+    def _store(self, key: str, value: Any, timestamp: float):
+        self._entries[key] = (value, timestamp)
+        self._eviction.on_write(key)
+        self._expiry.push(key, timestamp)
+
+    def _discard(self, key: str) -> bool:
+        if self._entries.pop(key, None) is None:
+            return False
+        self._eviction.remove(key)
+        self._expiry.remove(key)
+        return True
+
+    def _reset(self):
+        self._entries.clear()
+        self._eviction.clear()
+        self._expiry.clear()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._eviction.on_read(key)
+        return entry
+
+    def contains(self, key: str) -> bool:
+        return key in self._entries
+
+    def count(self, exact: bool = False) -> int:
+        return len(self._entries)
+
+    def count_expired(self, cutoff: float) -> int:
+        return self._expiry.count_before(cutoff)
+
+    def purge_expired(self, cutoff: float) -> List[str]:
+        expired = self._expiry.pop_expired(cutoff)
+        for key in expired:
+            self.delete(key)
+        return expired
+
+    def evict(self) -> Optional[str]:
+        victim = self._eviction.victim()
+        if victim is not None:
+            self.delete(victim)
+        return victim
+
+    def items(self, since: float = 0.0) -> List[Tuple[str, Any, float]]:
+        entries = [(key, value, ts) for key, (value, ts) in self._entries.items() if ts >= since]
+        return sorted(entries, key=lambda entry: entry[2])
+
+
+class MemoryBackend(_DictBackend):
+    """纯内存后端（进程退出即丢失）"""
+
+    name = 'memory'
+
+    def set(self, key: str, value: Any, timestamp: float) -> Optional[int]:
+        self._store(key, value, timestamp)
+        return len(value) if isinstance(value, bytes) else None
+
+    def delete(self, key: str) -> bool:
+        return self._discard(key)
+
+    def clear(self):
+        self._reset()
+
+
+class JSONFileBackend(_DictBackend):
+    """旧版后端：启动时整体加载 JSON 文件，每 10 次写入整体重写一次"""
+
+    name = 'json'
+
+    def __init__(self, path: str, policy: str = POLICY_FIFO):
+        super().__init__(path, policy)
+        self._load()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    raw = json.load(f)
+                for key, data in raw.items():
+                    if isinstance(data, dict) and 'timestamp' in data:
+                        self._store(key, _from_json(data.get('value')), data['timestamp'])
+                    else:
+                        self._store(key, data, 0.0)
+                logger.info(f"加载缓存数据，共 {len(self._entries)} 条记录")
+            else:
+                logger.info("缓存文件不存在，创建新缓存")
+        except Exception as e:
+            logger.error(f"加载缓存失败: {str(e)}")
+            self._reset()
+
+    def set(self, key: str, value: Any, timestamp: float) -> Optional[int]:
+        self._store(key, value, timestamp)
+        if len(self._entries) % 10 == 0:
+            self.flush()
+        # 字节串值在文件中为 base64
+        return (len(value) + 2) // 3 * 4 if isinstance(value, bytes) else None
+
+    def get_info(self) -> Dict[str, Any]:
+        info = super().get_info()
+        info['stored_bytes'] = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return info
+
+    def delete(self, key: str) -> bool:
+        return self._discard(key)
+
+    def clear(self):
+        self._reset()
+        self.flush()
+
+    def flush(self):
+        try:
+            data = {key: {'value': _to_json(value), 'timestamp': ts} for key, (value, ts) in self._entries.items()}
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            logger.debug("缓存数据已保存")
+        except Exception as e:
+            logger.error(f"保存缓存失败: {str(e)}")
+
+
+class LogFileBackend(_DictBackend):
+    """
+    追加写日志后端
+
+    每次 set/delete 追加一行 JSON 记录（O(1)），首次访问时回放日志重建内存索引；
+    失效记录超过 compact_ratio × 有效条目时，先写临时文件并 fsync，再用 os.replace 原子替换，
+    任一步骤崩溃都只会留下完整的旧文件或新文件。回放时忽略崩溃造成的不完整末行
+    """
+
+    name = 'log'
+
+    def __init__(self, path: str, policy: str = POLICY_FIFO, compact_ratio: float = 1.0,
+                 compact_min_records: int = 1000, fsync: bool = False):
+        """
+        Args:
+            path: 日志文件路径
+            policy: 淘汰策略
+            compact_ratio: 失效记录数 / 有效条目数 超过该值时压缩
+            compact_min_records: 失效记录少于该值时不压缩
+            fsync: 每次写入后是否 fsync（更安全但更慢）
+        """
+        super().__init__(path, policy)
+        self.compact_ratio = float(compact_ratio)
+        self.compact_min_records = int(compact_min_records)
+        self.fsync = fsync
+        self._loaded = False
+        self._dead_records = 0
+        self._compactions = 0
+        self._file = None
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._replay()
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self._loaded = True
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        records = 0
+        valid_bytes = 0
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                try:
+                    record = json.loads(raw.decode('utf-8'))
+                except (ValueError, UnicodeDecodeError):
+                    # 崩溃留下的不完整末行：截断后继续追加
+                    break
+                valid_bytes += len(raw)
+                records += 1
+                if 'c' in record:
+                    self._reset()
+                elif 'd' in record:
+                    self._discard(record['k'])
+                else:
+                    self._store(record['k'], _from_json(record['v']), record['t'])
+        if valid_bytes < os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_bytes)
+            logger.warning(f"缓存日志末尾存在不完整记录，已截断: {self.path}")
+        self._dead_records = records - len(self._entries)
+        logger.info(f"回放缓存日志，共 {len(self._entries)} 条记录")
+
+    def _append(self, record: Dict[str, Any]) -> int:
+        line = _dumps(record) + '\n'
+        self._file.write(line)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        return len(line.encode('utf-8'))
+
+    def _maybe_compact(self):
+        if self._dead_records >= self.compact_min_records and \
+                self._dead_records > self.compact_ratio * max(1, len(self._entries)):
+            self.compact()
+
+    def compact(self):
+        """重写日志，只保留有效条目"""
+        with self._lock:
+            self._ensure_loaded()
+            tmp_path = f"{self.path}.compact"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for key, (value, ts) in self._entries.items():
+                    f.write(_dumps({'k': key, 'v': _to_json(value), 't': ts}) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._fsync_dir()
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self._dead_records = 0
+            self._compactions += 1
+
+    def _fsync_dir(self):
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        self._ensure_loaded()
+        with self._lock:
+            return super().get(key)
+
+    def contains(self, key: str) -> bool:
+        self._ensure_loaded()
+        return super().contains(key)
+
+    def set(self, key: str, value: Any, timestamp: float) -> Optional[int]:
+        self._ensure_loaded()
+        with self._lock:
+            if key in self._entries:
+                self._dead_records += 1
+            self._store(key, value, timestamp)
+            written = self._append({'k': key, 'v': _to_json(value), 't': timestamp})
+            self._maybe_compact()
+            return written
+
+    def delete(self, key: str) -> bool:
+        self._ensure_loaded()
+        with self._lock:
+            if not self._discard(key):
+                return False
+            # 被删除的旧记录和墓碑记录都是失效记录
+            self._dead_records += 2
+            self._append({'k': key, 'd': 1})
+            self._maybe_compact()
+            return True
+
+    def clear(self):
+        self._ensure_loaded()
+        with self._lock:
+            self._reset()
+            self.compact()
+
+    def count(self, exact: bool = False) -> int:
+        self._ensure_loaded()
+        return super().count(exact)
+
+    def count_expired(self, cutoff: float) -> int:
+        self._ensure_loaded()
+        return super().count_expired(cutoff)
+
+    def purge_expired(self, cutoff: float) -> List[str]:
+        self._ensure_loaded()
+        with self._lock:
+            return super().purge_expired(cutoff)
+
+    def evict(self) -> Optional[str]:
+        self._ensure_loaded()
+        with self._lock:
+            return super().evict()
+
+    def items(self, since: float = 0.0) -> List[Tuple[str, Any, float]]:
+        self._ensure_loaded()
+        with self._lock:
+            return super().items(since)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._loaded = False
+            self._reset()
+
+    def get_info(self) -> Dict[str, Any]:
+        info = super().get_info()
+        info.update({
+            'dead_records': self._dead_records,
+            'compactions': self._compactions,
+            'stored_bytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        })
+        return info
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    SQLite（WAL）后端，可由同一主机上的多个工作进程共享
+
+    每个条目一行，写入为单行 UPSERT；读取按主键查询，不在启动时加载全部数据。
+    写入时间、访问时间与访问次数列均带索引，过期清理与各策略的淘汰都走索引；
+    多语句操作在 BEGIN IMMEDIATE 事务中执行，由 SQLite 文件锁保证跨进程原子性。
+    条目数在首次需要时 COUNT 一次，之后随本实例的增删维护，并定期重新统计以纳入其它进程的写入；
+    值的总字节数保存在 cache_meta 中，随每次写入/删除在同一事务内增减，统计时不扫描整表
+    """
+
+    name = 'sqlite'
+    shared = True
+
+    # 每隔多少次本地写入重新统计条目数
+    COUNT_RESYNC_WRITES = 256
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            timestamp REAL NOT NULL,
+            accessed REAL NOT NULL DEFAULT 0,
+            hits INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS cache_meta (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+
+    _INDEXES = """
+        CREATE INDEX IF NOT EXISTS idx_cache_entries_timestamp ON cache_entries (timestamp);
+        CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries (accessed);
+        CREATE INDEX IF NOT EXISTS idx_cache_entries_hits ON cache_entries (hits, accessed);
+    """
+
+    # 各策略的淘汰顺序
+    _VICTIM_ORDER = {
+        POLICY_FIFO: 'timestamp',
+        POLICY_LRU: 'accessed',
+        POLICY_LFU: 'hits, accessed',
+    }
+
+    def __init__(self, path: str, policy: str = POLICY_FIFO, busy_timeout_ms: int = 5000):
+        super().__init__(path, policy)
+        if self.policy not in self._VICTIM_ORDER:
+            raise ValueError(f"不支持的缓存淘汰策略: {policy}")
+        self.busy_timeout_ms = int(busy_timeout_ms)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._count: Optional[int] = None
+        self._writes_since_count = 0
+        self._lock = threading.RLock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+                    conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
+                    conn.execute("PRAGMA journal_mode = WAL")
+                    conn.execute("PRAGMA synchronous = NORMAL")
+                    conn.executescript(self._SCHEMA)
+                    self._migrate(conn)
+                    conn.executescript(self._INDEXES)
+                    # 旧库没有字节数记录时统计一次
+                    if conn.execute("SELECT 1 FROM cache_meta WHERE name = 'stored_bytes'").fetchone() is None:
+                        conn.execute(
+                            "INSERT OR IGNORE INTO cache_meta (name, value) SELECT 'stored_bytes', "
+                            "COALESCE(SUM(LENGTH(CAST(value AS BLOB))), 0) FROM cache_entries"
+                        )
+                    self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        """为旧版表补充访问时间与访问次数列"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(cache_entries)")}
+        if 'accessed' not in columns:
+            conn.execute("ALTER TABLE cache_entries ADD COLUMN accessed REAL NOT NULL DEFAULT 0")
+            conn.execute("UPDATE cache_entries SET accessed = timestamp")
+        if 'hits' not in columns:
+            conn.execute("ALTER TABLE cache_entries ADD COLUMN hits INTEGER NOT NULL DEFAULT 0")
+
+    def _execute(self, sql: str, params: Tuple = ()) -> sqlite3.Cursor:
+        conn = self._connection()
+        with self._lock:
+            return conn.execute(sql, params)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """写事务：BEGIN IMMEDIATE 立即取得写锁，避免与其它进程交错"""
+        conn = self._connection()
+        with self._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._execute("SELECT value, timestamp FROM cache_entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.policy == POLICY_LRU:
+                self._execute("UPDATE cache_entries SET accessed = ? WHERE key = ?", (time.time(), key))
+            elif self.policy == POLICY_LFU:
+                self._execute(
+                    "UPDATE cache_entries SET hits = hits + 1, accessed = ? WHERE key = ?", (time.time(), key)
+                )
+        value = row[0]
+        return (value if isinstance(value, bytes) else json.loads(value)), row[1]
+
+    def contains(self, key: str) -> bool:
+        return self._execute("SELECT 1 FROM cache_entries WHERE key = ?", (key,)).fetchone() is not None
+
+    def set(self, key: str, value: Any, timestamp: float) -> Optional[int]:
+        encoded = value if isinstance(value, bytes) else _dumps(value)
+        size = len(encoded) if isinstance(encoded, bytes) else len(encoded.encode('utf-8'))
+        with self._transaction():
+            self._writes_since_count += 1
+            previous = self._execute(
+                "SELECT LENGTH(CAST(value AS BLOB)) FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if previous is None:
+                self._execute(
+                    "INSERT INTO cache_entries (key, value, timestamp, accessed, hits) VALUES (?, ?, ?, ?, 1)",
+                    (key, encoded, timestamp, timestamp),
+                )
+                if self._count is not None:
+                    self._count += 1
+            else:
+                self._execute(
+                    "UPDATE cache_entries SET value = ?, timestamp = ?, accessed = ?, hits = hits + 1 WHERE key = ?",
+                    (encoded, timestamp, timestamp, key),
+                )
+            self._add_stored_bytes(size - (previous[0] if previous else 0))
+        return size
+
+    def _add_stored_bytes(self, delta: int):
+        if delta:
+            self._execute("UPDATE cache_meta SET value = MAX(0, value + ?) WHERE name = 'stored_bytes'", (delta,))
+
+    def _delete_where(self, condition: str, params: Tuple) -> int:
+        """在事务内删除满足条件的条目并扣减字节数，返回删除的行数"""
+        size = self._execute(
+            f"SELECT COALESCE(SUM(LENGTH(CAST(value AS BLOB))), 0) FROM cache_entries WHERE {condition}", params
+        ).fetchone()[0]
+        rows = self._execute(f"DELETE FROM cache_entries WHERE {condition}", params).rowcount
+        self._add_stored_bytes(-size)
+        if rows and self._count is not None:
+            self._count = max(0, self._count - rows)
+        return rows
+
+    def delete(self, key: str) -> bool:
+        with self._transaction():
+            return self._delete_where("key = ?", (key,)) > 0
+
+    def clear(self):
+        with self._transaction():
+            self._execute("DELETE FROM cache_entries")
+            self._execute("UPDATE cache_meta SET value = 0 WHERE name = 'stored_bytes'")
+            self._count = 0
+
+    def count(self, exact: bool = False) -> int:
+        with self._lock:
+            if exact or self._count is None or self._writes_since_count >= self.COUNT_RESYNC_WRITES:
+                self._count = self._execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+                self._writes_since_count = 0
+            return self._count
+
+    def count_expired(self, cutoff: float) -> int:
+        return self._execute("SELECT COUNT(*) FROM cache_entries WHERE timestamp < ?", (cutoff,)).fetchone()[0]
+
+    def purge_expired(self, cutoff: float) -> List[str]:
+        # 先走索引只读检查，没有过期条目时不获取写锁
+        if self._execute("SELECT 1 FROM cache_entries WHERE timestamp < ? LIMIT 1", (cutoff,)).fetchone() is None:
+            return []
+        with self._transaction():
+            keys = [row[0] for row in self._execute(
+                "SELECT key FROM cache_entries WHERE timestamp < ?", (cutoff,)
+            )]
+            self._delete_where("timestamp < ?", (cutoff,))
+        return keys
+
+    def evict(self) -> Optional[str]:
+        with self._transaction():
+            row = self._execute(
+                f"SELECT key FROM cache_entries ORDER BY {self._VICTIM_ORDER[self.policy]} LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._delete_where("key = ?", (row[0],))
+            return row[0]
+
+    def items(self, since: float = 0.0) -> List[Tuple[str, Any, float]]:
+        rows = self._execute(
+            "SELECT key, value, timestamp FROM cache_entries WHERE timestamp >= ? ORDER BY timestamp", (since,)
+        ).fetchall()
+        return [(key, value if isinstance(value, bytes) else json.loads(value), ts) for key, value, ts in rows]
+
+    def touch(self, hits: Dict[str, Tuple[int, float]]):
+        if self.policy == POLICY_FIFO or not hits:
+            return
+        with self._transaction():
+            self._connection().executemany(
+                "UPDATE cache_entries SET hits = hits + ?, accessed = MAX(accessed, ?) WHERE key = ?",
+                [(count, accessed, key) for key, (count, accessed) in hits.items()],
+            )
+
+    def get_epoch(self) -> int:
+        row = self._execute("SELECT value FROM cache_meta WHERE name = 'epoch'").fetchone()
+        return row[0] if row else 0
+
+    def bump_epoch(self):
+        self._execute(
+            "INSERT INTO cache_meta (name, value) VALUES ('epoch', 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1"
+        )
+
+    def get_info(self) -> Dict[str, Any]:
+        info = super().get_info()
+        row = self._execute("SELECT value FROM cache_meta WHERE name = 'stored_bytes'").fetchone()
+        info['stored_bytes'] = row[0] if row else 0
+        return info
+
+    def flush(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                finally:
+                    self._conn = None
+                    self._count = None
+
+
+_BACKENDS = {
+    'sqlite': (SQLiteCacheBackend, 'cache.db'),
+    'log': (LogFileBackend, 'cache.log'),
+    'json': (JSONFileBackend, 'cache.json'),
+    'memory': (MemoryBackend, ''),
+}
+
+
+def create_cache_backend(name: str, cache_dir: str, cache_file: Optional[str] = None,
+                         policy: str = POLICY_FIFO) -> CacheBackend:
+    """
+    按名称创建缓存后端
+
+    Args:
+        name: sqlite / log / json / memory
+        cache_dir: 默认缓存目录
+        cache_file: 指定存储文件路径（可选）
+        policy: 淘汰策略（lru / fifo / lfu）
+
+    Returns:
+        缓存后端实例
+    """
+    backend_name = (name or 'sqlite').lower()
+    if backend_name not in _BACKENDS:
+        raise ValueError(f"不支持的缓存后端: {name}，可选: {', '.join(_BACKENDS)}")
+    backend_cls, default_file = _BACKENDS[backend_name]
+    if cache_file and backend_name != 'json' and cache_file.lower().endswith('.json'):
+        raise ValueError(
+            f"{cache_file} 是旧版 JSON 缓存文件，不能作为 {backend_name} 后端的存储；"
+            f"请设置 CACHE_BACKEND=json，或指定新的缓存文件（默认位置的 cache.json 会在启动时自动导入）"
+        )
+    path = cache_file or (os.path.join(cache_dir, default_file) if default_file else '')
+    return backend_cls(path, policy=policy)
+
+
+def available_backends() -> List[str]:
+    """可用的后端名称"""
+    return list(_BACKENDS)
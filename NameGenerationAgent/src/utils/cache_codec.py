@@ -0,0 +1,139 @@
+"""
+缓存值编码
+条目以紧凑字节串存储：2 字节头（格式 + 压缩方式）+ 正文。
+格式为紧凑 JSON 或 msgpack（需安装 msgpack），超过阈值时用 zlib 或 zstd（需安装 zstandard）压缩；
+解码只依赖头部，修改配置后旧条目仍可读取
+"""
+import json
+import zlib
+from typing import Any, Dict, Tuple
+
+from .logger import get_logger
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = get_logger(__name__)
+
+FORMAT_JSON = 'json'
+FORMAT_MSGPACK = 'msgpack'
+FORMAT_RAW = 'raw'  # 不编码，后端直接保存原始对象
+
+COMPRESSION_NONE = 'none'
+COMPRESSION_ZLIB = 'zlib'
+COMPRESSION_ZSTD = 'zstd'
+
+_FORMAT_TAGS = {FORMAT_JSON: b'J', FORMAT_MSGPACK: b'M'}
+_COMPRESSION_TAGS = {COMPRESSION_NONE: b'0', COMPRESSION_ZLIB: b'z', COMPRESSION_ZSTD: b's'}
+
+# 仅调试时需要保留在缓存中的字段
+DEBUG_ONLY_FIELDS = ('raw_response',)
+
+
+def json_bytes(value: Any) -> bytes:
+    """紧凑 JSON 编码（未压缩），也用于统计条目的原始大小"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def strip_debug_fields(result: Any, keep: bool = False) -> Any:
+    """去掉仅调试时需要的字段（如模型原始输出），keep 为 True 时原样返回"""
+    if keep or not isinstance(result, dict) or not any(f in result for f in DEBUG_ONLY_FIELDS):
+        return result
+    return {key: value for key, value in result.items() if key not in DEBUG_ONLY_FIELDS}
+
+
+def decode_value(blob: bytes) -> Any:
+    """按头部解码"""
+    fmt, compression, body = blob[:1], blob[1:2], blob[2:]
+    if compression == b'z':
+        body = zlib.decompress(body)
+    elif compression == b's':
+        if zstandard is None:
+            raise ValueError("缓存条目使用 zstd 压缩，但未安装 zstandard")
+        body = zstandard.ZstdDecompressor().decompress(body)
+    elif compression != b'0':
+        raise ValueError(f"未知的缓存压缩标记: {compression!r}")
+
+    if fmt == b'J':
+        return json.loads(body.decode('utf-8'))
+    if fmt == b'M':
+        if msgpack is None:
+            raise ValueError("缓存条目使用 msgpack 编码，但未安装 msgpack")
+        return msgpack.unpackb(body, raw=False)
+    raise ValueError(f"未知的缓存编码标记: {fmt!r}")
+
+
+class CacheCodec:
+    """缓存值编码器"""
+
+    def __init__(self, fmt: str = FORMAT_JSON, compression: str = COMPRESSION_ZLIB,
+                 min_bytes: int = 512, level: int = 6):
+        """
+        Args:
+            fmt: json / msgpack（未安装 msgpack 时退回 json）
+            compression: zlib / zstd（未安装 zstandard 时退回 zlib）/ none
+            min_bytes: 序列化后达到该大小才压缩
+            level: 压缩级别
+        """
+        fmt = (fmt or FORMAT_JSON).lower()
+        compression = (compression or COMPRESSION_NONE).lower()
+        if fmt not in _FORMAT_TAGS:
+            raise ValueError(f"不支持的缓存编码格式: {fmt}，可选: {', '.join(_FORMAT_TAGS)}/{FORMAT_RAW}")
+        if compression not in _COMPRESSION_TAGS:
+            raise ValueError(f"不支持的缓存压缩方式: {compression}，可选: {', '.join(_COMPRESSION_TAGS)}")
+        if fmt == FORMAT_MSGPACK and msgpack is None:
+            logger.warning("未安装 msgpack，缓存编码使用紧凑 JSON")
+            fmt = FORMAT_JSON
+        if compression == COMPRESSION_ZSTD and zstandard is None:
+            logger.warning("未安装 zstandard，缓存压缩使用 zlib")
+            compression = COMPRESSION_ZLIB
+
+        self.format = fmt
+        self.compression = compression
+        self.min_bytes = min_bytes
+        self.level = level
+        self._zstd = zstandard.ZstdCompressor(level=level) if compression == COMPRESSION_ZSTD else None
+
+    def encode(self, value: Any) -> Tuple[bytes, int]:
+        """编码，返回 (字节串, 紧凑 JSON 大小)；后者用于统计压缩比"""
+        if self.format == FORMAT_MSGPACK:
+            body = msgpack.packb(value, use_bin_type=True)
+            raw_size = len(json_bytes(value))
+        else:
+            body = json_bytes(value)
+            raw_size = len(body)
+
+        compression = COMPRESSION_NONE
+        if self.compression != COMPRESSION_NONE and len(body) >= self.min_bytes:
+            if self._zstd is not None:
+                packed = self._zstd.compress(body)
+            else:
+                packed = zlib.compress(body, self.level)
+            # 压缩无收益时保留原文
+            if len(packed) < len(body):
+                body, compression = packed, self.compression
+        return _FORMAT_TAGS[self.format] + _COMPRESSION_TAGS[compression] + body, raw_size
+
+    def decode(self, blob: bytes) -> Any:
+        return decode_value(blob)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'value_format': self.format,
+            'compression': self.compression,
+            'compress_min_bytes': self.min_bytes,
+        }
+
+
+def create_cache_codec(fmt: str, compression: str, min_bytes: int):
+    """按配置创建编码器，格式为 raw 时返回 None（不编码）"""
+    if (fmt or '').lower() == FORMAT_RAW:
+        return None
+    return CacheCodec(fmt, compression, min_bytes)
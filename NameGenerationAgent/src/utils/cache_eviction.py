@@ -0,0 +1,199 @@
+"""
+缓存淘汰与过期结构
+- 淘汰策略：lru（最近最少使用）/ fifo（按写入时间）/ lfu（最不常用），记录、删除、选出淘汰键均为 O(1)
+- 过期堆：按写入时间组织的最小堆，惰性删除，清理过期条目只触及真正过期的键
+"""
+import heapq
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+POLICY_LRU = 'lru'
+POLICY_FIFO = 'fifo'
+POLICY_LFU = 'lfu'
+
+
+class EvictionPolicy:
+    """淘汰策略接口"""
+
+    name = 'base'
+
+    def on_write(self, key: Hashable):
+        """写入（新增或覆盖）"""
+        raise NotImplementedError
+
+    def on_read(self, key: Hashable):
+        """命中读取"""
+
+    def remove(self, key: Hashable):
+        """键被删除"""
+        raise NotImplementedError
+
+    def victim(self) -> Optional[Hashable]:
+        """下一个应被淘汰的键（不删除）"""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class FIFOPolicy(EvictionPolicy):
+    """按写入时间淘汰：覆盖写入视为新写入，读取不影响顺序"""
+
+    name = POLICY_FIFO
+
+    def __init__(self):
+        self._order: 'OrderedDict[Hashable, None]' = OrderedDict()
+
+    def on_write(self, key: Hashable):
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def remove(self, key: Hashable):
+        self._order.pop(key, None)
+
+    def victim(self) -> Optional[Hashable]:
+        return next(iter(self._order), None)
+
+    def clear(self):
+        self._order.clear()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+class LRUPolicy(FIFOPolicy):
+    """最近最少使用：读取同样会把键移到队尾"""
+
+    name = POLICY_LRU
+
+    def on_read(self, key: Hashable):
+        if key in self._order:
+            self._order.move_to_end(key)
+
+
+class LFUPolicy(EvictionPolicy):
+    """最不常用：按访问次数分桶，同频次内按最久未使用淘汰（O(1) LFU）"""
+
+    name = POLICY_LFU
+
+    def __init__(self):
+        self._freq: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, 'OrderedDict[Hashable, None]'] = {}
+        self._min_freq = 0
+
+    def _bump(self, key: Hashable):
+        freq = self._freq[key]
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        self._freq[key] = freq + 1
+        self._buckets.setdefault(freq + 1, OrderedDict())[key] = None
+
+    def on_write(self, key: Hashable):
+        if key in self._freq:
+            self._bump(key)
+            return
+        self._freq[key] = 1
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_freq = 1
+
+    def on_read(self, key: Hashable):
+        if key in self._freq:
+            self._bump(key)
+
+    def remove(self, key: Hashable):
+        freq = self._freq.pop(key, None)
+        if freq is None:
+            return
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = min(self._buckets) if self._buckets else 0
+
+    def victim(self) -> Optional[Hashable]:
+        bucket = self._buckets.get(self._min_freq)
+        return next(iter(bucket), None) if bucket else None
+
+    def clear(self):
+        self._freq.clear()
+        self._buckets.clear()
+        self._min_freq = 0
+
+    def __len__(self) -> int:
+        return len(self._freq)
+
+
+_POLICIES = {
+    POLICY_LRU: LRUPolicy,
+    POLICY_FIFO: FIFOPolicy,
+    POLICY_LFU: LFUPolicy,
+}
+
+
+def create_eviction_policy(name: str) -> EvictionPolicy:
+    """按名称创建淘汰策略"""
+    policy_name = (name or POLICY_FIFO).lower()
+    if policy_name not in _POLICIES:
+        raise ValueError(f"不支持的缓存淘汰策略: {name}，可选: {', '.join(_POLICIES)}")
+    return _POLICIES[policy_name]()
+
+
+def available_policies() -> List[str]:
+    """可用的淘汰策略名称"""
+    return list(_POLICIES)
+
+
+class ExpiryHeap:
+    """
+    按写入时间排序的最小堆
+
+    覆盖写入时不删除旧堆项，而是在弹出时与当前时间戳比对后丢弃（惰性删除）；
+    失效堆项过多时重建堆，保证内存与有效条目数同阶
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, Hashable]] = []
+        self._current: Dict[Hashable, float] = {}
+
+    def push(self, key: Hashable, timestamp: float):
+        self._current[key] = timestamp
+        heapq.heappush(self._heap, (timestamp, key))
+        if len(self._heap) > 2 * len(self._current) + 64:
+            self._rebuild()
+
+    def remove(self, key: Hashable):
+        self._current.pop(key, None)
+
+    def pop_expired(self, cutoff: float) -> List[Hashable]:
+        """弹出写入时间早于 cutoff 的键（未过期时只检查堆顶，O(1)）"""
+        expired = []
+        heap = self._heap
+        while heap and heap[0][0] < cutoff:
+            timestamp, key = heapq.heappop(heap)
+            if self._current.get(key) == timestamp:
+                del self._current[key]
+                expired.append(key)
+        return expired
+
+    def count_before(self, cutoff: float) -> int:
+        """写入时间早于 cutoff 的有效键数量"""
+        return sum(1 for ts in self._current.values() if ts < cutoff)
+
+    def clear(self):
+        self._heap.clear()
+        self._current.clear()
+
+    def _rebuild(self):
+        self._heap = [(ts, key) for key, ts in self._current.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._current)
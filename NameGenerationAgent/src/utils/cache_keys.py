@@ -0,0 +1,59 @@
+"""
+生成请求的缓存键
+由规范化后的请求参数（描述、数量、风格、性别、年龄、姓氏、年代、模型）计算，
+与每次随机抽样示例的提示词无关，相同请求得到相同的键
+"""
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Any, Dict, Optional
+
+# 语义键前缀与版本（签名字段或规范化规则变化时递增版本）
+SEMANTIC_KEY_PREFIX = 'gen'
+SEMANTIC_KEY_VERSION = 'v1'
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_description(description: str, strip_punctuation: bool = True) -> str:
+    """
+    规范化描述文本
+
+    始终去除首尾空白；strip_punctuation 为 True 时还会做全角/半角统一（NFKC）、
+    英文小写，并去掉全部空白与标点
+    """
+    text = (description or '').strip()
+    if not strip_punctuation:
+        return text
+    text = unicodedata.normalize('NFKC', text).casefold()
+    text = _WHITESPACE.sub('', text)
+    return ''.join(ch for ch in text if not unicodedata.category(ch).startswith('P'))
+
+
+def build_request_signature(description: str, count: int, cultural_style: str = '',
+                            gender: str = '', age: str = '', surname: Optional[str] = None,
+                            era: Optional[str] = None, model: Optional[str] = None,
+                            strip_punctuation: bool = True) -> Dict[str, Any]:
+    """生成请求签名（仅包含影响生成结果的参数）"""
+    return {
+        'description': normalize_description(description, strip_punctuation),
+        'count': int(count),
+        'style': (cultural_style or '').strip().lower(),
+        'gender': (gender or '').strip().lower(),
+        'age': (age or '').strip().lower(),
+        'surname': (surname or '').strip(),
+        'era': (era or '').strip(),
+        'model': (model or '').strip(),
+    }
+
+
+def signature_digest(signature: Dict[str, Any]) -> str:
+    """签名的 sha1 摘要"""
+    payload = json.dumps(signature, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def semantic_cache_key(signature: Dict[str, Any], prefix: str = SEMANTIC_KEY_PREFIX) -> str:
+    """签名对应的缓存键，形如 gen:v1:<sha1>"""
+    return f"{prefix}:{SEMANTIC_KEY_VERSION}:{signature_digest(signature)}"
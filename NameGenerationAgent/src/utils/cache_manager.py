@@ -1,162 +1,415 @@
 """
 缓存管理工具
 """
-import json
 import os
+import threading
 import time
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, Tuple, Union
 from config.settings import Config
+from .cache_backends import CacheBackend, JSONFileBackend, MemoryBackend, create_cache_backend
+from .cache_codec import (
+    COMPRESSION_NONE, FORMAT_JSON, CacheCodec, create_cache_codec, decode_value, json_bytes,
+)
+from .cache_eviction import POLICY_LRU
+from .cache_metrics import CacheMetrics
+from .cache_snapshot import read_snapshot, write_snapshot
 from .logger import get_logger
 
 logger = get_logger(__name__)
 
+# 旧版 JSON 后端的默认文件名，升级到其他后端时自动导入
+LEGACY_JSON_FILE = 'cache.json'
+
+# L1 未命中标记（缓存值本身可能为 None）
+_MISSING = object()
+
+# 条目元数据的封装键；未携带元数据的条目（含旧条目）直接存储原值
+_META_KEY = '__cache_meta__'
+
+
+def _wrap(value: Any, latency_ms: Optional[float]) -> Any:
+    if latency_ms is None:
+        return value
+    return {_META_KEY: {'latency_ms': round(float(latency_ms), 3)}, 'value': value}
+
+
+def _unwrap(stored: Any) -> Tuple[Any, Optional[float]]:
+    if isinstance(stored, dict) and _META_KEY in stored and 'value' in stored:
+        return stored['value'], (stored[_META_KEY] or {}).get('latency_ms')
+    return stored, None
+
+
 class CacheManager:
-    """缓存管理器"""
-    
-    def __init__(self, cache_file: str = None):
-        self.cache_file = cache_file or os.path.join(Config.CACHE_DIR, 'cache.json')
-        self.cache_data = {}
+    """
+    缓存管理器（存储由可插拔后端负责，见 cache_backends）
+
+    所有操作在同一把可重入锁内完成，可被多个线程并发调用。
+    条目写入后 CACHE_TTL 秒内为新鲜数据；CACHE_MAX_STALE 大于 0 时，之后的这段时间内条目仍保留，
+    get_with_state 可返回这些过期数据（由调用方在后台刷新），超出后才真正删除。
+    后端为共享存储（SQLite）时，多个工作进程读写同一份缓存，并在其前面加一层进程内 L1：
+    L1 条目最多保留 CACHE_L1_TTL 秒；任一进程 delete/clear 后递增共享纪元，
+    其它进程最迟在 CACHE_L1_EPOCH_CHECK 秒后发现并清空自己的 L1
+    """
+
+    def __init__(self, cache_file: str = None, backend: Union[str, CacheBackend] = None,
+                 policy: str = None):
+        """
+        初始化缓存管理器
+
+        Args:
+            cache_file: 存储文件路径，默认按后端放在 Config.CACHE_DIR 下
+            backend: 后端名称（sqlite/log/json/memory）或后端实例，默认读取 Config.CACHE_BACKEND
+            policy: 淘汰策略（lru/fifo/lfu），默认读取 Config.CACHE_EVICTION_POLICY
+        """
         self.max_size = Config.MAX_CACHE_SIZE
         self.ttl = Config.CACHE_TTL
-        
+        self.max_stale = max(0, Config.CACHE_MAX_STALE)
+        self._lock = threading.RLock()
+
         # 确保缓存目录存在
         Config.ensure_directories()
-        
-        # 加载现有缓存
-        self._load_cache()
-    
-    def _load_cache(self):
-        """加载缓存数据"""
-        try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    self.cache_data = json.load(f)
-                logger.info(f"加载缓存数据，共 {len(self.cache_data)} 条记录")
-            else:
-                self.cache_data = {}
-                logger.info("缓存文件不存在，创建新缓存")
-        except Exception as e:
-            logger.error(f"加载缓存失败: {str(e)}")
-            self.cache_data = {}
-    
-    def _save_cache(self):
-        """保存缓存数据"""
+
+        if isinstance(backend, CacheBackend):
+            self.backend = backend
+        else:
+            self.backend = create_cache_backend(
+                backend or Config.CACHE_BACKEND, Config.CACHE_DIR, cache_file,
+                policy=policy or Config.CACHE_EVICTION_POLICY,
+            )
+        self.cache_file = self.backend.path
+
+        # 值编码（紧凑 JSON/msgpack + 超过阈值时压缩），raw 表示后端直接保存对象
+        self.codec = create_cache_codec(
+            Config.CACHE_VALUE_FORMAT, Config.CACHE_COMPRESSION, Config.CACHE_COMPRESS_MIN_BYTES
+        )
+
+        # 进程内 L1（仅共享后端启用）
+        self.l1_size = Config.CACHE_L1_SIZE
+        self.l1_ttl = min(Config.CACHE_L1_TTL, self.ttl)
+        self.l1_epoch_check = Config.CACHE_L1_EPOCH_CHECK
+        self.l1: Optional[MemoryBackend] = None
+        # L1 保存编码后的字节串，命中时重新解码：调用方修改返回的对象不会改动 L1，与共享存储保持一致
+        self._l1_codec = self.codec or CacheCodec(FORMAT_JSON, COMPRESSION_NONE)
+        if self.backend.shared and self.l1_size > 0 and self.l1_ttl > 0:
+            self.l1 = MemoryBackend('', policy=POLICY_LRU)
+        self._l1_epoch: Optional[int] = None
+        self._l1_checked_at = 0.0
+        # L1 命中的访问记录，批量补记到共享存储（淘汰前或积累过多时）
+        self._pending_touches: Dict[str, Tuple[int, float]] = {}
+
+        # 命中/未命中/过期/淘汰等计数（进程内）
+        self.metrics = CacheMetrics(Config.CACHE_KEY_PREFIX_SEPARATOR)
+
+        if cache_file is None and not isinstance(backend, CacheBackend):
+            self._import_legacy_json(os.path.join(Config.CACHE_DIR, LEGACY_JSON_FILE))
+
+    def _import_legacy_json(self, legacy_path: str) -> int:
+        """
+        升级兼容：默认位置存在旧版 cache.json 且当前后端不是 json 时，把其中未过期的条目导入新后端，
+        完成后重命名为 cache.json.imported（不再重复导入），返回导入的条目数
+        """
+        if not self.backend.path or self.backend.name == JSONFileBackend.name or not os.path.exists(legacy_path):
+            return 0
+        with self._lock:
+            entries = JSONFileBackend(legacy_path).items(since=self._expire_before())
+            imported = 0
+            for key, value, timestamp in reversed(entries):
+                if self.backend.contains(key):
+                    continue
+                if self._is_full():
+                    break
+                if self.codec is not None:
+                    stored = value if isinstance(value, bytes) else self.codec.encode(value)[0]
+                else:
+                    stored = decode_value(value) if isinstance(value, bytes) else value
+                self.backend.set(key, stored, timestamp)
+                imported += 1
+            self.backend.flush()
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache_data, f, ensure_ascii=False, indent=2)
-            logger.debug("缓存数据已保存")
-        except Exception as e:
-            logger.error(f"保存缓存失败: {str(e)}")
-    
-    def _is_expired(self, timestamp: float) -> bool:
-        """检查缓存是否过期"""
-        return time.time() - timestamp > self.ttl
-    
-    def _cleanup_expired(self):
-        """清理过期的缓存条目"""
-        current_time = time.time()
-        expired_keys = []
-        
-        for key, data in self.cache_data.items():
-            if isinstance(data, dict) and 'timestamp' in data:
-                if current_time - data['timestamp'] > self.ttl:
-                    expired_keys.append(key)
-        
-        for key in expired_keys:
-            del self.cache_data[key]
-        
-        if expired_keys:
-            logger.info(f"清理了 {len(expired_keys)} 个过期缓存条目")
-    
-    def _evict_oldest(self):
-        """淘汰最旧的缓存条目"""
-        if not self.cache_data:
+            os.replace(legacy_path, legacy_path + '.imported')
+        except OSError:
+            # 其它工作进程已完成导入
+            pass
+        logger.info(f"已从旧版缓存文件 {legacy_path} 导入 {imported} 个条目")
+        return imported
+
+    def _expire_before(self) -> float:
+        """写入时间早于该时间戳的条目视为过期（超出可返回过期数据的窗口，将被删除）"""
+        return time.time() - self.ttl - self.max_stale
+
+    def _stale_before(self) -> float:
+        """写入时间早于该时间戳的条目不再新鲜"""
+        return time.time() - self.ttl
+
+    def _sync_l1(self):
+        """共享纪元变化时清空 L1（按间隔节流检查）"""
+        now = time.monotonic()
+        if self._l1_epoch is not None and now - self._l1_checked_at < self.l1_epoch_check:
             return
-        
-        # 找到最旧的条目
-        oldest_key = min(
-            self.cache_data.keys(),
-            key=lambda k: self.cache_data[k].get('timestamp', 0)
-        )
-        
-        del self.cache_data[oldest_key]
-        logger.debug(f"淘汰最旧的缓存条目: {oldest_key}")
-    
-    def get(self, key: str) -> Optional[Any]:
-        """获取缓存数据"""
-        if key not in self.cache_data:
-            return None
-        
-        data = self.cache_data[key]
-        
+        epoch = self.backend.get_epoch()
+        if epoch != self._l1_epoch:
+            self.l1.clear()
+            self._l1_epoch = epoch
+        self._l1_checked_at = now
+
+    def _l1_get(self, key: str) -> Tuple[Any, Optional[float]]:
+        """返回 (值, 原始调用耗时)，未命中时值为 _MISSING"""
+        self._sync_l1()
+        entry = self.l1.get(key)
+        if entry is None:
+            return _MISSING, None
+        (blob, written_at), filled_at = entry
+        now = time.time()
+        if filled_at < now - self.l1_ttl or written_at < now - self.ttl:
+            self.l1.delete(key)
+            return _MISSING, None
+        count, _ = self._pending_touches.get(key, (0, 0.0))
+        self._pending_touches[key] = (count + 1, now)
+        if len(self._pending_touches) >= self.l1_size:
+            self._flush_touches()
+        return _unwrap(decode_value(blob))
+
+    def _flush_touches(self):
+        if self._pending_touches:
+            touches, self._pending_touches = self._pending_touches, {}
+            self.backend.touch(touches)
+
+    def _l1_put(self, key: str, stored: Any, written_at: float):
+        """stored 为写入后端的形式（已编码的字节串，或 raw 模式下的原始对象）"""
+        now = time.time()
+        self.l1.purge_expired(now - self.l1_ttl)
+        if not self.l1.contains(key) and self.l1.count() >= self.l1_size:
+            self.l1.evict()
+        blob = stored if isinstance(stored, bytes) else self._l1_codec.encode(stored)[0]
+        self.l1.set(key, (blob, written_at), now)
+
+    def _invalidate_shared(self):
+        """通知其它进程清空 L1"""
+        if self.backend.shared:
+            self.backend.bump_epoch()
+
+    def _cleanup_expired(self):
+        """清理过期的缓存条目（只处理已过期的条目，无过期时为 O(1)）"""
+        removed = self.backend.purge_expired(self._expire_before())
+        for key in removed:
+            self.metrics.record_expiration(key)
+        if removed:
+            logger.info(f"清理了 {len(removed)} 个过期缓存条目")
+
+    def _evict(self):
+        """按淘汰策略淘汰一个缓存条目"""
+        if self.l1 is not None:
+            self._flush_touches()
+        victim = self.backend.evict()
+        if victim is not None:
+            self.metrics.record_eviction(victim)
+            if self.l1 is not None:
+                self.l1.delete(victim)
+            logger.debug(f"淘汰缓存条目({self.backend.policy}): {victim}")
+
+    def _is_full(self) -> bool:
+        if self.backend.count() < self.max_size:
+            return False
+        # 共享后端的本地计数可能落后于其它进程的删除，淘汰前重新统计
+        return not self.backend.shared or self.backend.count(exact=True) >= self.max_size
+
+    def _lookup(self, key: str, allow_stale: bool) -> Tuple[Any, bool]:
+        """返回 (值, 是否过期)，未命中时值为 _MISSING"""
+        if self.l1 is not None:
+            value, latency_ms = self._l1_get(key)
+            if value is not _MISSING:
+                self.metrics.record_hit(key, latency_ms, l1=True)
+                logger.debug(f"从L1缓存获取数据: {key}")
+                return value, False
+
+        entry = self.backend.get(key)
+        if entry is None:
+            self.metrics.record_miss(key)
+            return _MISSING, False
+
+        stored, timestamp = entry
+
         # 检查是否过期
-        if isinstance(data, dict) and 'timestamp' in data:
-            if self._is_expired(data['timestamp']):
-                del self.cache_data[key]
-                logger.debug(f"缓存条目 {key} 已过期，已删除")
-                return None
-        
-        logger.debug(f"从缓存获取数据: {key}")
-        return data.get('value') if isinstance(data, dict) else data
-    
-    def set(self, key: str, value: Any):
-        """设置缓存数据"""
-        # 清理过期条目
-        self._cleanup_expired()
-        
-        # 如果缓存已满，淘汰最旧的条目
-        if len(self.cache_data) >= self.max_size:
-            self._evict_oldest()
-        
-        # 存储数据
-        self.cache_data[key] = {
-            'value': value,
-            'timestamp': time.time()
-        }
-        
-        logger.debug(f"缓存数据: {key}")
-        
-        # 定期保存缓存
-        if len(self.cache_data) % 10 == 0:
-            self._save_cache()
-    
+        if timestamp < self._expire_before():
+            self.backend.delete(key)
+            self.metrics.record_expiration(key)
+            self.metrics.record_miss(key)
+            logger.debug(f"缓存条目 {key} 已过期，已删除")
+            return _MISSING, False
+
+        stale = timestamp < self._stale_before()
+        if stale and not allow_stale:
+            self.metrics.record_miss(key)
+            return _MISSING, False
+
+        if self.l1 is not None and not stale:
+            self._l1_put(key, stored, timestamp)
+        if isinstance(stored, bytes):
+            stored = decode_value(stored)
+        value, latency_ms = _unwrap(stored)
+        self.metrics.record_hit(key, latency_ms, stale=stale)
+        logger.debug(f"从缓存获取{'过期' if stale else ''}数据: {key}")
+        return value, stale
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取缓存数据（仅新鲜数据）"""
+        with self._lock:
+            value, _ = self._lookup(key, allow_stale=False)
+            return None if value is _MISSING else value
+
+    def get_with_state(self, key: str) -> Tuple[Optional[Any], bool]:
+        """获取缓存数据，返回 (值, 是否过期)；过期数据仅在 CACHE_MAX_STALE 窗口内返回"""
+        with self._lock:
+            value, stale = self._lookup(key, allow_stale=True)
+            return (None, False) if value is _MISSING else (value, stale)
+
+    def set(self, key: str, value: Any, latency_ms: float = None):
+        """
+        设置缓存数据
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            latency_ms: 产生该值的上游调用耗时（毫秒），命中时计入节省的耗时
+        """
+        with self._lock:
+            # 清理过期条目
+            self._cleanup_expired()
+
+            # 如果缓存已满，按策略淘汰一个条目
+            if not self.backend.contains(key) and self._is_full():
+                self._evict()
+
+            # 存储数据（后端只写入这一条）
+            timestamp = time.time()
+            stored = _wrap(value, latency_ms)
+            if self.codec is not None:
+                stored, raw_size = self.codec.encode(stored)
+            else:
+                raw_size = len(json_bytes(stored))
+            written = self.backend.set(key, stored, timestamp)
+            self.metrics.record_set(key, written if written is not None else raw_size, raw_size)
+            if self.l1 is not None:
+                self._l1_put(key, stored, timestamp)
+
+            logger.debug(f"缓存数据: {key}")
+
     def delete(self, key: str) -> bool:
         """删除缓存数据"""
-        if key in self.cache_data:
-            del self.cache_data[key]
-            logger.debug(f"删除缓存条目: {key}")
-            return True
-        return False
-    
+        with self._lock:
+            if self.l1 is not None:
+                self.l1.delete(key)
+            if self.backend.delete(key):
+                self._invalidate_shared()
+                logger.debug(f"删除缓存条目: {key}")
+                return True
+            return False
+
     def clear(self):
         """清空所有缓存"""
-        self.cache_data.clear()
-        self._save_cache()
-        logger.info("已清空所有缓存")
-    
+        with self._lock:
+            self._pending_touches.clear()
+            if self.l1 is not None:
+                self.l1.clear()
+            self.backend.clear()
+            self._invalidate_shared()
+            logger.info("已清空所有缓存")
+
+    def flush(self):
+        """将缓存数据落盘"""
+        with self._lock:
+            if self.l1 is not None:
+                self._flush_touches()
+            self.backend.flush()
+
+    def close(self):
+        """关闭后端"""
+        with self._lock:
+            self.backend.close()
+
+    def snapshot(self, path: str) -> Dict[str, Any]:
+        """将未过期的条目（含可返回的过期数据）写入快照文件，返回 {'entries', 'bytes'}"""
+        with self._lock:
+            if self.l1 is not None:
+                self._flush_touches()
+            entries = self.backend.items(since=self._expire_before())
+        size = write_snapshot(path, entries)
+        logger.info(f"缓存快照已写入 {path}: {len(entries)} 个条目, {size} 字节")
+        return {'entries': len(entries), 'bytes': size}
+
+    def restore(self, path: str, overwrite: bool = False) -> Dict[str, Any]:
+        """
+        从快照文件恢复条目（保留原写入时间，已过期的跳过）
+
+        从最新的条目开始写入，缓存写满后停止，不为恢复淘汰现有条目。
+
+        Args:
+            path: 快照文件路径
+            overwrite: 是否覆盖缓存中已有的同名条目（默认保留现有条目）
+        """
+        entries = list(read_snapshot(path))
+        stats = {'restored': 0, 'existing': 0, 'expired': 0, 'dropped': 0}
+        with self._lock:
+            expire_before = self._expire_before()
+            for key, blob, timestamp in reversed(entries):
+                if timestamp < expire_before:
+                    stats['expired'] += 1
+                    continue
+                if self.backend.contains(key):
+                    if not overwrite:
+                        stats['existing'] += 1
+                        continue
+                    if self.l1 is not None:
+                        self.l1.delete(key)
+                elif self._is_full():
+                    stats['dropped'] += 1
+                    continue
+                self.backend.set(key, blob if self.codec is not None else decode_value(blob), timestamp)
+                stats['restored'] += 1
+            if overwrite and stats['restored']:
+                self._invalidate_shared()
+            self.backend.flush()
+        logger.info(f"从快照 {path} 恢复缓存: {stats}")
+        return stats
+
+    def reset_stats(self):
+        """清零命中/未命中等计数（不影响缓存内容）"""
+        with self._lock:
+            self.metrics.reset()
+
     def get_stats(self) -> Dict[str, Any]:
-        """获取缓存统计信息"""
-        current_time = time.time()
-        total_entries = len(self.cache_data)
-        expired_entries = 0
-        
-        for data in self.cache_data.values():
-            if isinstance(data, dict) and 'timestamp' in data:
-                if current_time - data['timestamp'] > self.ttl:
-                    expired_entries += 1
-        
-        return {
-            'total_entries': total_entries,
-            'expired_entries': expired_entries,
-            'active_entries': total_entries - expired_entries,
-            'max_size': self.max_size,
-            'ttl': self.ttl,
-            'cache_file': self.cache_file
-        }
-    
+        """获取缓存统计信息（条目数 + 命中率、节省耗时等计数，by_prefix 为按键前缀的分组）"""
+        with self._lock:
+            total_entries = self.backend.count(exact=True)
+            expired_entries = self.backend.count_expired(self._expire_before())
+            stale_entries = (self.backend.count_expired(self._stale_before()) - expired_entries
+                             if self.max_stale else 0)
+
+            stats = {
+                'total_entries': total_entries,
+                'expired_entries': expired_entries,
+                'active_entries': total_entries - expired_entries,
+                'stale_entries': stale_entries,
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'max_stale': self.max_stale,
+                'cache_file': self.cache_file,
+                'shared': self.backend.shared,
+            }
+            stats.update(self.backend.get_info())
+            stats.update(self.codec.describe() if self.codec is not None else {'value_format': 'raw'})
+            stats.update(self.metrics.snapshot())
+            if self.l1 is not None:
+                stats.update({
+                    'l1_entries': self.l1.count(),
+                    'l1_size': self.l1_size,
+                    'l1_ttl': self.l1_ttl,
+                })
+            return stats
+
     def __del__(self):
         """析构函数，保存缓存"""
         try:
-            self._save_cache()
+            self.backend.flush()
         except:
             pass
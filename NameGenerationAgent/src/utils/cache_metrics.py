@@ -0,0 +1,93 @@
+"""
+缓存指标
+统计命中/未命中/过期/淘汰/写入字节，以及命中所节省的上游调用耗时，并按键前缀分组
+"""
+from typing import Any, Dict
+
+# 没有前缀（不含分隔符）的键归入该组
+DEFAULT_PREFIX = 'default'
+
+_COUNTERS = ('hits', 'l1_hits', 'stale_hits', 'misses', 'expirations', 'evictions', 'sets',
+             'bytes_written', 'raw_bytes', 'hits_with_latency')
+
+
+def key_prefix(key: str, separator: str = ':') -> str:
+    """键前缀：第一个分隔符之前的部分"""
+    head, sep, _ = key.partition(separator)
+    return head if sep and head else DEFAULT_PREFIX
+
+
+class CacheMetrics:
+    """缓存计数器（调用方负责加锁）"""
+
+    def __init__(self, separator: str = ':'):
+        self.separator = separator
+        self.reset()
+
+    def reset(self):
+        """清零全部计数"""
+        self._totals = self._empty()
+        self._by_prefix: Dict[str, Dict[str, float]] = {}
+
+    @staticmethod
+    def _empty() -> Dict[str, float]:
+        counters: Dict[str, float] = {name: 0 for name in _COUNTERS}
+        counters['latency_saved_ms'] = 0.0
+        return counters
+
+    def _bump(self, key: str, name: str, amount: float = 1):
+        self._totals[name] += amount
+        prefix = key_prefix(key, self.separator)
+        bucket = self._by_prefix.get(prefix)
+        if bucket is None:
+            bucket = self._by_prefix[prefix] = self._empty()
+        bucket[name] += amount
+
+    def record_hit(self, key: str, latency_ms: float = None, l1: bool = False, stale: bool = False):
+        self._bump(key, 'hits')
+        if l1:
+            self._bump(key, 'l1_hits')
+        if stale:
+            self._bump(key, 'stale_hits')
+        if latency_ms is not None:
+            self._bump(key, 'hits_with_latency')
+            self._bump(key, 'latency_saved_ms', float(latency_ms))
+
+    def record_miss(self, key: str):
+        self._bump(key, 'misses')
+
+    def record_expiration(self, key: str = '', count: int = 1):
+        self._bump(key, 'expirations', count)
+
+    def record_eviction(self, key: str):
+        self._bump(key, 'evictions')
+
+    def record_set(self, key: str, size: int, raw_size: int = None):
+        """size 为实际写入的字节数，raw_size 为编码压缩前的紧凑 JSON 大小"""
+        self._bump(key, 'sets')
+        self._bump(key, 'bytes_written', size)
+        self._bump(key, 'raw_bytes', size if raw_size is None else raw_size)
+
+    @staticmethod
+    def _summarise(counters: Dict[str, float]) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {name: int(counters[name]) for name in _COUNTERS}
+        lookups = counters['hits'] + counters['misses']
+        summary.update({
+            'total_requests': int(lookups),
+            'hit_rate': round(counters['hits'] / lookups * 100, 2) if lookups else 0.0,
+            'compression_ratio': (
+                round(counters['raw_bytes'] / counters['bytes_written'], 3) if counters['bytes_written'] else 0.0
+            ),
+            'latency_saved_ms': round(counters['latency_saved_ms'], 3),
+            'avg_latency_saved_ms': (
+                round(counters['latency_saved_ms'] / counters['hits_with_latency'], 3)
+                if counters['hits_with_latency'] else 0.0
+            ),
+        })
+        return summary
+
+    def snapshot(self) -> Dict[str, Any]:
+        """汇总指标，by_prefix 为各前缀的同名指标"""
+        summary = self._summarise(self._totals)
+        summary['by_prefix'] = {prefix: self._summarise(c) for prefix, c in sorted(self._by_prefix.items())}
+        return summary
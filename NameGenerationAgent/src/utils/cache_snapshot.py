@@ -0,0 +1,84 @@
+"""
+缓存快照文件
+格式：8 字节头（魔数 NGCS + 版本 + 保留）后接 zlib 压缩流，流内为连续的定长头记录：
+写入时间（double）+ 键长度（uint16）+ 值长度（uint32）+ 键（UTF-8）+ 值（cache_codec 编码的字节串）。
+值直接沿用后端中已编码的字节串，恢复时无需重新序列化
+"""
+import os
+import struct
+import zlib
+from typing import Any, Iterator, List, Tuple
+
+from .cache_codec import COMPRESSION_NONE, FORMAT_JSON, CacheCodec
+
+SNAPSHOT_MAGIC = b'NGCS'
+SNAPSHOT_VERSION = 1
+
+_HEADER = SNAPSHOT_MAGIC + bytes([SNAPSHOT_VERSION]) + b'\0\0\0'
+_RECORD = struct.Struct('>dHI')
+_READ_CHUNK = 1 << 16
+
+# 后端中未编码的条目（CACHE_VALUE_FORMAT=raw 或旧条目）写入快照时使用的编码（外层整体压缩）
+_PLAIN_CODEC = CacheCodec(FORMAT_JSON, COMPRESSION_NONE)
+
+
+def encode_entry_value(value: Any) -> bytes:
+    """后端条目值转为快照中的字节串"""
+    return value if isinstance(value, bytes) else _PLAIN_CODEC.encode(value)[0]
+
+
+def write_snapshot(path: str, entries: List[Tuple[str, Any, float]], level: int = 6) -> int:
+    """
+    写入快照（先写临时文件再原子替换），返回文件大小
+
+    Args:
+        path: 快照文件路径
+        entries: (键, 后端条目值, 写入时间) 列表
+        level: zlib 压缩级别
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    compressor = zlib.compressobj(level)
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER)
+        for key, value, timestamp in entries:
+            key_bytes = key.encode('utf-8')
+            blob = encode_entry_value(value)
+            f.write(compressor.compress(_RECORD.pack(timestamp, len(key_bytes), len(blob)) + key_bytes + blob))
+        f.write(compressor.flush())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def read_snapshot(path: str) -> Iterator[Tuple[str, bytes, float]]:
+    """逐条读取快照，返回 (键, 编码后的值, 写入时间)"""
+    with open(path, 'rb') as f:
+        header = f.read(len(_HEADER))
+        if header[:4] != SNAPSHOT_MAGIC:
+            raise ValueError(f"不是缓存快照文件: {path}")
+        if header[4] != SNAPSHOT_VERSION:
+            raise ValueError(f"不支持的缓存快照版本: {header[4]}")
+
+        decompressor = zlib.decompressobj()
+        buffer = b''
+        while True:
+            chunk = f.read(_READ_CHUNK)
+            buffer += decompressor.decompress(chunk) if chunk else decompressor.flush()
+            offset = 0
+            while len(buffer) - offset >= _RECORD.size:
+                timestamp, key_len, value_len = _RECORD.unpack_from(buffer, offset)
+                key_start = offset + _RECORD.size
+                end = key_start + key_len + value_len
+                if len(buffer) < end:
+                    break
+                key = buffer[key_start:key_start + key_len].decode('utf-8')
+                yield key, buffer[key_start + key_len:end], timestamp
+                offset = end
+            buffer = buffer[offset:]
+            if not chunk:
+                break
+        if buffer or not decompressor.eof:
+            raise ValueError(f"缓存快照文件不完整: {path}")
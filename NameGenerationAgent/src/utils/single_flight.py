@@ -0,0 +1,95 @@
+"""
+请求合并（single-flight）
+同一个键同时只执行一次调用，并发的相同请求等待该调用完成后共享其结果
+"""
+import copy
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _Flight:
+    """一次进行中的调用"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    进程内的请求合并器
+
+    第一个到达的请求执行调用，其余相同键的请求最多等待 max_wait 秒：
+    等到结果时得到结果的深拷贝（调用方可自由修改），超时则自行调用；
+    max_wait 小于等于 0 时不合并
+    """
+
+    def __init__(self, max_wait: float = 30.0):
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._waiting = 0
+        self.reset_stats()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """执行或等待 func，返回 (结果, 是否共享了其它请求的结果)"""
+        if self.max_wait <= 0:
+            return func(), False
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats['leaders'] += 1
+            else:
+                self._waiting += 1
+
+        if leader:
+            try:
+                flight.result = func()
+                return flight.result, False
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                with self._lock:
+                    if self._flights.get(key) is flight:
+                        del self._flights[key]
+                flight.done.set()
+
+        started = time.perf_counter()
+        finished = flight.done.wait(self.max_wait)
+        waited_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._waiting -= 1
+            self._stats['wait_ms'] += waited_ms
+            self._stats['coalesced' if finished else 'wait_timeouts'] += 1
+            if finished and flight.error is not None:
+                self._stats['shared_errors'] += 1
+
+        if not finished:
+            return func(), False
+        if flight.error is not None:
+            raise flight.error
+        return copy.deepcopy(flight.result), True
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {'leaders': 0, 'coalesced': 0, 'wait_timeouts': 0, 'shared_errors': 0, 'wait_ms': 0.0}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """leaders 为实际发起的调用数，coalesced 为合并到其它调用上的请求数"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._flights)
+            stats['waiting'] = self._waiting
+        followers = stats['coalesced'] + stats['wait_timeouts']
+        stats['avg_wait_ms'] = round(stats['wait_ms'] / followers, 3) if followers else 0.0
+        stats['wait_ms'] = round(stats['wait_ms'], 3)
+        stats['max_wait'] = self.max_wait
+        return stats
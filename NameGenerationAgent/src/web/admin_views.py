@@ -10,6 +10,7 @@ from functools import wraps
 from flask import (
     Blueprint,
     abort,
+    jsonify,
     redirect,
     render_template,
     request,
@@ -69,6 +70,18 @@ def admin_required(func):
     return wrapped
 
 
+def require_admin(func):
+    """JSON 接口的管理员校验：未登录后台管理员时返回 403（页面路由使用 admin_required 跳转登录）"""
+
+    @wraps(func)
+    def wrapped(*args, **kwargs):
+        if not _current_admin_user():
+            return jsonify({"success": False, "error": "需要管理员权限"}), 403
+        return func(*args, **kwargs)
+
+    return wrapped
+
+
 def _parse_date(value: str, end_of_day: bool = False):
     raw = (value or "").strip()
     if not raw:
@@ -5,6 +5,7 @@ Flask Web ?????
 import os
 import sys
 from datetime import datetime
+from functools import wraps
 from urllib.parse import urlparse
 
 from flask import Flask, jsonify, request, session
@@ -166,6 +167,18 @@ def get_record_service():
         return None
 
 
+def get_corpus_loader():
+    """Get corpus loader with delayed import."""
+    try:
+        from src.data.corpus_loader import get_corpus_loader as _get_corpus_loader
+
+        return _get_corpus_loader()
+    except Exception as e:
+        logger = get_logger()
+        logger.warning(f"corpus loader unavailable: {str(e)}")
+        return None
+
+
 def extract_bearer_token():
     """Extract token from Authorization header or request body."""
     auth_header = request.headers.get("Authorization", "")
@@ -274,13 +287,22 @@ def add_cors_headers(response):
     return response
 
 try:
-    from src.web.admin_views import admin_bp
+    from src.web.admin_views import admin_bp, require_admin
 
     app.register_blueprint(admin_bp)
 except Exception as e:
     logger = get_logger()
     logger.warning(f"admin blueprint disabled: {str(e)}")
 
+    def require_admin(func):
+        """后台不可用时管理员接口一律拒绝"""
+
+        @wraps(func)
+        def denied(*args, **kwargs):
+            return jsonify({"success": False, "error": "需要管理员权限"}), 403
+
+        return denied
+
 
 @app.route("/")
 def index():
@@ -295,6 +317,8 @@ def index():
             'models': '/models',
             'generate': '/generate',
             'stats': '/stats',
+            'corpus_stats': '/stats/corpus',
+            'stats_reset': '/stats/reset',
             'history': '/history/list',
             'favorites': '/favorites',
             'auth_register': '/auth/register',
@@ -365,6 +389,7 @@ def generate_names():
                 surname_weight=surname_weight,
                 era_weight=era_weight,
                 preferred_era=preferred_era,
+                user_id=current_user["id"],
             )
         else:
             mock_names = [
@@ -405,6 +430,8 @@ def generate_names():
                         api_name=result.get("api_name", ""),
                         model=result.get("model", ""),
                         names=result.get("names", []),
+                        requested_api=preferred_api or "",
+                        requested_model=model or "",
                     )
                 except Exception as save_error:
                     logger = get_logger()
@@ -546,6 +573,42 @@ def get_stats():
         return jsonify({"success": False, "error": f"获取统计信息失败: {str(e)}"}), 500
 
 
+@app.route("/stats/reset", methods=["POST"])
+@require_admin
+def reset_stats():
+    """清零缓存命中等计数（压测前调用，不清空缓存内容）；需要管理员登录"""
+    try:
+        name_generator = get_name_generator()
+        if not name_generator:
+            return jsonify({"success": False, "error": "姓名生成器不可用"}), 503
+
+        name_generator.reset_generation_stats()
+        return jsonify({"success": True})
+    except Exception as e:
+        logger = get_logger()
+        logger.error(f"重置统计信息失败: {str(e)}")
+        return jsonify({"success": False, "error": f"重置统计信息失败: {str(e)}"}), 500
+
+
+@app.route("/stats/corpus")
+def get_corpus_stats():
+    """获取语料库成员缓存与连接统计"""
+    try:
+        corpus_loader = get_corpus_loader()
+        if not corpus_loader:
+            return jsonify({"success": False, "error": "语料库不可用"}), 503
+
+        return jsonify({
+            "success": True,
+            "membership": corpus_loader.get_membership_stats(),
+            "connections": corpus_loader.get_connection_stats(),
+        })
+    except Exception as e:
+        logger = get_logger()
+        logger.error(f"获取语料库统计失败: {str(e)}")
+        return jsonify({"success": False, "error": f"获取语料库统计失败: {str(e)}"}), 500
+
+
 @app.route("/history")
 def get_history():
     """??????????????"""
@@ -6,3 +6,68 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
+
+import sqlite3
+
+import pytest
+
+from config.settings import Config
+
+
+CORPUS_SCHEMA = """
+CREATE TABLE chinese_names (name TEXT, gender TEXT);
+CREATE TABLE ancient_names (name TEXT, dynasty TEXT);
+CREATE TABLE family_names (name TEXT, frequency INTEGER, origin TEXT);
+CREATE TABLE idioms (idiom TEXT, category TEXT);
+CREATE TABLE japanese_names (name TEXT);
+CREATE TABLE english_names (chinese_name TEXT, english_name TEXT, gender TEXT);
+CREATE TABLE relationships (name TEXT);
+"""
+
+CHINESE_NAMES = [
+    ("林清扬", "男"), ("苏知远", "男"), ("顾明澈", "男"), ("林婉清", "女"),
+    ("苏雨晴", "女"), ("王清清", "女"), ("张伟", "男"), ("李娜", "女"),
+    ("Anna", "女"), ("ANdy", "男"), ("周明", None), ("", "男"),
+]
+
+ANCIENT_NAMES = [
+    ("李白", "唐"), ("杜甫", "唐"), ("白居易", "唐"), ("苏轼", "宋"),
+    ("苏辙", "宋"), ("李清照", "宋"), ("刘基", "明"), ("屈原", None),
+]
+
+FAMILY_NAMES = [
+    ("王", 9520, "Chinese"), ("李", 9500, "Chinese"), ("张", 9000, "Chinese"),
+    ("林", 3000, "Chinese"), ("苏", 1500, "Chinese"), ("田中", 800, "Japanese"),
+]
+
+IDIOMS = [
+    ("海阔天空", "通用"), ("志存高远", "男孩"), ("冰清玉洁", "女孩"),
+    ("温文尔雅", "通用"), ("一鸣惊人", "男孩"), ("秀外慧中", "女孩"), ("大器晚成啊", "通用"),
+]
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """把缓存与数据目录指向临时目录；需要额外 Config 的测试文件可覆盖该夹具并在其中调用它"""
+    monkeypatch.setattr(Config, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(Config, "DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def corpus_db(tmp_path):
+    """构建一个小型姓名语料库 SQLite 文件"""
+    db_path = tmp_path / "names_corpus.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(CORPUS_SCHEMA)
+    conn.executemany("INSERT INTO chinese_names (name, gender) VALUES (?, ?)", CHINESE_NAMES)
+    conn.executemany("INSERT INTO ancient_names (name, dynasty) VALUES (?, ?)", ANCIENT_NAMES)
+    conn.executemany("INSERT INTO family_names (name, frequency, origin) VALUES (?, ?, ?)", FAMILY_NAMES)
+    conn.executemany("INSERT INTO idioms (idiom, category) VALUES (?, ?)", IDIOMS)
+    conn.executemany(
+        "INSERT INTO english_names (chinese_name, english_name, gender) VALUES (?, ?, ?)",
+        [("约翰", "John", "男性"), ("玛丽", "Mary", "女性")],
+    )
+    conn.commit()
+    conn.close()
+    return db_path
@@ -0,0 +1,186 @@
+import json
+
+import src.api.unified_client as unified_client_module
+from config.settings import Config
+from src.api.adapters.base_adapter import APIException
+from src.api.router_strategy import AdaptiveRouterStrategy, get_router_strategy, route_model
+from src.utils.cache_manager import CacheManager
+
+
+class StubConfig:
+    def __init__(self, model):
+        self.model = model
+
+
+class StubAdapter:
+    def __init__(self, name, model="default-model", fail=False, names=True, served_model=None):
+        self.name = name
+        self.base_url = "https://example.com"
+        self.config = StubConfig(model)
+        self.fail = fail
+        self.names = names
+        self.served_model = served_model
+        self.calls = 0
+
+    def is_available(self):
+        return True
+
+    def generate_names(self, prompt, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise APIException(f"{self.name} down")
+        names = [{"name": "林清扬", "meaning": "寓意"}] if self.names else []
+        return {"success": True, "names": names, "api_name": self.name,
+                "model": self.served_model or kwargs.get("model") or self.config.model}
+
+
+def _adapters(*names):
+    return {name: StubAdapter(name) for name in names}
+
+
+def test_unseen_providers_keep_default_order():
+    router = AdaptiveRouterStrategy(["aistudio", "aliyun", "paiou"], exploration=0)
+    assert router.get_priority(_adapters("paiou", "aliyun", "aistudio")) == ["aistudio", "aliyun", "paiou"]
+
+
+def test_faster_and_more_reliable_provider_moves_first():
+    router = AdaptiveRouterStrategy(["aistudio", "aliyun", "paiou"], exploration=0)
+    adapters = _adapters("aistudio", "aliyun", "paiou")
+    for _ in range(5):
+        router.record("aistudio", "default-model", 8000, True, True)
+        router.record("aliyun", "default-model", 1500, True, True)
+        # 很快但经常失败或解析不出姓名
+        router.record("paiou", "default-model", 500, False, False)
+
+    assert router.get_priority(adapters) == ["aliyun", "aistudio", "paiou"]
+    # 指定的平台始终排在第一位
+    assert router.get_priority(adapters, preferred_api="paiou")[0] == "paiou"
+
+
+def test_parse_failures_raise_expected_cost():
+    router = AdaptiveRouterStrategy(exploration=0, alpha=0.5, prior_latency_ms=5000)
+    router.record("aliyun", "m", 1000, True, True)
+    router.record("paiou", "m", 1000, True, True)
+    router.record("paiou", "m", 1000, True, False)
+    assert router.expected_cost_ms("aliyun", "m") == 1000
+    # (1000 + 0.5 × 5000) / 0.5：半数结果无效，需要换平台重试
+    assert router.expected_cost_ms("paiou", "m") == 7000
+
+
+def test_statistics_are_kept_per_model():
+    router = AdaptiveRouterStrategy(["aliyun", "paiou"], exploration=0)
+    adapters = {"aliyun": StubAdapter("aliyun", "qwen-turbo"), "paiou": StubAdapter("paiou")}
+    router.record("aliyun", "qwen-max", 9000, True, True)
+    router.record("aliyun", "qwen-turbo", 500, True, True)
+    router.record("paiou", "default-model", 2000, True, True)
+
+    assert router.get_priority(adapters) == ["aliyun", "paiou"]
+    assert router.get_priority(adapters, "aliyun", {"model": "qwen-max"}) == ["aliyun", "paiou"]
+    assert router.expected_cost_ms("aliyun", "qwen-max") > router.expected_cost_ms("paiou", "default-model")
+
+
+def test_recorded_outcomes_reorder_requests_that_carry_a_model():
+    router = AdaptiveRouterStrategy(["aistudio", "aliyun"], exploration=0)
+    adapters = _adapters("aistudio", "aliyun")
+    context = {"model": "qwen-max"}
+    assert router.get_priority(adapters, None, context) == ["aistudio", "aliyun"]
+
+    # 未指定平台时请求中的模型转发给第一个平台，记录与排序使用同一个键
+    for _ in range(3):
+        router.record("aistudio", route_model(adapters["aistudio"], "qwen-max"), 9000, False, False)
+    assert router.get_priority(adapters, None, context) == ["aliyun", "aistudio"]
+
+
+def test_exploration_favours_rarely_tried_providers():
+    router = AdaptiveRouterStrategy(["aliyun", "paiou"], exploration=0.5)
+    for _ in range(50):
+        router.record("aliyun", "m", 1000, True, True)
+    router.record("paiou", "m", 1100, True, True)
+    assert router.expected_cost_ms("paiou", "m") < router.expected_cost_ms("aliyun", "m")
+
+
+def test_statistics_survive_restart(tmp_path):
+    path = str(tmp_path / "router_stats.json")
+    router = AdaptiveRouterStrategy(stats_file=path, save_every=3)
+    router.record("aliyun", "m", 1200, True, True)
+    router.record("paiou", "m", 300, False, False)
+    assert not (tmp_path / "router_stats.json").exists()
+    router.record("aliyun", "m", 800, True, True)
+
+    restored = AdaptiveRouterStrategy(stats_file=path)
+    assert restored.snapshot()["stats"] == router.snapshot()["stats"]
+    assert restored.snapshot()["total"] == 3
+
+    # 手工预置的统计不覆盖已有样本
+    assert restored.seed({"stats": [{"provider": "aliyun", "model": "m", "latency_ms": 1}]}) == 0
+    assert restored.seed({"stats": [{"provider": "openai", "latency_ms": 4000}]}) == 1
+
+
+def test_corrupt_stats_file_is_ignored(tmp_path):
+    path = tmp_path / "router_stats.json"
+    path.write_text("{not json", encoding="utf-8")
+    router = AdaptiveRouterStrategy(stats_file=str(path))
+    assert router.snapshot()["stats"] == []
+    assert router.save()
+    assert json.loads(path.read_text(encoding="utf-8"))["version"] == 1
+
+
+def test_factory_passes_adaptive_options():
+    router = get_router_strategy("adaptive", ["aliyun"], "aliyun=2", alpha=0.5, stats_file=None)
+    assert isinstance(router, AdaptiveRouterStrategy)
+    assert (router.alpha, router.weights) == (0.5, {"aliyun": 2.0})
+
+
+def test_unified_client_feeds_outcomes_to_adaptive_router(cache_dir, monkeypatch):
+    monkeypatch.setattr(Config, "ROUTER_STRATEGY", "adaptive")
+    monkeypatch.setattr(Config, "ROUTER_ADAPTIVE_EXPLORATION", 0)
+    monkeypatch.setattr(Config, "ROUTER_STATS_FILE", "")
+    adapters = {"aistudio": StubAdapter("aistudio", fail=True), "aliyun": StubAdapter("aliyun")}
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_adapters",
+        lambda self: setattr(self, "adapters", adapters),
+    )
+    client = unified_client_module.UnifiedAPIClient()
+    client.cache_manager = CacheManager(backend="memory")
+
+    assert isinstance(client.router_strategy, AdaptiveRouterStrategy)
+    assert client.generate_names(prompt="p1", count=1, use_cache=False)["api_name"] == "aliyun"
+    # 失败过的平台被排到后面，第二次请求不再先调用它
+    assert client.generate_names(prompt="p2", count=1, use_cache=False)["api_name"] == "aliyun"
+    assert adapters["aistudio"].calls == 1
+
+    routing = client.get_api_status()["aistudio"]["routing"]
+    assert routing[0]["error_rate"] == 1.0
+
+
+def test_unified_client_records_under_the_routed_model(cache_dir, monkeypatch):
+    monkeypatch.setattr(Config, "ROUTER_STRATEGY", "adaptive")
+    monkeypatch.setattr(Config, "ROUTER_ADAPTIVE_EXPLORATION", 0)
+    monkeypatch.setattr(Config, "ROUTER_STATS_FILE", "")
+    adapters = {
+        "aistudio": StubAdapter("aistudio", fail=True),
+        # 上游用降级模型完成了请求
+        "aliyun": StubAdapter("aliyun", served_model="qwen-turbo"),
+    }
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_adapters",
+        lambda self: setattr(self, "adapters", adapters),
+    )
+    client = unified_client_module.UnifiedAPIClient()
+    client.cache_manager = CacheManager(backend="memory")
+
+    client.generate_names(prompt="p1", count=1, use_cache=False, model="Qwen3-30B")
+    client.generate_names(prompt="p2", count=1, use_cache=False, model="Qwen3-30B")
+
+    keys = {(item["provider"], item["model"]) for item in client.router_strategy.snapshot()["stats"]}
+    assert keys == {("aistudio", "Qwen3-30B"), ("aliyun", "default-model"), ("aliyun", "Qwen3-30B")}
+    # 第一次失败后，带同一模型的请求先走 aliyun，模型也转发给它
+    assert adapters["aistudio"].calls == 1
+
+
+def test_instant_failures_do_not_look_cheap():
+    router = AdaptiveRouterStrategy(["aistudio", "aliyun"], exploration=0)
+    router.record("aistudio", "default-model", 5, False, False)
+    assert router.get_priority(_adapters("aistudio", "aliyun")) == ["aliyun", "aistudio"]
@@ -54,9 +54,8 @@ def test_generate_names_uses_dashscope_compatible_chat_completions(monkeypatch):
             },
         )
 
-    monkeypatch.setattr("requests.post", fake_post)
-
     adapter = AliyunAdapter(DummyAliyunConfig())
+    monkeypatch.setattr(adapter.session, "post", fake_post)
     result = adapter.generate_names("请生成一个测试姓名")
 
     assert result["success"] is True
@@ -93,9 +92,8 @@ def test_generate_names_falls_back_when_free_tier_quota_is_exhausted(monkeypatch
             },
         )
 
-    monkeypatch.setattr("requests.post", fake_post)
-
     adapter = AliyunAdapter(DummyAliyunConfig())
+    monkeypatch.setattr(adapter.session, "post", fake_post)
     result = adapter.generate_names("请生成一个测试姓名")
 
     assert result["success"] is True
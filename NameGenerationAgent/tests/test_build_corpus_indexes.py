@@ -0,0 +1,53 @@
+import sqlite3
+
+from scripts import build_corpus_indexes
+from src.data.corpus_loader import CorpusLoader
+
+
+def test_build_indexes_removes_unexpected_full_scans(corpus_db):
+    result = build_corpus_indexes.build_indexes(str(corpus_db))
+
+    assert build_corpus_indexes.unexpected_scans(result["before"])
+    assert build_corpus_indexes.unexpected_scans(result["after"]) == []
+    assert "idx_chinese_names_name_gender" in result["created"]
+    assert set(result["before"]) == set(result["after"])
+
+
+def test_build_indexes_is_idempotent_and_skips_existing_prefix(corpus_db):
+    conn = sqlite3.connect(str(corpus_db))
+    conn.execute("CREATE INDEX my_idiom_idx ON idioms(category, idiom)")
+    conn.commit()
+    conn.close()
+
+    first = build_corpus_indexes.build_indexes(str(corpus_db), vacuum=False)
+    second = build_corpus_indexes.build_indexes(str(corpus_db), vacuum=False)
+
+    assert "idx_idioms_category_idiom" not in first["created"]
+    assert second["created"] == []
+    assert CorpusLoader(corpus_db)._has_index("ancient_names", ["name", "dynasty"]) is True
+
+
+def test_dry_run_does_not_modify_database(corpus_db):
+    result = build_corpus_indexes.build_indexes(str(corpus_db), dry_run=True)
+
+    assert result["created"] == []
+    assert result["missing"]
+    assert CorpusLoader(corpus_db)._has_index("chinese_names", ["name"]) is False
+
+
+def test_char_postings_search_matches_like_search(corpus_db):
+    like_loader = CorpusLoader(corpus_db)
+    queries = [("林", None), ("清", "女"), ("a", None), ("N", "男"), ("清清", None),
+               ("清扬", None), ("苏雨", "女"), ("无", None), ("_", None), ("%", "男")]
+    expected = {q: like_loader.search_names_by_char(q[0], q[1], limit=5) for q in queries}
+
+    result = build_corpus_indexes.build_indexes(str(corpus_db), vacuum=False)
+    assert "name_char_postings" in result["created"]
+
+    loader = CorpusLoader(corpus_db)
+    assert loader._can_use_char_postings("林") is True
+    for q in queries:
+        assert loader.search_names_by_char(q[0], q[1], limit=5) == expected[q], q
+
+    plan = result["after"]["search_names_by_char_postings_gender"]["plan"]
+    assert not build_corpus_indexes.is_full_scan(plan)
@@ -0,0 +1,87 @@
+import pytest
+
+import src.utils.cache_codec as cache_codec_module
+from config.settings import Config
+from src.utils.cache_backends import available_backends
+from src.utils.cache_codec import CacheCodec, create_cache_codec, decode_value, strip_debug_fields
+from src.utils.cache_manager import CacheManager
+
+LARGE_RESULT = {
+    "success": True,
+    "names": [
+        {"name": f"林清扬{i}", "meaning": "取清风朗月、志向高远之意，寓意品性高洁、胸怀开阔。" * 3, "source": "paiou"}
+        for i in range(15)
+    ],
+    "api_name": "paiou",
+    "model": "glm-5",
+}
+
+
+def test_small_values_stay_uncompressed():
+    codec = CacheCodec("json", "zlib", min_bytes=512)
+    blob, raw_size = codec.encode({"a": 1})
+    assert blob == b'J0{"a":1}'
+    assert raw_size == 7
+    assert decode_value(blob) == {"a": 1}
+
+
+def test_large_values_are_compressed():
+    codec = CacheCodec("json", "zlib", min_bytes=512)
+    blob, raw_size = codec.encode(LARGE_RESULT)
+    assert blob[:2] == b"Jz"
+    assert raw_size > 4 * len(blob)
+    assert codec.decode(blob) == LARGE_RESULT
+
+
+def test_missing_optional_libraries_fall_back(monkeypatch):
+    monkeypatch.setattr(cache_codec_module, "msgpack", None)
+    monkeypatch.setattr(cache_codec_module, "zstandard", None)
+    codec = CacheCodec("msgpack", "zstd")
+    assert (codec.format, codec.compression) == ("json", "zlib")
+
+
+def test_codec_configuration():
+    assert create_cache_codec("raw", "zlib", 512) is None
+    with pytest.raises(ValueError):
+        CacheCodec("xml")
+    with pytest.raises(ValueError):
+        CacheCodec("json", "lz4")
+    with pytest.raises(ValueError):
+        decode_value(b"X0{}")
+
+
+def test_strip_debug_fields():
+    result = {"names": [], "raw_response": "模型原始输出"}
+    assert strip_debug_fields(result) == {"names": []}
+    assert strip_debug_fields(result, keep=True) is result
+    assert result["raw_response"] == "模型原始输出"
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_backends_store_encoded_values(cache_dir, backend):
+    cache = CacheManager(backend=backend)
+    cache.set("gen:big", LARGE_RESULT, latency_ms=900)
+    cache.set("gen:small", {"names": ["苏婉清"]})
+    cache.flush()
+    cache.close()
+
+    reopened = CacheManager(backend=backend) if backend != "memory" else cache
+    assert reopened.get("gen:big") == LARGE_RESULT
+    assert reopened.get("gen:small") == {"names": ["苏婉清"]}
+
+    stats = cache.get_stats()
+    assert stats["value_format"] == "json"
+    assert stats["compression_ratio"] > 3
+    assert stats["raw_bytes"] > stats["bytes_written"]
+
+
+def test_plain_entries_remain_readable_after_enabling_codec(cache_dir, monkeypatch):
+    monkeypatch.setattr(Config, "CACHE_VALUE_FORMAT", "raw")
+    cache = CacheManager(backend="sqlite")
+    cache.set("legacy", LARGE_RESULT)
+    cache.close()
+
+    monkeypatch.setattr(Config, "CACHE_VALUE_FORMAT", "json")
+    cache = CacheManager(backend="sqlite")
+    assert cache.get("legacy") == LARGE_RESULT
+    assert cache.get_stats()["compression_ratio"] == 0.0
@@ -0,0 +1,124 @@
+import multiprocessing
+import random
+import threading
+
+import pytest
+
+from config.settings import Config
+from src.utils.cache_manager import CacheManager
+
+
+@pytest.fixture
+def cache_dir(cache_dir, monkeypatch):
+    monkeypatch.setattr(Config, "CACHE_L1_EPOCH_CHECK", 0.0)
+    return cache_dir
+
+
+@pytest.mark.parametrize("backend", ["memory", "log", "sqlite"])
+@pytest.mark.parametrize("policy", ["lru", "lfu"])
+def test_concurrent_threads_keep_cache_consistent(cache_dir, monkeypatch, backend, policy):
+    monkeypatch.setattr(Config, "MAX_CACHE_SIZE", 50)
+    cache = CacheManager(backend=backend, policy=policy)
+    errors = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(300):
+                key = f"k{rng.randrange(120)}"
+                op = rng.random()
+                if op < 0.5:
+                    cache.set(key, {"key": key})
+                elif op < 0.9:
+                    value = cache.get(key)
+                    assert value is None or value == {"key": key}
+                else:
+                    cache.delete(key)
+        except Exception as e:  # pragma: no cover - 失败时收集
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert cache.get_stats()["total_entries"] <= 50
+    cache.close()
+
+
+def test_second_worker_hits_entries_written_by_first(cache_dir):
+    writer = CacheManager(backend="sqlite")
+    reader = CacheManager(backend="sqlite")
+
+    writer.set("prompt", {"names": ["林清扬"]})
+    assert reader.get("prompt") == {"names": ["林清扬"]}
+    assert reader.get_stats()["l1_entries"] == 1
+
+    writer.delete("prompt")
+    assert reader.get("prompt") is None
+
+    writer.set("again", 1)
+    assert reader.get("again") == 1
+    writer.clear()
+    assert reader.get("again") is None
+    writer.close()
+    reader.close()
+
+
+def test_l1_serves_hits_without_touching_shared_store(cache_dir, monkeypatch):
+    monkeypatch.setattr(Config, "CACHE_L1_EPOCH_CHECK", 60.0)
+    cache = CacheManager(backend="sqlite")
+    cache.set("k", "v")
+    cache.get("k")
+
+    cache.backend.get = lambda key: pytest.fail("L1 命中时不应读取共享存储")
+    assert cache.get("k") == "v"
+
+
+@pytest.mark.parametrize("value_format", ["json", "raw"])
+def test_l1_hits_are_isolated_from_caller_mutations(cache_dir, monkeypatch, value_format):
+    monkeypatch.setattr(Config, "CACHE_L1_EPOCH_CHECK", 60.0)
+    monkeypatch.setattr(Config, "CACHE_VALUE_FORMAT", value_format)
+    cache = CacheManager(backend="sqlite")
+    written = {"names": ["林清扬"]}
+    cache.set("k", written)
+    written["names"].append("写入后修改")
+
+    first = cache.get("k")
+    first["names"].append("读取后修改")
+    first["stale"] = False
+
+    # 与其他进程从共享存储解码得到的值一致
+    assert cache.get("k") == {"names": ["林清扬"]}
+    assert CacheManager(backend="sqlite").get("k") == {"names": ["林清扬"]}
+
+
+def test_l1_is_disabled_for_process_local_backends(cache_dir):
+    assert CacheManager(backend="memory").l1 is None
+    assert "l1_entries" not in CacheManager(backend="memory").get_stats()
+
+
+def _write_entries(cache_dir, prefix, count):
+    Config.CACHE_DIR = cache_dir
+    Config.DATA_DIR = cache_dir
+    cache = CacheManager(backend="sqlite")
+    for i in range(count):
+        cache.set(f"{prefix}{i}", {"worker": prefix, "i": i})
+    cache.close()
+
+
+def test_worker_processes_share_one_store(cache_dir):
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_write_entries, args=(str(cache_dir), f"w{n}-", 100)) for n in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    cache = CacheManager(backend="sqlite")
+    assert cache.get_stats()["total_entries"] == 300
+    assert cache.get("w2-99") == {"worker": "w2-", "i": 99}
+    cache.close()
@@ -0,0 +1,102 @@
+import pytest
+
+from config.settings import Config
+from src.utils.cache_eviction import ExpiryHeap, LFUPolicy, LRUPolicy, FIFOPolicy, create_eviction_policy
+from src.utils.cache_manager import CacheManager
+
+
+@pytest.fixture
+def cache_dir(cache_dir, monkeypatch):
+    monkeypatch.setattr(Config, "MAX_CACHE_SIZE", 3)
+    return cache_dir
+
+
+def test_fifo_ignores_reads_and_requeues_overwrites():
+    policy = FIFOPolicy()
+    for key in "abc":
+        policy.on_write(key)
+    policy.on_read("a")
+    assert policy.victim() == "a"
+    policy.on_write("a")
+    assert policy.victim() == "b"
+
+
+def test_lru_moves_read_keys_to_tail():
+    policy = LRUPolicy()
+    for key in "abc":
+        policy.on_write(key)
+    policy.on_read("a")
+    assert policy.victim() == "b"
+    policy.remove("b")
+    assert policy.victim() == "c"
+    assert len(policy) == 2
+
+
+def test_lfu_evicts_least_frequent_then_least_recent():
+    policy = LFUPolicy()
+    for key in "abc":
+        policy.on_write(key)
+    policy.on_read("a")
+    policy.on_read("b")
+    assert policy.victim() == "c"
+    policy.remove("c")
+    assert policy.victim() == "a"
+    policy.remove("a")
+    policy.remove("b")
+    assert policy.victim() is None
+    policy.on_write("d")
+    assert policy.victim() == "d"
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        create_eviction_policy("random")
+
+
+def test_expiry_heap_skips_overwritten_entries_and_stays_compact():
+    heap = ExpiryHeap()
+    heap.push("a", 1.0)
+    heap.push("b", 2.0)
+    heap.push("a", 5.0)
+    heap.remove("b")
+
+    assert heap.pop_expired(3.0) == []
+    assert heap.pop_expired(6.0) == ["a"]
+    assert len(heap) == 0
+
+    for i in range(1000):
+        heap.push("hot", float(i))
+    assert len(heap._heap) <= 2 * len(heap) + 64
+
+
+@pytest.mark.parametrize("backend", ["memory", "log", "sqlite", "json"])
+@pytest.mark.parametrize("policy, expected_victim", [("fifo", "a"), ("lru", "b"), ("lfu", "c")])
+def test_cache_manager_evicts_by_policy(cache_dir, backend, policy, expected_victim):
+    cache = CacheManager(backend=backend, policy=policy)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    for key in "bbca":
+        cache.get(key)
+    cache.set("d", 4)
+
+    remaining = {key for key in "abcd" if cache.backend.contains(key)}
+    assert remaining == set("abcd") - {expected_victim}
+    assert cache.get_stats()["eviction_policy"] == policy
+    cache.close()
+
+
+def test_sqlite_backend_upgrades_pre_policy_schema(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "cache.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE cache_entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, timestamp REAL NOT NULL)")
+    conn.execute("INSERT INTO cache_entries VALUES ('old', '1', 10.0)")
+    conn.commit()
+    conn.close()
+
+    cache = CacheManager(cache_file=str(path), backend="sqlite", policy="lru")
+    assert cache.backend.get("old") == (1, 10.0)
+    assert cache.backend.count() == 1
+    cache.close()
@@ -0,0 +1,102 @@
+import pytest
+
+import src.api.unified_client as unified_client_module
+from src.utils.cache_keys import build_request_signature, normalize_description, semantic_cache_key
+from src.utils.cache_manager import CacheManager
+
+
+class DummyRouter:
+    def get_priority(self, adapters, preferred_api=None, context=None):
+        return ["paiou"]
+
+
+class CountingAdapter:
+    def __init__(self):
+        self.calls = 0
+        self.name = "paiou"
+        self.base_url = "https://example.com"
+
+    def generate_names(self, prompt, **kwargs):
+        self.calls += 1
+        return {
+            "success": True,
+            "names": [{"name": "林清和", "meaning": "清朗平和", "source": "paiou"}],
+            "api_name": "paiou",
+            "model": "default-model",
+        }
+
+
+@pytest.fixture
+def client(cache_dir, monkeypatch):
+    adapter = CountingAdapter()
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_adapters",
+        lambda self: setattr(self, "adapters", {"paiou": adapter}),
+    )
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_router",
+        lambda self: setattr(self, "router_strategy", DummyRouter()),
+    )
+    api_client = unified_client_module.UnifiedAPIClient()
+    api_client.cache_manager = CacheManager(backend="memory")
+    return api_client, adapter
+
+
+def _signature(description="温柔 坚定的女孩。", **overrides):
+    params = dict(description=description, count=5, cultural_style="chinese_modern", gender="female",
+                  age="adult", surname="林", era="", model="qwen-turbo")
+    params.update(overrides)
+    return build_request_signature(**params)
+
+
+def test_normalize_description():
+    assert normalize_description("  温柔，坚定 的女孩！ ") == "温柔坚定的女孩"
+    assert normalize_description("Gentle,  Brave") == "gentlebrave"
+    assert normalize_description("  温柔，坚定 ", strip_punctuation=False) == "温柔，坚定"
+
+
+def test_semantic_key_ignores_formatting_but_not_parameters():
+    key = semantic_cache_key(_signature())
+    assert key.startswith("gen:v1:")
+    assert semantic_cache_key(_signature("温柔坚定的女孩")) == key
+    assert semantic_cache_key(_signature(strip_punctuation=False)) != key
+
+    for field, value in [("count", 6), ("cultural_style", "chinese_classic"), ("gender", "male"),
+                         ("age", "child"), ("surname", "苏"), ("era", "唐"), ("model", "glm-5")]:
+        assert semantic_cache_key(_signature(**{field: value})) != key
+
+
+def test_identical_requests_share_cache_despite_random_prompts(client):
+    api_client, adapter = client
+
+    first = api_client.generate_names(prompt="示例：张三、李四", count=1, cache_signature=_signature())
+    second = api_client.generate_names(prompt="示例：王五、赵六", count=1, cache_signature=_signature("温柔坚定的女孩"))
+
+    assert adapter.calls == 1
+    assert second == first
+    assert api_client.cache_manager.get_stats()["by_prefix"]["gen"]["hits"] == 1
+
+
+def test_legacy_prompt_keys_are_read_and_migrated(client):
+    api_client, adapter = client
+    legacy_key = api_client._generate_cache_key("旧提示词", 1, {})
+    cached = {"success": True, "names": [{"name": "苏婉清"}], "api_name": "paiou"}
+    api_client.cache_manager.set(legacy_key, cached)
+
+    result = api_client.generate_names(prompt="旧提示词", count=1, cache_signature=_signature())
+
+    assert result == dict(cached, stale=False)
+    assert adapter.calls == 0
+    assert api_client.cache_manager.get(semantic_cache_key(_signature())) == cached
+
+
+def test_legacy_fallback_can_be_disabled(client, monkeypatch):
+    api_client, adapter = client
+    monkeypatch.setattr(unified_client_module, "get_settings", lambda: type("S", (), {"CACHE_LEGACY_KEY_FALLBACK": False}))
+    api_client.cache_manager.set(api_client._generate_cache_key("旧提示词", 1, {}), {"success": True, "names": []})
+
+    api_client.generate_names(prompt="旧提示词", count=1, cache_signature=_signature())
+
+    assert adapter.calls == 1
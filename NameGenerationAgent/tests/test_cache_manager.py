@@ -0,0 +1,168 @@
+import json
+import os
+import time
+
+import pytest
+
+from config.settings import Config
+from src.utils.cache_backends import LogFileBackend, SQLiteCacheBackend, available_backends
+from src.utils.cache_manager import CacheManager
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_backends_share_cache_semantics(cache_dir, monkeypatch, backend):
+    monkeypatch.setattr(Config, "MAX_CACHE_SIZE", 3)
+    cache = CacheManager(backend=backend)
+
+    assert cache.get("missing") is None
+    cache.set("a", {"names": ["林清扬"], "n": 1})
+    cache.set("b", "值")
+    cache.set("c", [1, 2])
+    assert cache.get("a") == {"names": ["林清扬"], "n": 1}
+
+    cache.set("c", [3])
+    assert cache.get_stats()["total_entries"] == 3
+
+    time.sleep(0.01)
+    cache.set("d", 4)
+    assert cache.get("a") is None
+    assert cache.get("c") == [3]
+
+    assert cache.delete("b") is True
+    assert cache.delete("b") is False
+
+    stats = cache.get_stats()
+    assert stats["total_entries"] == 2
+    assert stats["active_entries"] == 2
+    assert stats["max_size"] == 3
+    assert stats["backend"] == backend
+
+    cache.clear()
+    assert cache.get_stats()["total_entries"] == 0
+    cache.close()
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_expired_entries_are_dropped(cache_dir, monkeypatch, backend):
+    monkeypatch.setattr(Config, "CACHE_TTL", 60)
+    cache = CacheManager(backend=backend)
+    cache.set("old", 1)
+    cache.set("new", 2)
+    cache.backend.set("old", 1, time.time() - 120)
+
+    stats = cache.get_stats()
+    assert (stats["expired_entries"], stats["active_entries"]) == (1, 1)
+    assert cache.get("old") is None
+    assert cache.get("new") == 2
+    assert cache.get_stats()["total_entries"] == 1
+    cache.close()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "log"])
+def test_entries_survive_reopen(cache_dir, backend):
+    cache = CacheManager(backend=backend)
+    cache.set("key", {"names": ["苏知远"]})
+    cache.delete("missing")
+    cache.close()
+
+    reopened = CacheManager(backend=backend)
+    assert reopened.get("key") == {"names": ["苏知远"]}
+    reopened.close()
+
+
+def test_log_backend_appends_one_record_per_write_and_loads_lazily(tmp_path):
+    path = tmp_path / "cache.log"
+    backend = LogFileBackend(str(path))
+    for i in range(5):
+        backend.set(f"k{i}", i, 1.0)
+    size = path.stat().st_size
+    backend.set("k5", 5, 1.0)
+    assert path.read_text(encoding="utf-8").count("\n") == 6
+    assert path.stat().st_size > size
+    backend.close()
+
+    lazy = LogFileBackend(str(path))
+    assert lazy._loaded is False
+    assert lazy.get("k5") == (5, 1.0)
+    assert lazy._loaded is True
+    lazy.close()
+
+
+def test_log_backend_ignores_torn_tail_record(tmp_path):
+    path = tmp_path / "cache.log"
+    backend = LogFileBackend(str(path))
+    backend.set("ok", "完整", 1.0)
+    backend.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"k": "torn", "v": "半')
+
+    recovered = LogFileBackend(str(path))
+    assert recovered.get("ok") == ("完整", 1.0)
+    assert recovered.get("torn") is None
+    recovered.set("after", 1, 2.0)
+    recovered.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["k"] for line in lines] == ["ok", "after"]
+
+
+def test_log_backend_compacts_atomically(tmp_path):
+    path = tmp_path / "cache.log"
+    backend = LogFileBackend(str(path), compact_ratio=1.0, compact_min_records=4)
+    backend.set("keep", 1, 1.0)
+    for i in range(5):
+        backend.set("churn", i, 1.0)
+
+    info = backend.get_info()
+    assert info["compactions"] == 1
+    assert not os.path.exists(f"{path}.compact")
+    assert len(path.read_text(encoding="utf-8").splitlines()) <= 3
+    backend.close()
+
+    reopened = LogFileBackend(str(path))
+    assert reopened.get("keep") == (1, 1.0)
+    assert reopened.get("churn")[0] == 4
+    reopened.close()
+
+
+def test_sqlite_backend_uses_wal_and_reads_on_demand(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.db"))
+    backend.set("a", {"x": 1}, 1.0)
+    mode = backend._execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+    backend.close()
+
+    reopened = SQLiteCacheBackend(str(tmp_path / "cache.db"))
+    assert reopened._conn is None
+    assert reopened.get("a") == ({"x": 1}, 1.0)
+    reopened.close()
+
+
+def test_unknown_backend_is_rejected(cache_dir):
+    with pytest.raises(ValueError):
+        CacheManager(backend="redis")
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "log"])
+def test_legacy_json_cache_is_imported_on_first_start(cache_dir, backend):
+    now = time.time()
+    legacy = {
+        "gen:fresh": {"value": {"names": ["林清扬"]}, "timestamp": now - 10},
+        "gen:old": {"value": {"names": ["苏知远"]}, "timestamp": now - Config.CACHE_TTL - 10},
+    }
+    (cache_dir / "cache.json").write_text(json.dumps(legacy, ensure_ascii=False), encoding="utf-8")
+
+    cache = CacheManager(backend=backend)
+    assert cache.get("gen:fresh") == {"names": ["林清扬"]}
+    assert cache.get("gen:old") is None
+    assert not (cache_dir / "cache.json").exists()
+    assert (cache_dir / "cache.json.imported").exists()
+    cache.close()
+
+    # 只导入一次，重启后数据来自新后端
+    assert CacheManager(backend=backend).get("gen:fresh") == {"names": ["林清扬"]}
+
+
+def test_json_cache_file_is_rejected_for_other_backends(cache_dir):
+    with pytest.raises(ValueError):
+        CacheManager(cache_file=str(cache_dir / "cache.json"), backend="sqlite")
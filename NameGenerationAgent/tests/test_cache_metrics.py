@@ -0,0 +1,180 @@
+import importlib
+import time
+
+import pytest
+
+import src.web.app as web_app_module
+from config.settings import Config
+from src.utils.cache_backends import available_backends
+from src.utils.cache_manager import CacheManager
+from src.utils.cache_metrics import DEFAULT_PREFIX, CacheMetrics, key_prefix
+
+
+def test_key_prefix():
+    assert key_prefix("gen:abc") == "gen"
+    assert key_prefix("abc") == DEFAULT_PREFIX
+    assert key_prefix(":abc") == DEFAULT_PREFIX
+    assert key_prefix("gen/abc", separator="/") == "gen"
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_counters_and_prefix_breakdown(cache_dir, monkeypatch, backend):
+    monkeypatch.setattr(Config, "MAX_CACHE_SIZE", 2)
+    monkeypatch.setattr(Config, "CACHE_TTL", 60)
+    cache = CacheManager(backend=backend)
+
+    cache.set("gen:a", {"names": ["林清扬"]}, latency_ms=1200)
+    cache.set("plain", 1)
+    assert cache.get("gen:a") == {"names": ["林清扬"]}
+    assert cache.get("gen:a") == {"names": ["林清扬"]}
+    assert cache.get("plain") == 1
+    assert cache.get("gen:missing") is None
+
+    cache.set("gen:b", 2)  # 已满，淘汰一条
+    cache.backend.set("plain", 1, time.time() - 120)
+    if cache.l1 is not None:
+        cache.l1.clear()
+    assert cache.get("plain") is None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 2
+    assert stats["total_requests"] == 5
+    assert stats["hit_rate"] == 60.0
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+    assert stats["sets"] == 3
+    assert stats["bytes_written"] > 0
+    assert stats["latency_saved_ms"] == pytest.approx(2400)
+    assert stats["avg_latency_saved_ms"] == pytest.approx(1200)
+
+    gen = stats["by_prefix"]["gen"]
+    assert (gen["hits"], gen["misses"], gen["sets"]) == (2, 1, 2)
+    assert gen["latency_saved_ms"] == pytest.approx(2400)
+    default = stats["by_prefix"][DEFAULT_PREFIX]
+    assert (default["hits"], default["misses"], default["expirations"]) == (1, 1, 1)
+    cache.close()
+
+
+def test_purged_entries_count_as_expirations(cache_dir, monkeypatch):
+    monkeypatch.setattr(Config, "CACHE_TTL", 60)
+    cache = CacheManager(backend="memory")
+    cache.backend.set("gen:old", 1, time.time() - 120)
+    cache.backend.set("old", 1, time.time() - 120)
+
+    cache.set("new", 2)
+
+    stats = cache.get_stats()
+    assert stats["expirations"] == 2
+    assert stats["by_prefix"]["gen"]["expirations"] == 1
+
+
+def test_l1_hits_keep_latency(cache_dir):
+    cache = CacheManager(backend="sqlite")
+    cache.set("gen:a", "v", latency_ms=500)
+    other = CacheManager(backend="sqlite")
+
+    assert other.get("gen:a") == "v"  # 共享存储命中，填充 L1
+    assert other.get("gen:a") == "v"  # L1 命中
+
+    stats = other.get_stats()
+    assert stats["hits"] == 2
+    assert stats["l1_hits"] == 1
+    assert stats["latency_saved_ms"] == pytest.approx(1000)
+    cache.close()
+    other.close()
+
+
+def test_reset_keeps_entries(cache_dir):
+    cache = CacheManager(backend="memory")
+    cache.set("a", 1, latency_ms=10)
+    cache.get("a")
+    cache.get("b")
+
+    cache.reset_stats()
+
+    stats = cache.get_stats()
+    assert stats["hits"] == stats["misses"] == stats["sets"] == 0
+    assert stats["latency_saved_ms"] == 0
+    assert stats["by_prefix"] == {}
+    assert cache.get("a") == 1
+
+
+def test_raw_entries_without_metadata_still_read(cache_dir):
+    cache = CacheManager(backend="json")
+    cache.backend.set("legacy", {"names": ["苏婉清"]}, time.time())
+
+    assert cache.get("legacy") == {"names": ["苏婉清"]}
+    assert cache.get_stats()["hits_with_latency"] == 0
+
+
+def test_metrics_snapshot_without_traffic():
+    snapshot = CacheMetrics().snapshot()
+    assert snapshot["hit_rate"] == 0.0
+    assert snapshot["avg_latency_saved_ms"] == 0.0
+    assert snapshot["by_prefix"] == {}
+
+
+def test_stats_reset_endpoint_requires_admin(tmp_path, monkeypatch):
+    class DummyNameGenerator:
+        resets = 0
+
+        def reset_generation_stats(self):
+            DummyNameGenerator.resets += 1
+
+    # 其他测试会重新导入 auth_service 模块，这里取当前生效的模块
+    auth_module = importlib.import_module("src.core.auth_service")
+    auth = auth_module.AuthService(db_url=f"sqlite:///{tmp_path / 'auth.db'}")
+    monkeypatch.setattr(auth_module, "auth_service", auth)
+    monkeypatch.setattr(web_app_module, "get_name_generator", lambda: DummyNameGenerator())
+    app = web_app_module.app
+    app.config["TESTING"] = True
+
+    with app.test_client() as client:
+        assert client.post("/stats/reset").status_code == 403
+
+        # 普通用户登录后台也不能清零
+        client.post("/auth/register", json={"phone": "13500135000", "password": "123456"})
+        client.post("/admin/login", data={"phone": "13500135000", "password": "123456"})
+        assert client.post("/stats/reset").status_code == 403
+        assert DummyNameGenerator.resets == 0
+
+        user = auth.get_user_by_phone("13500135000")
+        auth.set_user_role(user["id"], "admin")
+        client.post("/admin/login", data={"phone": "13500135000", "password": "123456"})
+        response = client.post("/stats/reset")
+        assert client.get("/stats/reset").status_code == 405
+
+    assert response.status_code == 200
+    assert response.get_json() == {"success": True}
+    assert DummyNameGenerator.resets == 1
+
+
+def test_sqlite_stored_bytes_are_tracked_without_scanning(cache_dir, monkeypatch):
+    monkeypatch.setattr(Config, "MAX_CACHE_SIZE", 2)
+    cache = CacheManager(backend="sqlite")
+    backend = cache.backend
+
+    def scanned_bytes():
+        return backend._execute("SELECT COALESCE(SUM(LENGTH(CAST(value AS BLOB))), 0) FROM cache_entries").fetchone()[0]
+
+    cache.set("gen:a", {"names": ["林清扬"]})
+    cache.set("gen:a", {"names": ["林清扬", "苏知远"]})
+    cache.set("gen:b", {"names": ["顾明澈"]})
+    cache.set("gen:c", {"names": ["沈若溪"]})  # 淘汰一个条目
+    cache.delete("gen:c")
+    assert backend.get_info()["stored_bytes"] == scanned_bytes() > 0
+
+    # 其它进程的写入同样计入
+    other = CacheManager(backend="sqlite")
+    other.set("gen:d", {"names": ["陆星河"]})
+    assert backend.get_info()["stored_bytes"] == scanned_bytes()
+
+    cache.clear()
+    assert backend.get_info()["stored_bytes"] == 0
+
+    # 旧库没有字节数记录时打开时统计一次
+    other.set("gen:e", {"names": ["江映雪"]})
+    backend._execute("DELETE FROM cache_meta WHERE name = 'stored_bytes'")
+    backend.close()
+    assert backend.get_info()["stored_bytes"] == scanned_bytes() > 0
@@ -0,0 +1,244 @@
+import importlib
+import sys
+import time
+import types
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from config.settings import Config
+from src.core.cache_warmup import CacheWarmer, ProviderRateLimiter
+from src.core.record_service import RecordService
+from src.utils.cache_backends import available_backends
+from src.utils.cache_manager import CacheManager
+from src.utils.cache_snapshot import read_snapshot
+
+RESULT = {"success": True, "names": [{"name": "林清扬", "meaning": "清风朗月" * 40}], "api_name": "paiou"}
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_snapshot_round_trip(cache_dir, backend):
+    cache = CacheManager(backend=backend)
+    cache.set("gen:v1:a", RESULT, latency_ms=800)
+    cache.set("gen:v1:b", {"names": ["苏婉清"]})
+    cache.backend.set("gen:v1:dead", {"names": []}, time.time() - Config.CACHE_TTL - 10)
+
+    path = str(cache_dir / "cache.snapshot")
+    assert cache.snapshot(path)["entries"] == 2
+    assert [key for key, _, _ in read_snapshot(path)] == ["gen:v1:a", "gen:v1:b"]
+    cache.close()
+
+    target = CacheManager(backend="memory")
+    assert target.restore(path) == {"restored": 2, "existing": 0, "expired": 0, "dropped": 0}
+    assert target.get("gen:v1:a") == RESULT
+    assert target.get("gen:v1:b") == {"names": ["苏婉清"]}
+    # 命中时仍能算出节省的上游耗时
+    assert target.get_stats()["latency_saved_ms"] == 800
+
+
+def test_restore_keeps_existing_entries_and_respects_capacity(cache_dir, monkeypatch):
+    source = CacheManager(backend="memory")
+    for index in range(4):
+        source.set(f"gen:{index}", {"names": [index]})
+    path = str(cache_dir / "cache.snapshot")
+    source.snapshot(path)
+
+    monkeypatch.setattr(Config, "MAX_CACHE_SIZE", 3)
+    target = CacheManager(backend="memory")
+    target.set("gen:3", {"names": ["本地"]})
+    stats = target.restore(path)
+
+    assert stats == {"restored": 2, "existing": 1, "expired": 0, "dropped": 1}
+    assert target.get("gen:3") == {"names": ["本地"]}
+    # 从最新的条目开始恢复，最旧的被放弃
+    assert target.get("gen:0") is None and target.get("gen:1") == {"names": [1]}
+
+    assert target.restore(path, overwrite=True)["restored"] == 3
+    assert target.get("gen:3") == {"names": [3]}
+
+
+def test_restore_into_raw_cache_and_reject_bad_files(cache_dir, monkeypatch):
+    source = CacheManager(backend="memory")
+    source.set("gen:a", RESULT)
+    path = cache_dir / "cache.snapshot"
+    source.snapshot(str(path))
+
+    monkeypatch.setattr(Config, "CACHE_VALUE_FORMAT", "raw")
+    target = CacheManager(backend="memory")
+    target.restore(str(path))
+    assert target.backend.get("gen:a")[0] == RESULT
+
+    path.write_bytes(path.read_bytes()[:-4])
+    with pytest.raises(ValueError):
+        target.restore(str(path))
+    (cache_dir / "other").write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError):
+        target.restore(str(cache_dir / "other"))
+
+
+def test_rate_limiter_spaces_calls_per_provider():
+    now = [0.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    limiter = ProviderRateLimiter(30, sleep=sleep, clock=lambda: now[0])
+    assert limiter.wait("paiou") == 0
+    assert limiter.wait("aliyun") == 0
+    assert limiter.wait("paiou") == 2.0
+    now[0] += 5
+    assert limiter.wait("paiou") == 0
+    assert slept == [2.0]
+
+
+def _record(service, description, api_name="paiou", count=5, requested_api="", requested_model=""):
+    service.create_generation_record(
+        user_id=1, description=description, cultural_style="chinese_modern", gender="female",
+        age="adult", request_count=count, api_name=api_name, model="glm-5", names=[{"name": "林清扬"}],
+        requested_api=requested_api, requested_model=requested_model,
+    )
+
+
+class FakeGenerator:
+    def __init__(self, cache_manager):
+        self.calls = []
+        self.unified_client = type("Client", (), {"cache_manager": cache_manager})()
+
+    def generate_names(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"success": kwargs["description"] != "失败的请求", "names": []}
+
+
+def test_top_request_signatures(tmp_path):
+    service = RecordService(db_url=f"sqlite:///{tmp_path / 'records.db'}")
+    for _ in range(3):
+        _record(service, "温柔坚定的女侠")
+    _record(service, "冷静的侦探")
+    _record(service, "冷静的侦探", count=3)
+    _record(service, "只用过模拟数据", api_name="mock")
+
+    top = service.top_request_signatures(limit=2)
+    assert [(item["description"], item["hits"]) for item in top] == [("温柔坚定的女侠", 3), ("冷静的侦探", 1)]
+    # 记录的是提供服务的模型，重放使用用户当初请求的（默认路由时为空）
+    assert (top[0]["count"], top[0]["api_name"], top[0]["preferred_api"], top[0]["model"]) == (5, "paiou", "", "")
+
+    _record(service, "指定模型", requested_api="paiou", requested_model="glm-5")
+    pinned = [item for item in service.top_request_signatures() if item["description"] == "指定模型"][0]
+    assert (pinned["preferred_api"], pinned["model"]) == ("paiou", "glm-5")
+
+
+def test_requested_columns_are_added_to_existing_databases(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    legacy = create_engine(db_url)
+    with legacy.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE generation_records (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+            "description TEXT NOT NULL, cultural_style VARCHAR(64) NOT NULL, gender VARCHAR(32) NOT NULL, "
+            "age VARCHAR(32) NOT NULL, request_count INTEGER NOT NULL, api_name VARCHAR(100) NOT NULL, "
+            "model VARCHAR(200) NOT NULL, names_json TEXT NOT NULL, created_at DATETIME NOT NULL)"
+        ))
+        conn.execute(text(
+            "INSERT INTO generation_records VALUES "
+            "(1, 1, '旧记录', 'chinese_modern', 'female', 'adult', 5, 'paiou', 'glm-5', '[]', '2026-01-01')"
+        ))
+    legacy.dispose()
+
+    service = RecordService(db_url=db_url)
+    columns = {column["name"] for column in inspect(service.engine).get_columns("generation_records")}
+    assert {"requested_api", "requested_model"} <= columns
+    assert service.top_request_signatures()[0]["model"] == ""
+
+
+def test_warmer_restores_snapshot_and_replays_top_requests(cache_dir, tmp_path):
+    source = CacheManager(backend="memory")
+    source.set("gen:v1:a", RESULT)
+    snapshot_file = str(cache_dir / "cache.snapshot")
+    source.snapshot(snapshot_file)
+
+    service = RecordService(db_url=f"sqlite:///{tmp_path / 'records.db'}")
+    _record(service, "温柔坚定的女侠")
+    _record(service, "温柔坚定的女侠")
+    _record(service, "失败的请求", api_name="aliyun")
+
+    generator = FakeGenerator(CacheManager(backend="memory"))
+    warmer = CacheWarmer(generator, service, top_n=10, rate_per_minute=0, snapshot_file=snapshot_file)
+    assert warmer.start() is True
+    warmer.join(5)
+
+    stats = warmer.get_stats()
+    assert (stats["state"], stats["snapshot_restored"], stats["planned"]) == ("done", 1, 2)
+    assert (stats["replayed"], stats["failed"]) == (1, 1)
+    assert generator.unified_client.cache_manager.get("gen:v1:a") == RESULT
+    first = generator.calls[0]
+    assert (first["description"], first["count"], first["preferred_api"], first["model"]) == (
+        "温柔坚定的女侠", 5, None, None
+    )
+    assert first["use_mock_on_failure"] is False
+
+
+def test_stopped_warmer_does_not_replay(cache_dir, tmp_path):
+    service = RecordService(db_url=f"sqlite:///{tmp_path / 'records.db'}")
+    _record(service, "温柔坚定的女侠")
+    generator = FakeGenerator(CacheManager(backend="memory"))
+    warmer = CacheWarmer(generator, service, top_n=10)
+    warmer.stop()
+    assert warmer.run()["state"] == "stopped"
+    assert generator.calls == []
+
+
+class CountingClient:
+    def __init__(self, cache_manager):
+        self.cache_manager = cache_manager
+        self.calls = []
+
+    def generate_names(self, **kwargs):
+        self.calls.append(kwargs)
+        names = [{"name": f"林清{index}", "meaning": "寓意", "source": "paiou"} for index in range(kwargs["count"])]
+        return {"success": True, "names": names, "api_name": "paiou", "model": "glm-5"}
+
+    def get_available_apis(self):
+        return ["paiou"]
+
+    def get_api_status(self):
+        return {"paiou": {"enabled": True}}
+
+
+class DummyPromptTemplates:
+    def build_prompt(self, **kwargs):
+        return f"count:{kwargs['count']}"
+
+
+class DummyValidator:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: {"valid": True}
+
+
+def test_warmed_entry_is_hit_by_the_original_request(cache_dir, tmp_path, monkeypatch):
+    client = CountingClient(CacheManager(backend="memory"))
+    unified_client_module = types.ModuleType("src.api.unified_client")
+    unified_client_module.unified_client = client
+    monkeypatch.setitem(sys.modules, "src.api.unified_client", unified_client_module)
+    sys.modules.pop("src.core.name_generator", None)
+    module = importlib.import_module("src.core.name_generator")
+    monkeypatch.setattr(module, "get_unified_client", lambda: client)
+    monkeypatch.setattr(module, "get_prompt_templates", lambda: DummyPromptTemplates())
+    monkeypatch.setattr(module, "get_input_validator", lambda: DummyValidator())
+    monkeypatch.setattr(module, "get_response_validator", lambda: DummyValidator())
+    monkeypatch.setattr(module, "get_corpus_enhancer", lambda: None)
+    monkeypatch.setattr(Config, "NAME_POOL_FACTOR", 3)
+    generator = module.NameGenerator()
+
+    # 用户未指定模型，记录里保存的是实际提供服务的 paiou / glm-5
+    service = RecordService(db_url=f"sqlite:///{tmp_path / 'records.db'}")
+    _record(service, "温柔坚定的女侠", count=2)
+    warmer = CacheWarmer(generator, service, top_n=10, rate_per_minute=0)
+    assert warmer.run()["replayed"] == 1
+    assert len(client.calls) == 1
+
+    # 与原请求形状相同的请求直接命中预热结果，不再调用模型
+    result = generator.generate_names(description="温柔坚定的女侠", count=2, cultural_style="chinese_modern",
+                                      gender="female", age="adult", user_id=1)
+    assert result["success"] is True
+    assert len(client.calls) == 1
@@ -0,0 +1,187 @@
+import src.api.unified_client as unified_client_module
+from config.settings import Config
+from src.api.adapters.base_adapter import APIException
+from src.api.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry
+from src.utils.cache_manager import CacheManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _open_breaker(clock, threshold=3, cooldown=30):
+    breaker = CircuitBreaker("aliyun", failure_threshold=threshold, cooldown_seconds=cooldown, clock=clock)
+    for _ in range(threshold):
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("aliyun", failure_threshold=3, clock=FakeClock())
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+    assert breaker.get_stats()["rejected"] == 1
+
+
+def test_single_probe_after_cooldown_closes_on_success():
+    clock = FakeClock()
+    breaker = _open_breaker(clock)
+    clock.now += 30
+
+    assert not breaker.is_open()
+    assert breaker.allow_request()
+    assert breaker.state == "half_open"
+    # 探测进行中，其余请求仍被拒绝
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens_for_another_cooldown():
+    clock = FakeClock()
+    breaker = _open_breaker(clock)
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    stats = breaker.get_stats()
+    assert (stats["state"], stats["times_opened"], stats["retry_in_seconds"]) == ("open", 2, 30)
+    clock.now += 29
+    assert not breaker.allow_request()
+
+
+def test_lost_probe_is_replaced_after_cooldown():
+    clock = FakeClock()
+    breaker = _open_breaker(clock)
+    clock.now += 30
+    assert breaker.allow_request()
+    clock.now += 30
+    assert breaker.allow_request()
+    assert breaker.get_stats()["probes"] == 2
+
+
+def test_released_probe_can_be_retaken_immediately():
+    clock = FakeClock()
+    breaker = _open_breaker(clock)
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.release_probe()
+    assert breaker.allow_request()
+    assert breaker.get_stats()["probes"] == 1
+
+
+def test_late_failures_do_not_extend_cooldown():
+    clock = FakeClock()
+    breaker = _open_breaker(clock)
+    clock.now += 20
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow_request()
+
+
+def test_disabled_registry_allows_everything():
+    registry = CircuitBreakerRegistry(enabled=False, failure_threshold=1)
+    registry.record_failure("aliyun")
+    assert registry.allow_request("aliyun")
+    assert not registry.is_open("aliyun")
+
+
+class CountingAdapter:
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.base_url = "https://example.com"
+        self.fail = fail
+        self.calls = 0
+
+    def is_available(self):
+        return True
+
+    def generate_names(self, prompt, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise APIException(f"{self.name} timeout")
+        return {"success": True, "names": [{"name": "林清扬", "meaning": "寓意"}], "api_name": self.name}
+
+
+class DummyRouter:
+    def get_priority(self, adapters, preferred_api=None, context=None):
+        return ["aistudio", "aliyun"]
+
+
+def test_unified_client_skips_open_circuit_and_probes_recovery(cache_dir, monkeypatch):
+    monkeypatch.setattr(Config, "CIRCUIT_BREAKER_FAILURE_THRESHOLD", 2)
+    down = CountingAdapter("aistudio", fail=True)
+    up = CountingAdapter("aliyun")
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_adapters",
+        lambda self: setattr(self, "adapters", {"aistudio": down, "aliyun": up}),
+    )
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_router",
+        lambda self: setattr(self, "router_strategy", DummyRouter()),
+    )
+    client = unified_client_module.UnifiedAPIClient()
+    client.cache_manager = CacheManager(backend="memory")
+    clock = FakeClock()
+    client.breakers._clock = clock
+
+    for i in range(4):
+        assert client.generate_names(prompt=f"p{i}", count=1, use_cache=False)["api_name"] == "aliyun"
+    assert down.calls == 2
+    assert client.get_api_status()["aistudio"]["circuit"]["state"] == "open"
+
+    # 冷却结束后放行一个探测请求，平台恢复后重新排在前面
+    clock.now += Config.CIRCUIT_BREAKER_COOLDOWN
+    down.fail = False
+    assert client.generate_names(prompt="p5", count=1, use_cache=False)["api_name"] == "aistudio"
+    assert client.get_api_status()["aistudio"]["circuit"]["state"] == "closed"
+
+
+class ModelRecordingAdapter(CountingAdapter):
+    def __init__(self, name, fail=False):
+        super().__init__(name, fail)
+        self.models = []
+
+    def generate_names(self, prompt, **kwargs):
+        self.models.append(kwargs.get("model"))
+        return super().generate_names(prompt, **kwargs)
+
+
+def test_requested_model_is_not_forwarded_past_an_open_circuit(cache_dir, monkeypatch):
+    monkeypatch.setattr(Config, "CIRCUIT_BREAKER_FAILURE_THRESHOLD", 1)
+    down = ModelRecordingAdapter("aistudio", fail=True)
+    up = ModelRecordingAdapter("aliyun")
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_adapters",
+        lambda self: setattr(self, "adapters", {"aistudio": down, "aliyun": up}),
+    )
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_router",
+        lambda self: setattr(self, "router_strategy", DummyRouter()),
+    )
+    client = unified_client_module.UnifiedAPIClient()
+    client.cache_manager = CacheManager(backend="memory")
+
+    client.generate_names(prompt="p1", count=1, use_cache=False, model="Qwen3-30B")
+    # aistudio 已熔断，aliyun 成为第一个实际调用的平台，但模型名仍只属于 aistudio
+    client.generate_names(prompt="p2", count=1, use_cache=False, model="Qwen3-30B")
+
+    assert down.models == ["Qwen3-30B"]
+    assert up.models == [None, None]
@@ -0,0 +1,88 @@
+import src.core.corpus_enhancer as corpus_enhancer_module
+from src.data.corpus_loader import CorpusLoader
+
+
+GENERATED = [
+    {"name": "林清扬", "meaning": "清朗飞扬", "source": "mock"},
+    {"name": "李白", "meaning": "诗仙", "source": "mock"},
+    {"name": "苏轼", "meaning": "豁达", "source": "mock"},
+    {"name": "王清清", "meaning": "清澈", "source": "mock"},
+    {"name": "林未见", "meaning": "未曾见", "source": "mock"},
+    {"name": "示例", "meaning": "无效", "source": "mock"},
+    {"name": "苏知远", "meaning": "", "source": "mock"},
+    {"name": "张伟", "meaning": "伟岸", "source": "mock"},
+]
+
+OPTION_SETS = [
+    {},
+    {"cultural_style": "chinese_traditional"},
+    {"preferred_era": "tang", "era_weight": 2.0},
+    {"preferred_era": "song", "preferred_surname": "苏"},
+    {"preferred_era": "modern", "preferred_surname": "林", "surname_weight": 0.5},
+]
+
+
+def _legacy_rank(loader, generated_names, options):
+    """重构前的逐个候选打分实现，用于比对排序结果"""
+    preferred_surname = (options.get('preferred_surname') or '').strip()
+    cultural_style = options.get('cultural_style', 'chinese_modern')
+    surname_weight = float(options.get('surname_weight', 1.0) or 1.0)
+    era_weight = float(options.get('era_weight', 1.0) or 1.0)
+    era_zh = {'tang': '唐', 'song': '宋', 'modern': '近现代'}.get((options.get('preferred_era') or '').strip(), '')
+    cleaned = []
+    for item in generated_names:
+        n = (item.get('name') or '').strip()
+        m = (item.get('meaning') or '').strip()
+        if not n or not m or n in ['例如', '示例', '参考'] or m in ['例如', '示例', '参考', '根据角色描述生成']:
+            continue
+        exists = loader.name_exists(n)
+        base_score = loader.char_presence_score(n)
+        era_bonus = 0
+        ancient_pref = cultural_style in ['chinese_traditional', 'chinese_classic']
+        if era_zh and era_zh != '近现代':
+            if loader.exists_in_dynasty(n, era_zh):
+                era_bonus = int(2500 * era_weight)
+            elif loader.exists_ancient(n):
+                era_bonus = int(1000 * era_weight)
+        else:
+            if ancient_pref and loader.exists_ancient(n):
+                era_bonus = int(2000 * era_weight)
+            elif (not ancient_pref) and loader.exists_modern(n):
+                era_bonus = int(2000 * era_weight)
+            elif loader.exists_ancient(n) or loader.exists_modern(n):
+                era_bonus = int(500 * era_weight)
+        surname_bonus = int(3000 * surname_weight) if preferred_surname and n.startswith(preferred_surname) else 0
+        cleaned.append({'name': n, 'meaning': m, 'exists': exists, 'score': base_score + era_bonus + surname_bonus})
+    cleaned.sort(key=lambda x: (not x['exists'], -x['score'], x['name']))
+    return [{'name': c['name'], 'meaning': c['meaning'], 'source': 'corpus_rank'} for c in cleaned]
+
+
+def _build_enhancer(monkeypatch, corpus_db):
+    loader = CorpusLoader(corpus_db)
+    monkeypatch.setattr(corpus_enhancer_module, "get_corpus_loader", lambda: loader)
+    return corpus_enhancer_module.CorpusEnhancer(), loader
+
+
+def test_filter_and_rank_names_matches_legacy_ordering(monkeypatch, corpus_db):
+    enhancer, loader = _build_enhancer(monkeypatch, corpus_db)
+
+    for options in OPTION_SETS:
+        assert enhancer.filter_and_rank_names(GENERATED, "描述", options) == _legacy_rank(
+            loader, GENERATED, options
+        ), options
+
+
+def test_filter_and_rank_names_uses_constant_query_count(monkeypatch, corpus_db):
+    enhancer, loader = _build_enhancer(monkeypatch, corpus_db)
+    options = {"preferred_era": "tang"}
+    enhancer.filter_and_rank_names(GENERATED, "描述", options)
+
+    def queries_for(names):
+        before = loader.get_connection_stats()["queries_served"]
+        enhancer.filter_and_rank_names(names, "描述", options)
+        return loader.get_connection_stats()["queries_served"] - before
+
+    small = queries_for(GENERATED[:2])
+    large = queries_for([{"name": f"林{i}", "meaning": "寓意"} for i in range(40)])
+
+    assert small == large
@@ -0,0 +1,212 @@
+import random
+import sqlite3
+import threading
+from collections import Counter
+
+import pytest
+
+from src.data.corpus_db import CorpusConnectionManager
+from src.data.corpus_loader import CorpusLoader
+
+
+def _like_count(db_path, sql, params):
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return conn.execute(sql, params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_char_presence_score_matches_like_queries(corpus_db):
+    loader = CorpusLoader(corpus_db)
+
+    for name in ["林清扬", "清清", "an", "A", "张_", "%", "无", ""]:
+        expected = sum(
+            _like_count(corpus_db, "SELECT COUNT(*) FROM chinese_names WHERE name LIKE ?", (f"%{ch}%",))
+            for ch in name
+        )
+        assert loader.char_presence_score(name) == expected, name
+
+
+def test_dynasty_char_presence_score_matches_like_queries(corpus_db):
+    loader = CorpusLoader(corpus_db)
+
+    for name, dynasty in [("李白", "tang"), ("苏清", "宋"), ("李", "明"), ("李", "unknown")]:
+        d = loader._normalize_dynasty(dynasty)
+        expected = 0
+        if d:
+            expected = sum(
+                _like_count(
+                    corpus_db,
+                    "SELECT COUNT(*) FROM ancient_names WHERE name LIKE ? AND dynasty = ?",
+                    (f"%{ch}%", d),
+                )
+                for ch in name
+            )
+        assert loader.dynasty_char_presence_score(name, dynasty) == expected, (name, dynasty)
+
+
+def test_char_index_is_built_once(corpus_db):
+    loader = CorpusLoader(corpus_db)
+
+    loader.char_presence_score("林")
+    index = loader._char_index
+    loader.char_presence_score("清扬")
+
+    assert index is not None
+    assert loader._char_index is index
+
+
+def test_queries_reuse_pooled_connections(corpus_db):
+    loader = CorpusLoader(corpus_db)
+
+    assert loader.exists_modern("林清扬") is True
+    assert loader.exists_ancient("李白") is True
+    assert loader.get_surname_frequency("王") == 9520
+    assert loader.load_names(limit=2) == ["林清扬", "苏知远"]
+
+    stats = loader.get_connection_stats()
+    assert stats["connections_opened"] == 1
+    assert stats["queries_served"] == 4
+
+    # 其他线程借用同一个空闲连接，线程结束后不留下连接
+    worker = threading.Thread(target=lambda: loader.name_exists("李白"))
+    worker.start()
+    worker.join()
+
+    stats = loader.get_connection_stats()
+    assert stats["connections_opened"] == 1
+    assert stats["queries_served"] == 6
+    loader.close()
+    assert loader.get_connection_stats()["connections_alive"] == 0
+
+
+def test_short_lived_threads_share_a_bounded_pool(corpus_db):
+    manager = CorpusConnectionManager(corpus_db, pool_size=2, checkout_timeout=0.1)
+    barrier = threading.Barrier(8)
+
+    def query():
+        # 同时持有游标，迫使连接池达到上限
+        cursor = manager.execute("SELECT name FROM chinese_names")
+        barrier.wait()
+        list(cursor)
+
+    threads = [threading.Thread(target=query) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for _ in range(200):
+        worker = threading.Thread(target=lambda: manager.execute("SELECT 1").fetchone())
+        worker.start()
+        worker.join()
+
+    stats = manager.get_stats()
+    assert stats["connections_alive"] == stats["connections_idle"] == 2
+    assert stats["connections_opened"] == 2 + stats["overflow_opened"]
+
+
+def test_abandoned_cursor_returns_its_connection(corpus_db):
+    manager = CorpusConnectionManager(corpus_db, pool_size=1, checkout_timeout=0)
+    rows = iter(manager.execute("SELECT name FROM chinese_names"))
+    next(rows)
+    del rows
+    assert manager.execute("SELECT COUNT(*) FROM chinese_names").fetchone()[0] > 0
+    assert manager.get_stats()["overflow_opened"] == 0
+
+
+def test_corpus_connection_is_read_only(corpus_db):
+    loader = CorpusLoader(corpus_db)
+
+    with pytest.raises(sqlite3.OperationalError):
+        loader._execute("DELETE FROM chinese_names")
+    assert loader.get_stats()["现代人名总数"] == len(loader.load_names())
+
+
+def test_get_random_names_respects_gender_and_style(corpus_db):
+    loader = CorpusLoader(corpus_db)
+
+    female = loader.get_random_names(count=20, gender="女")
+    ancient = loader.get_random_names(count=3, style="ancient")
+
+    assert sorted(item["name"] for item in female) == sorted(["林婉清", "苏雨晴", "王清清", "李娜", "Anna"])
+    assert all(item["gender"] == "女" and item["style"] == "modern" for item in female)
+    assert len(ancient) == 3
+    assert all(item["style"] == "ancient" for item in ancient)
+    assert loader.get_random_names(count=5, gender="其他") == []
+
+
+def test_get_random_names_is_uniform(corpus_db):
+    random.seed(1234)
+    loader = CorpusLoader(corpus_db)
+
+    counts = Counter()
+    trials = 6000
+    for _ in range(trials):
+        counts.update(item["name"] for item in loader.get_random_names(count=2, gender="男"))
+
+    expected = trials * 2 / len(counts)
+    assert len(counts) == 6
+    assert all(abs(value - expected) / expected < 0.1 for value in counts.values())
+
+
+def test_get_chengyu_for_naming_filters_category(corpus_db):
+    loader = CorpusLoader(corpus_db)
+
+    boys = loader.get_chengyu_for_naming(count=10, category="男孩")
+    everything = loader.get_chengyu_for_naming(count=10)
+
+    assert {item["chengyu"] for item in boys} == {"志存高远", "一鸣惊人"}
+    assert boys[0]["suggested_chars"] == boys[0]["chengyu"][2:4]
+    # 非四字成语会被过滤
+    assert len(everything) == 6
+
+
+@pytest.mark.parametrize("membership_mode", ["off", "set", "bloom"])
+def test_lookup_names_matches_single_name_checks(corpus_db, membership_mode):
+    loader = CorpusLoader(corpus_db, membership_mode=membership_mode)
+    names = ["林清扬", "李白", "苏轼", "屈原", "不存在", "林清扬", ""]
+
+    for dynasty in [None, "song", "唐", "unknown"]:
+        result = loader.lookup_names(names, dynasty=dynasty)
+
+        assert "" not in result
+        for name in set(names) - {""}:
+            assert result[name]["modern"] == loader.exists_modern(name)
+            assert result[name]["ancient"] == loader.exists_ancient(name)
+            assert result[name]["in_dynasty"] == (
+                bool(dynasty) and loader.exists_in_dynasty(name, dynasty)
+            )
+
+
+def test_lookup_names_uses_one_query_per_table(corpus_db):
+    loader = CorpusLoader(corpus_db, membership_mode="off")
+    loader.get_schema()
+    before = loader.get_connection_stats()["queries_served"]
+
+    loader.lookup_names([f"名{i}" for i in range(50)] + ["李白"], dynasty="tang", chunk_size=500)
+
+    assert loader.get_connection_stats()["queries_served"] - before == 2
+
+
+def test_schema_metadata_is_cached_per_loader(corpus_db):
+    conn = sqlite3.connect(str(corpus_db))
+    conn.execute("CREATE INDEX idx_chinese_names_name ON chinese_names(name, gender)")
+    conn.commit()
+    conn.close()
+    loader = CorpusLoader(corpus_db)
+
+    assert loader._has_column("ancient_names", "dynasty") is True
+    before = loader.get_connection_stats()["queries_served"]
+    for _ in range(5):
+        assert loader._has_column("ancient_names", "dynasty") is True
+        assert loader._has_column("chinese_names", "dynasty") is False
+        assert loader._has_column("sqlite_master", "name") is False
+    assert loader.get_connection_stats()["queries_served"] == before
+
+    schema = loader.get_stats()["schema"]
+    assert schema["chinese_names"]["row_count"] == 12
+    assert schema["chinese_names"]["indexes"] == {"idx_chinese_names_name": ["name", "gender"]}
+    assert loader._has_index("chinese_names", ["name"]) is True
+    assert loader._has_index("chinese_names", ["gender"]) is False
+    assert loader.get_table_row_count("themed_names") == 0
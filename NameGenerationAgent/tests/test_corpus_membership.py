@@ -0,0 +1,76 @@
+import src.web.app as web_app_module
+from src.data.corpus_loader import CorpusLoader
+from src.data.corpus_membership import BloomFilter, CorpusMembershipCache
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_error_rate():
+    bloom = BloomFilter(capacity=2000, error_rate=0.01)
+    members = [f"名{i}" for i in range(2000)]
+    for key in members:
+        bloom.add(key)
+
+    assert all(key in bloom for key in members)
+    false_positives = sum(f"外{i}" in bloom for i in range(5000))
+    assert false_positives / 5000 < 0.03
+
+
+def test_set_mode_answers_lookups_without_queries(corpus_db):
+    loader = CorpusLoader(corpus_db, membership_mode="set")
+    loader.lookup_names(["林清扬"], dynasty="tang")
+    before = loader.get_connection_stats()["queries_served"]
+
+    result = loader.lookup_names(["林清扬", "李白", "不存在"], dynasty="tang")
+
+    assert loader.get_connection_stats()["queries_served"] == before
+    assert result["李白"] == {"modern": False, "ancient": True, "in_dynasty": True}
+    stats = loader.get_membership_stats()
+    assert stats["state"] == "ready"
+    assert stats["indexes"]["modern"]["kind"] == "set"
+    assert stats["indexes"]["modern"]["hits"] == 2
+    assert stats["indexes"]["modern"]["definite_negatives"] == 2
+    assert stats["indexes"]["modern"]["false_positive_rate"] == 0.0
+
+
+def test_bloom_mode_confirms_positives_and_tracks_false_positives(corpus_db):
+    loader = CorpusLoader(corpus_db, membership_mode="bloom")
+    index = loader._membership.get()["modern"]
+    index._container = type("AlwaysMaybe", (), {"__contains__": lambda self, key: True})()
+
+    result = loader.lookup_names(["林清扬", "不存在"])
+
+    assert result["林清扬"]["modern"] is True
+    assert result["不存在"]["modern"] is False
+    stats = loader.get_membership_stats()["indexes"]["modern"]
+    assert stats["kind"] == "bloom"
+    assert stats["maybe"] == 2
+    assert stats["false_positives"] == 1
+    assert stats["false_positive_rate"] == 1.0
+
+
+def test_auto_mode_falls_back_to_bloom_when_memory_budget_is_small(corpus_db):
+    loader = CorpusLoader(corpus_db, membership_mode="off")
+    cache = CorpusMembershipCache(loader._execute, mode="auto", max_bytes=100)
+
+    assert cache.get()["modern"].kind == "bloom"
+
+
+def test_build_timeout_disables_cache(corpus_db):
+    loader = CorpusLoader(corpus_db, membership_mode="off")
+    cache = CorpusMembershipCache(loader._execute, mode="set", max_build_seconds=-1)
+
+    assert cache.get() is None
+    assert cache.get_stats()["state"] == "failed"
+
+
+def test_corpus_stats_endpoint_reports_membership(monkeypatch, corpus_db):
+    loader = CorpusLoader(corpus_db, membership_mode="set")
+    loader.lookup_names(["林清扬"])
+    monkeypatch.setattr(web_app_module, "get_corpus_loader", lambda: loader)
+
+    with web_app_module.app.test_client() as client:
+        response = client.get("/stats/corpus")
+
+    payload = response.get_json()
+    assert response.status_code == 200
+    assert payload["membership"]["indexes"]["modern"]["hits"] == 1
+    assert payload["connections"]["connections_opened"] == 1
@@ -0,0 +1,92 @@
+import time
+
+import src.core.corpus_enhancer as corpus_enhancer_module
+from config.settings import Config
+from src.core.example_pool import ExamplePool, ExamplePoolManager
+from src.data.corpus_loader import CorpusLoader
+
+FEMALE_NAMES = {"林婉清", "苏雨晴", "王清清", "李娜", "Anna"}
+TANG_NAMES = {"李白", "杜甫", "白居易"}
+ANCIENT_NAMES = {"李白", "杜甫", "白居易", "苏轼", "苏辙", "李清照", "刘基", "屈原"}
+
+
+def _build_enhancer(monkeypatch, corpus_db, **config):
+    monkeypatch.setattr(Config, "EXAMPLE_POOL_REFRESH_SECONDS", 0)
+    for name, value in config.items():
+        monkeypatch.setattr(Config, name, value)
+    loader = CorpusLoader(corpus_db)
+    monkeypatch.setattr(corpus_enhancer_module, "get_corpus_loader", lambda: loader)
+    return corpus_enhancer_module.CorpusEnhancer(), loader
+
+
+def test_style_examples_are_served_from_pool_without_queries(monkeypatch, corpus_db):
+    enhancer, loader = _build_enhancer(monkeypatch, corpus_db)
+    female = FEMALE_NAMES
+
+    first = enhancer._get_style_examples("chinese_modern", "女")
+    assert first and set(first) <= female
+
+    queries = loader.get_connection_stats()["queries_served"]
+    for _ in range(20):
+        assert set(enhancer._get_style_examples("chinese_modern", "女")) <= female
+    assert loader.get_connection_stats()["queries_served"] == queries
+
+
+def test_traditional_examples_respect_era(monkeypatch, corpus_db):
+    enhancer, _ = _build_enhancer(monkeypatch, corpus_db)
+    tang, every = TANG_NAMES, ANCIENT_NAMES
+
+    assert set(enhancer._get_style_examples("chinese_traditional", None, "唐")) == tang
+    assert set(enhancer._get_style_examples("chinese_traditional", None, "辽")) <= every
+    assert len(enhancer._get_style_examples("chinese_traditional")) == min(10, len(every))
+
+    prompt = enhancer.enhance_prompt("基础", "诗人", {"cultural_style": "chinese_traditional", "preferred_era": "tang"})
+    examples = prompt.split("参考以下真实姓名示例：")[1].split("\n")[0].split(", ")
+    assert set(examples) <= tang
+
+
+def test_pool_memory_is_bounded(monkeypatch, corpus_db):
+    enhancer, _ = _build_enhancer(monkeypatch, corpus_db, EXAMPLE_POOL_SIZE=3, EXAMPLE_POOL_MAX_POOLS=2)
+
+    enhancer._get_style_examples("chinese_modern", "男")
+    enhancer._get_style_examples("chinese_modern", "女")
+    enhancer._get_style_examples("chinese_traditional")
+
+    stats = enhancer.example_pools.get_stats()
+    assert stats["pools"] == 2
+    assert stats["evictions"] == 1
+    assert stats["entries"] <= 2 * 3
+    assert len(enhancer._get_style_examples("chinese_modern", "女")) == 3
+    assert enhancer.example_pools.get_stats()["evictions"] == 1
+
+
+def test_pool_refresh_replaces_contents():
+    batches = iter([["甲", "乙", "甲", ""], ["丙", "丁"]])
+    pool = ExamplePool(lambda count: next(batches), size=5)
+
+    pool.refresh()
+    assert sorted(pool.sample(10)) == ["乙", "甲"]
+    pool.refresh()
+    assert sorted(pool.sample(10)) == ["丁", "丙"]
+    assert pool.refresh_count == 2
+
+
+def test_background_rotation_refreshes_pools():
+    calls = []
+
+    def factory(key):
+        return lambda count: calls.append(key) or [f"名{len(calls)}"]
+
+    manager = ExamplePoolManager(factory, pool_size=5, refresh_interval=0.02)
+    try:
+        assert manager.sample(("modern", None, None), 1) == ["名1"]
+        deadline = time.monotonic() + 2
+        while manager.get_stats()["rotations"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stats = manager.get_stats()
+        assert stats["rotating"] is True
+        assert stats["rotations"] >= 2
+        assert manager.sample(("modern", None, None), 1) != ["名1"]
+    finally:
+        manager.stop()
+    assert manager.get_stats()["rotating"] is False
@@ -0,0 +1,185 @@
+import threading
+import time
+
+import src.api.unified_client as unified_client_module
+from config.settings import Config
+from src.api.adapters.base_adapter import APIException
+from src.api.hedging import HedgedRunner, LatencyTracker
+from src.utils.cache_manager import CacheManager
+
+
+def _call_with(behaviours, calls):
+    """behaviours: 平台名 -> (耗时秒, 结果或异常)"""
+
+    def call(name, index):
+        calls.append(name)
+        delay, outcome = behaviours[name]
+        time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return call
+
+
+def _valid(result):
+    return bool(result.get("names"))
+
+
+def test_slow_primary_is_hedged_and_fast_provider_wins():
+    runner = HedgedRunner(enabled=True, delay_ms=50, max_hedges=1)
+    calls = []
+    call = _call_with({"aistudio": (1.0, {"names": ["慢"]}), "aliyun": (0.01, {"names": ["快"]})}, calls)
+
+    started = time.perf_counter()
+    winner, result, _ = runner.run(["aistudio", "aliyun"], call, _valid)
+
+    assert (winner, result) == ("aliyun", {"names": ["快"]})
+    assert time.perf_counter() - started < 0.5
+    stats = runner.get_stats()
+    assert (stats["hedges_launched"], stats["hedge_wins"], stats["abandoned_calls"]) == (1, 1, 1)
+    assert stats["wins_by_provider"] == {"aliyun": 1}
+
+
+def test_fast_primary_is_not_hedged():
+    runner = HedgedRunner(enabled=True, delay_ms=500)
+    calls = []
+    call = _call_with({"aliyun": (0.01, {"names": ["快"]}), "paiou": (0.01, {"names": ["备"]})}, calls)
+
+    assert runner.run(["aliyun", "paiou"], call, _valid)[0] == "aliyun"
+    assert calls == ["aliyun"]
+    assert runner.get_stats()["primary_wins"] == 1
+
+
+def test_hedges_are_capped_and_failures_fall_through():
+    runner = HedgedRunner(enabled=True, delay_ms=20, max_hedges=1)
+    calls = []
+    call = _call_with({
+        "a": (0.3, APIException("timeout")),
+        "b": (0.05, APIException("down")),
+        "c": (0.01, {"names": ["丙"]}),
+    }, calls)
+
+    winner, result, last_error = runner.run(["a", "b", "c"], call, _valid)
+
+    # b 是唯一的对冲调用；它失败后 c 作为正常降级发起
+    assert winner == "c"
+    assert calls == ["a", "b", "c"]
+    assert runner.get_stats()["hedges_launched"] == 1
+    assert str(last_error) == "down"
+
+
+def test_all_failures_return_last_error():
+    runner = HedgedRunner(enabled=True, delay_ms=10)
+    call = _call_with({"a": (0, APIException("a down")), "b": (0, APIException("b down"))}, [])
+    winner, result, last_error = runner.run(["a", "b"], call, _valid)
+    assert (winner, result) == (None, None)
+    assert isinstance(last_error, APIException)
+    assert runner.get_stats()["no_valid_result"] == 1
+
+
+def test_primary_calls_are_not_bounded_by_hedge_workers():
+    runner = HedgedRunner(enabled=True, delay_ms=5000, workers=1)
+    barrier = threading.Barrier(4, timeout=2)
+
+    def call(name, index):
+        # 4 个请求的首选调用必须同时进行才能越过屏障
+        barrier.wait()
+        return {"names": [name]}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(runner.run(["a", "b"], call, _valid)[0]))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["a"] * 4
+
+
+def test_hedge_is_skipped_when_hedge_workers_are_busy():
+    runner = HedgedRunner(enabled=True, delay_ms=20, workers=1)
+    release = threading.Event()
+
+    def call(name, index):
+        if name == "hung":
+            release.wait(2)
+            raise APIException("timeout")
+        time.sleep(0.1 if name == "slow" else 0)
+        return {"names": [name]}
+
+    # 第一个请求的对冲调用占住唯一的对冲线程
+    first = threading.Thread(target=lambda: runner.run(["slow", "hung"], call, _valid))
+    first.start()
+    time.sleep(0.05)
+
+    assert runner.run(["slow", "fast"], call, _valid)[0] == "slow"
+    assert runner.get_stats()["hedges_skipped"] == 1
+    release.set()
+    first.join()
+
+
+def test_hedge_delay_uses_p95_once_enough_samples():
+    runner = HedgedRunner(enabled=True, delay_ms=5000, min_samples=20)
+    for latency in range(1, 20):
+        runner.latency.record("aliyun", latency * 100)
+    assert runner.hedge_delay("aliyun") == 5.0
+    runner.latency.record("aliyun", 2000)
+    assert runner.hedge_delay("aliyun") == 2.0
+
+
+def test_latency_tracker_keeps_recent_window():
+    tracker = LatencyTracker(window=3)
+    for latency in (1000, 10, 20, 30):
+        tracker.record("paiou", latency)
+    assert tracker.snapshot()["paiou"] == {"samples": 3, "p50_ms": 20, "p95_ms": 30}
+
+
+class TimedAdapter:
+    def __init__(self, name, delay, label):
+        self.name = name
+        self.base_url = "https://example.com"
+        self.delay = delay
+        self.label = label
+        self.finished = threading.Event()
+
+    def generate_names(self, prompt, **kwargs):
+        time.sleep(self.delay)
+        self.finished.set()
+        return {"success": True, "names": [{"name": self.label, "meaning": "寓意"}], "api_name": self.name}
+
+
+class DummyRouter:
+    def get_priority(self, adapters, preferred_api=None, context=None):
+        return ["aistudio", "aliyun"]
+
+
+def test_unified_client_returns_first_valid_hedged_result(cache_dir, monkeypatch):
+    monkeypatch.setattr(Config, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(Config, "HEDGE_DELAY_MS", 50)
+    slow = TimedAdapter("aistudio", 1.0, "慢")
+    fast = TimedAdapter("aliyun", 0.01, "林清扬")
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_adapters",
+        lambda self: setattr(self, "adapters", {"aistudio": slow, "aliyun": fast}),
+    )
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_router",
+        lambda self: setattr(self, "router_strategy", DummyRouter()),
+    )
+    client = unified_client_module.UnifiedAPIClient()
+    client.cache_manager = CacheManager(backend="memory")
+
+    started = time.perf_counter()
+    result = client.generate_names(prompt="p", count=1)
+    assert time.perf_counter() - started < 0.5
+    assert result["api_name"] == "aliyun"
+    assert client.hedger.get_stats()["wins_by_provider"] == {"aliyun": 1}
+
+    # 落选调用完成后不会覆盖已缓存的胜出结果
+    slow.finished.wait(2)
+    assert client.generate_names(prompt="p", count=1)["names"][0]["name"] == "林清扬"
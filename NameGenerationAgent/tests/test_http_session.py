@@ -0,0 +1,165 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from config.settings import Config
+from src.api.adapters.aliyun_adapter import AliyunAdapter
+from src.api.adapters.base_adapter import APIException
+from src.api.adapters.siliconflow_adapter import SiliconFlowAdapter
+from src.api.http_session import create_http_session, get_session_stats, resolve_session_options
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 依次返回的状态码，用完后一直返回 200
+    statuses = []
+    connections = set()
+    # 非 200 响应附带的 Retry-After（秒），None 表示不带
+    retry_after = None
+
+    def _reply(self):
+        self.connections.add(self.client_address)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        status = self.statuses.pop(0) if self.statuses else 200
+        if status == 200:
+            payload = {
+                "data": [{"id": "qwen-turbo"}],
+                "choices": [{"message": {"content": "1. 林清扬: 清风朗月"}}],
+            }
+        else:
+            payload = {"message": "busy"}
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status != 200 and self.retry_after is not None:
+            self.send_header("Retry-After", str(self.retry_after))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    StubHandler.statuses = []
+    StubHandler.connections = set()
+    StubHandler.retry_after = None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class StubConfig:
+    def __init__(self, name, base_url):
+        self.name = name
+        self.base_url = base_url
+        self.api_key = "test-key"
+        self.enabled = True
+        self.model = "qwen-turbo"
+        self.max_tokens = 100
+        self.fallback_models = []
+
+    def get_headers(self):
+        return {"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key}"}
+
+
+def test_session_reuses_connections(stub_server):
+    session = create_http_session(max_retries=0)
+    for _ in range(5):
+        assert session.get(f"{stub_server}/models", timeout=5).status_code == 200
+
+    stats = get_session_stats(session)
+    assert (stats["requests"], stats["connections_opened"], stats["reused"]) == (5, 1, 4)
+    assert stats["reuse_rate"] == 0.8
+    assert len(StubHandler.connections) == 1
+
+
+def test_session_retries_busy_responses(stub_server):
+    StubHandler.statuses = [503, 429]
+    StubHandler.retry_after = 0
+    session = create_http_session(max_retries=2, backoff_factor=0)
+    response = session.post(f"{stub_server}/chat/completions", json={}, timeout=5)
+
+    assert response.status_code == 200
+    stats = get_session_stats(session)
+    assert (stats["requests"], stats["attempts"], stats["retries"]) == (1, 3, 2)
+
+
+@pytest.mark.parametrize("status", [502, 504, 503])
+def test_generation_requests_are_not_retried_after_gateway_errors(stub_server, status):
+    # 502/504 与不带 Retry-After 的 503 可能已在上游生成并计费，POST 不重试
+    StubHandler.statuses = [status]
+    session = create_http_session(max_retries=2, backoff_factor=0)
+    assert session.post(f"{stub_server}/chat/completions", json={}, timeout=5).status_code == status
+    assert get_session_stats(session)["retries"] == 0
+
+    StubHandler.statuses = [status]
+    assert session.get(f"{stub_server}/models", timeout=5).status_code == 200
+
+
+def test_connection_failures_are_not_retried_by_default():
+    session = create_http_session(max_retries=2, backoff_factor=0)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get("http://127.0.0.1:9/models", timeout=5)
+    assert get_session_stats(session)["attempts"] == 1
+
+
+def test_exhausted_retries_surface_the_error_status(stub_server):
+    StubHandler.statuses = [503, 503]
+    session = create_http_session(max_retries=1, backoff_factor=0)
+    assert session.get(f"{stub_server}/models", timeout=5).status_code == 503
+
+
+def test_adapters_share_their_session_across_calls(stub_server, monkeypatch):
+    monkeypatch.setattr(Config, "HTTP_MAX_RETRIES", 0)
+    adapter = AliyunAdapter(StubConfig("aliyun", stub_server))
+    monkeypatch.setattr(adapter, "CHAT_COMPLETIONS_URL", f"{stub_server}/chat/completions")
+    monkeypatch.setattr(adapter, "MODEL_LIST_URL", f"{stub_server}/models")
+
+    assert adapter.get_http_stats()["requests"] == 0
+    assert adapter.list_models()[0]["id"] == "qwen-turbo"
+    for _ in range(3):
+        assert adapter.generate_names("请生成一个姓名")["names"][0]["name"] == "林清扬"
+
+    stats = adapter.get_http_stats()
+    assert (stats["requests"], stats["connections_opened"]) == (4, 1)
+    adapter.close()
+
+
+def test_make_request_uses_pooled_session(stub_server, monkeypatch):
+    monkeypatch.setattr(SiliconFlowAdapter, "_create_client", lambda self: None)
+    adapter = SiliconFlowAdapter(StubConfig("siliconflow", stub_server))
+    adapter._make_request("models", {}, method="GET", timeout=5)
+    adapter._make_request("models", {}, method="GET", timeout=5)
+    assert adapter.get_http_stats()["reused"] == 1
+
+    StubHandler.statuses = [400]
+    with pytest.raises(APIException):
+        adapter._make_request("chat/completions", {})
+
+
+def test_session_options_can_be_overridden_per_provider(monkeypatch):
+    monkeypatch.setenv("ALIYUN_HTTP_POOL_MAXSIZE", "4")
+    monkeypatch.setenv("ALIYUN_HTTP_MAX_RETRIES", "0")
+    config = StubConfig("paiou", "http://localhost")
+    config.http_backoff_factor = 2
+
+    aliyun = resolve_session_options("aliyun")
+    paiou = resolve_session_options("paiou", config)
+
+    assert (aliyun["pool_maxsize"], aliyun["max_retries"]) == (4, 0)
+    assert (paiou["pool_maxsize"], paiou["max_retries"]) == (Config.HTTP_POOL_MAXSIZE, Config.HTTP_MAX_RETRIES)
+    assert paiou["backoff_factor"] == 2.0
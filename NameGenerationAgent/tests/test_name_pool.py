@@ -0,0 +1,178 @@
+import importlib
+import sys
+import types
+
+import pytest
+
+from config.settings import Config
+from src.core.name_pool import NamePool, ShownStore
+from src.utils.cache_keys import build_request_signature
+from src.utils.cache_manager import CacheManager
+
+SIGNATURE = build_request_signature("温柔坚定的女孩", count=2, cultural_style="chinese_modern", gender="female")
+
+
+def _result(names, api_name="paiou"):
+    return {
+        "success": True,
+        "names": [{"name": n, "meaning": f"{n}的寓意", "source": api_name} for n in names],
+        "api_name": api_name,
+        "model": "m",
+    }
+
+
+@pytest.fixture
+def cache_manager(cache_dir):
+    return CacheManager(backend="memory")
+
+
+def _names(result):
+    return [item["name"] for item in result["names"]]
+
+
+def test_request_count():
+    pool = NamePool(cache_manager=None, factor=3, max_names=40)
+    assert pool.request_count(5) == 15
+    assert pool.request_count(20) == 40
+    assert NamePool(cache_manager=None, factor=1).request_count(5) == 5
+
+
+def test_pool_serves_unseen_names_per_user(cache_manager):
+    pool = NamePool(cache_manager, factor=3)
+    assert pool.take(SIGNATURE, 2, user_id=1) is None
+
+    pool.put(SIGNATURE, _result(["林清扬", "苏知远", "顾明澈", "林清扬", "沈若溪", "陆星河"]))
+
+    first = pool.take(SIGNATURE, 2, user_id=1)
+    second = pool.take(SIGNATURE, 2, user_id=1)
+    assert _names(first) == ["林清扬", "苏知远"]
+    assert _names(second) == ["顾明澈", "沈若溪"]
+    assert first["from_pool"] is True and first["api_name"] == "paiou"
+
+    # 剩余不足时返回 None，由调用方重新生成
+    assert pool.take(SIGNATURE, 2, user_id=1) is None
+    assert _names(pool.take(SIGNATURE, 2, user_id=1, allow_repeats=True)) == ["陆星河", "林清扬"]
+
+    # 其他用户的已展示记录互不影响
+    assert _names(pool.take(SIGNATURE, 2, user_id=2)) == ["林清扬", "苏知远"]
+
+    stats = pool.get_stats()
+    assert stats["refills"] == 1
+    assert stats["names_served"] == 8
+    assert cache_manager.get_stats()["by_prefix"]["pool"]["sets"] == 1
+
+
+def test_shown_set_is_bounded(cache_manager):
+    pool = NamePool(cache_manager, factor=3, shown_limit=3)
+    pool.put(SIGNATURE, _result(["甲一", "乙二", "丙三", "丁四"]))
+    pool.take(SIGNATURE, 2, user_id=1)
+    pool.take(SIGNATURE, 2, user_id=1)
+
+    assert len(pool.shown_store.get(pool._shown_key(SIGNATURE, 1))) == 3
+
+
+def test_shown_sets_do_not_evict_cached_results(cache_manager, monkeypatch):
+    monkeypatch.setattr(cache_manager, "max_size", 2)
+    pool = NamePool(cache_manager, factor=3, shown_store=ShownStore(max_entries=5))
+    pool.put(SIGNATURE, _result(["甲一", "乙二", "丙三", "丁四"]))
+
+    for user_id in range(50):
+        assert pool.take(SIGNATURE, 2, user_id=user_id) is not None
+
+    # 已展示记录不写入结果缓存，池仍在；记录本身按 LRU 保持在上限内
+    assert "shown" not in cache_manager.get_stats()["by_prefix"]
+    assert pool.take(SIGNATURE, 2, user_id=99) is not None
+    stats = pool.get_stats()
+    assert stats["shown_entries"] == 5
+    assert stats["shown_evictions"] == 46
+
+
+def test_shown_store_expires_entries():
+    now = [0.0]
+    store = ShownStore(max_entries=10, ttl=60, clock=lambda: now[0])
+    store.set("k", ["甲一"])
+    assert store.get("k") == ["甲一"]
+    now[0] = 61
+    assert store.get("k") is None
+    assert len(store) == 0
+
+
+class PoolingClient:
+    def __init__(self, cache_manager):
+        self.cache_manager = cache_manager
+        self.calls = []
+        self.batches = [
+            ["林清扬", "苏知远", "顾明澈", "沈若溪", "陆星河", "江映雪"],
+            ["温如玉", "楚云舒", "林清扬", "叶知秋", "秦慕白", "许南风"],
+        ]
+
+    def generate_names(self, **kwargs):
+        self.calls.append(kwargs)
+        return _result(self.batches[len(self.calls) - 1])
+
+    def get_available_apis(self):
+        return ["paiou"]
+
+    def get_api_status(self):
+        return {"paiou": {"enabled": True}}
+
+
+class DummyPromptTemplates:
+    def build_prompt(self, **kwargs):
+        return f"count:{kwargs['count']}"
+
+
+class DummyValidator:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: {"valid": True}
+
+
+def _generator(client, monkeypatch):
+    unified_client_module = types.ModuleType("src.api.unified_client")
+    unified_client_module.unified_client = client
+    monkeypatch.setitem(sys.modules, "src.api.unified_client", unified_client_module)
+    sys.modules.pop("src.core.name_generator", None)
+    module = importlib.import_module("src.core.name_generator")
+
+    monkeypatch.setattr(module, "get_unified_client", lambda: client)
+    monkeypatch.setattr(module, "get_prompt_templates", lambda: DummyPromptTemplates())
+    monkeypatch.setattr(module, "get_input_validator", lambda: DummyValidator())
+    monkeypatch.setattr(module, "get_response_validator", lambda: DummyValidator())
+    monkeypatch.setattr(module, "get_corpus_enhancer", lambda: None)
+    return module.NameGenerator()
+
+
+def test_pool_is_off_by_default_and_requests_use_the_result_cache(cache_manager, monkeypatch):
+    client = PoolingClient(cache_manager)
+    generator = _generator(client, monkeypatch)
+
+    assert not generator.name_pool.enabled
+    generator.generate_names(description="温柔坚定的女孩", count=2, user_id=7)
+    assert (client.calls[0]["count"], client.calls[0]["use_cache"]) == (2, True)
+    assert client.calls[0]["max_tokens"] == 2000
+
+
+def test_name_generator_serves_repeats_from_pool(cache_manager, monkeypatch):
+    client = PoolingClient(cache_manager)
+    monkeypatch.setattr(Config, "NAME_POOL_FACTOR", 3)
+    generator = _generator(client, monkeypatch)
+    served = []
+    for _ in range(4):
+        result = generator.generate_names(description="温柔坚定的女孩", count=2, user_id=7)
+        assert result["success"] is True
+        served.append([item["name"] for item in result["names"]])
+
+    assert len(client.calls) == 2
+    assert client.calls[0]["count"] == 6
+    assert client.calls[0]["prompt"] == "count:6"
+    assert client.calls[0]["use_cache"] is False
+    assert served[:3] == [["林清扬", "苏知远"], ["顾明澈", "沈若溪"], ["陆星河", "江映雪"]]
+    assert served[3] == ["温如玉", "楚云舒"]
+    assert generator.get_generation_stats()["name_pool"]["pool_hits"] == 4
+
+
+def test_max_tokens_scales_with_pool_size():
+    module = importlib.import_module("src.core.name_generator")
+    assert module.NameGenerator._max_tokens_for(5) == module.MIN_MAX_TOKENS
+    # 40 个姓名预计约 3200 个输出 token，不能再用固定的 2000 截断
+    assert module.NameGenerator._max_tokens_for(40) >= 40 * module.TOKENS_PER_NAME
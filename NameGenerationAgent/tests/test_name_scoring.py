@@ -0,0 +1,82 @@
+import pytest
+
+import src.core.name_scoring as name_scoring
+from src.core.name_scoring import NameScoringEngine, ScoringWeights, split_surname
+from src.data.corpus_loader import CorpusLoader
+
+NAMES = ["林清扬", "李白", "苏轼", "王清清", "林未见", "张伟", "王未见", "李未见", "Anna"]
+
+CASES = [
+    {},
+    {"cultural_style": "chinese_traditional"},
+    {"dynasty": "唐", "weights": ScoringWeights(era_weight=2.0)},
+    {"dynasty": "宋", "preferred_surname": "苏"},
+    {"preferred_surname": "林", "weights": ScoringWeights(surname_weight=0.5)},
+    {"weights": ScoringWeights(surname_frequency_weight=0.37)},
+]
+
+
+def _reference_scores(loader, names, dynasty=None, cultural_style="chinese_modern",
+                      preferred_surname="", weights=None):
+    weights = weights or ScoringWeights()
+    frequencies = loader.get_surname_frequencies()
+    scores = []
+    for n in names:
+        era_bonus = 0
+        if dynasty:
+            if loader.exists_in_dynasty(n, dynasty):
+                era_bonus = int(2500 * weights.era_weight)
+            elif loader.exists_ancient(n):
+                era_bonus = int(1000 * weights.era_weight)
+        elif cultural_style in ("chinese_traditional", "chinese_classic") and loader.exists_ancient(n):
+            era_bonus = int(2000 * weights.era_weight)
+        elif cultural_style not in ("chinese_traditional", "chinese_classic") and loader.exists_modern(n):
+            era_bonus = int(2000 * weights.era_weight)
+        elif loader.exists_ancient(n) or loader.exists_modern(n):
+            era_bonus = int(500 * weights.era_weight)
+        surname_bonus = int(3000 * weights.surname_weight) if preferred_surname and n.startswith(preferred_surname) else 0
+        frequency = frequencies.get(split_surname(n, frequencies, preferred_surname), 0)
+        scores.append(loader.char_presence_score(n) + era_bonus + surname_bonus
+                      + int(frequency * weights.surname_frequency_weight))
+    return scores
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_python_backend_matches_per_candidate_scoring(corpus_db, case):
+    loader = CorpusLoader(corpus_db)
+    engine = NameScoringEngine(loader, use_numpy=False)
+
+    assert engine.backend == "python"
+    assert engine.score(NAMES, **case)["score"] == _reference_scores(loader, NAMES, **case)
+
+
+@pytest.mark.skipif(name_scoring.np is None, reason="NumPy 未安装")
+@pytest.mark.parametrize("case", CASES)
+def test_numpy_backend_matches_python_backend(corpus_db, case):
+    loader = CorpusLoader(corpus_db)
+    numpy_engine = NameScoringEngine(loader)
+    python_engine = NameScoringEngine(loader, use_numpy=False)
+
+    assert numpy_engine.backend == "numpy"
+    assert numpy_engine.score(NAMES, **case) == python_engine.score(NAMES, **case)
+    assert numpy_engine.rank(NAMES, **case) == python_engine.rank(NAMES, **case)
+
+
+def test_surname_frequency_weight_promotes_common_surnames(corpus_db):
+    engine = NameScoringEngine(CorpusLoader(corpus_db), use_numpy=False)
+    names = ["林未见", "王未见", "苏未见"]
+
+    features = engine.score(names, weights=ScoringWeights(surname_frequency_weight=1.0))
+    assert features["surname_frequency"] == [3000, 9520, 1500]
+    assert [names[i] for i in engine.rank(names, weights=ScoringWeights(surname_frequency_weight=1.0))] == [
+        "王未见", "林未见", "苏未见"
+    ]
+
+
+def test_split_surname_prefers_preferred_and_compound_surnames():
+    frequencies = {"王": 10, "欧阳": 5}
+
+    assert split_surname("欧阳修", frequencies) == "欧阳"
+    assert split_surname("欧阳", frequencies) == "欧"
+    assert split_surname("王五", frequencies) == "王"
+    assert split_surname("司马光", frequencies, preferred_surname="司马") == "司马"
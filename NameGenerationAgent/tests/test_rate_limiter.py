@@ -0,0 +1,175 @@
+import threading
+import time
+
+import pytest
+
+import src.api.unified_client as unified_client_module
+from config.api_config import AistudioConfig, AliyunConfig
+from config.settings import Config
+from src.api.circuit_breaker import CircuitOpenError
+from src.api.rate_limiter import (
+    ProviderLimiter,
+    RateLimitExceeded,
+    TokenBucket,
+    estimate_tokens,
+)
+from src.utils.cache_manager import CacheManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_per_minute():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock)
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock.now += 1
+    assert bucket.wait_time(1) == 0
+    # 超过容量的请求按容量计，不会永远等待
+    assert bucket.wait_time(1000) == pytest.approx(59.0)
+
+
+def test_spent_budget_routes_elsewhere_without_waiting():
+    clock = FakeClock()
+    limiter = ProviderLimiter("aliyun", requests_per_minute=2, max_wait=2.0, clock=clock)
+    limiter.acquire()
+    limiter.release()
+    limiter.acquire()
+    limiter.release()
+
+    # 下一个额度要 30 秒后才恢复，超过最长排队时间，立即拒绝
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire()
+    clock.now += 30
+    assert limiter.acquire() == 0
+    assert limiter.get_stats()["rejected"] == 1
+
+
+def test_token_budget_is_corrected_with_actual_usage():
+    clock = FakeClock()
+    limiter = ProviderLimiter("aliyun", tokens_per_minute=1000, max_wait=0, clock=clock)
+    limiter.acquire(800)
+    limiter.release(800, actual_tokens=200)
+    limiter.acquire(800)
+    limiter.release(800)
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(100)
+
+
+def test_in_flight_limit_queues_and_records_wait_time():
+    limiter = ProviderLimiter("aistudio", max_in_flight=1, max_wait=2.0)
+    limiter.acquire()
+    threading.Timer(0.1, limiter.release).start()
+
+    waited = limiter.acquire()
+    assert waited >= 0.05
+    stats = limiter.get_stats()
+    assert (stats["acquired"], stats["queued"], stats["in_flight"]) == (2, 1, 1)
+    assert stats["max_wait_ms"] >= 50
+
+
+def test_in_flight_limit_gives_up_after_max_wait():
+    limiter = ProviderLimiter("aistudio", max_in_flight=1, max_wait=0.05)
+    limiter.acquire()
+    started = time.perf_counter()
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire()
+    assert time.perf_counter() - started < 1
+
+
+def test_limits_come_from_api_config(monkeypatch):
+    monkeypatch.setenv("ALIYUN_REQUESTS_PER_MINUTE", "120")
+    monkeypatch.setenv("ALIYUN_TOKENS_PER_MINUTE", "bad")
+    aliyun = AliyunConfig()
+    assert (aliyun.max_in_flight, aliyun.requests_per_minute, aliyun.tokens_per_minute) == (8, 120, 0)
+    assert AistudioConfig().max_in_flight == 2
+
+
+def test_estimate_tokens_counts_cjk_characters():
+    assert estimate_tokens("林清扬") == 3
+    assert estimate_tokens("abcdefgh") == 2
+
+
+class LimitedConfig:
+    def __init__(self, requests_per_minute):
+        self.model = "m"
+        self.max_tokens = 500
+        self.max_in_flight = 0
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = 0
+
+
+class LimitedAdapter:
+    def __init__(self, name, requests_per_minute=0):
+        self.name = name
+        self.base_url = "https://example.com"
+        self.config = LimitedConfig(requests_per_minute)
+        self.calls = 0
+
+    def is_available(self):
+        return True
+
+    def generate_names(self, prompt, **kwargs):
+        self.calls += 1
+        return {"success": True, "names": [{"name": "林清扬", "meaning": "寓意"}], "api_name": self.name}
+
+
+class DummyRouter:
+    def get_priority(self, adapters, preferred_api=None, context=None):
+        return ["aistudio", "aliyun"]
+
+
+def test_unified_client_routes_around_exhausted_provider(cache_dir, monkeypatch):
+    limited = LimitedAdapter("aistudio", requests_per_minute=1)
+    spare = LimitedAdapter("aliyun")
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_adapters",
+        lambda self: setattr(self, "adapters", {"aistudio": limited, "aliyun": spare}),
+    )
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_router",
+        lambda self: setattr(self, "router_strategy", DummyRouter()),
+    )
+    client = unified_client_module.UnifiedAPIClient()
+    client.cache_manager = CacheManager(backend="memory")
+
+    assert client.generate_names(prompt="p1", count=1, use_cache=False)["api_name"] == "aistudio"
+    assert client.generate_names(prompt="p2", count=1, use_cache=False)["api_name"] == "aliyun"
+
+    status = client.get_api_status()
+    assert status["aistudio"]["limiter"]["rejected"] == 1
+    assert status["aistudio"]["limiter"]["in_flight"] == 0
+    # 限流拒绝不计入熔断失败
+    assert status["aistudio"]["circuit"]["consecutive_failures"] == 0
+
+
+def test_open_circuit_does_not_spend_rate_budget(cache_dir, monkeypatch):
+    limited = LimitedAdapter("aistudio", requests_per_minute=1)
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_adapters",
+        lambda self: setattr(self, "adapters", {"aistudio": limited}),
+    )
+    client = unified_client_module.UnifiedAPIClient()
+    breaker = client.breakers.get("aistudio")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        client._call_adapter("aistudio", "p", 1, None, {})
+
+    limiter = client.limiters.get("aistudio", limited.config)
+    assert limiter.get_stats()["acquired"] == 0
+    # 每分钟 1 次的额度仍在，熔断恢复后的调用无需等待
+    breaker.record_success()
+    client._call_adapter("aistudio", "p", 1, None, {})
+    assert limiter.get_stats()["queued"] == 0
+    assert limited.calls == 1
@@ -0,0 +1,137 @@
+import threading
+import time
+
+import src.api.unified_client as unified_client_module
+from config.settings import Config
+from src.utils.cache_manager import CacheManager
+from src.utils.single_flight import SingleFlight
+
+
+def _run_concurrently(count, target):
+    results = [None] * count
+    start = threading.Barrier(count)
+
+    def worker(index):
+        start.wait()
+        results[index] = target()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight(max_wait=5)
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"names": ["林清扬"]}
+
+    results = _run_concurrently(5, lambda: flight.do("k", slow))
+
+    assert len(calls) == 1
+    assert [shared for _, shared in results].count(False) == 1
+    assert all(result == {"names": ["林清扬"]} for result, _ in results)
+    # 共享方拿到的是副本
+    assert len({id(result) for result, _ in results}) == 5
+
+    stats = flight.get_stats()
+    assert stats["leaders"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["in_flight"] == 0 and stats["waiting"] == 0
+
+
+def test_waiters_fall_back_after_max_wait():
+    flight = SingleFlight(max_wait=0.05)
+    release = threading.Event()
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(2)
+        return len(calls)
+
+    leader = threading.Thread(target=flight.do, args=("k", call))
+    leader.start()
+    time.sleep(0.02)
+    result, shared = flight.do("k", call)
+    release.set()
+    leader.join()
+
+    assert (result, shared) == (2, False)
+    assert flight.get_stats()["wait_timeouts"] == 1
+
+
+def test_errors_are_shared_with_waiters():
+    flight = SingleFlight(max_wait=5)
+
+    def failing():
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+
+    def attempt():
+        try:
+            flight.do("k", failing)
+        except RuntimeError as e:
+            return str(e)
+
+    assert _run_concurrently(3, attempt) == ["upstream down"] * 3
+    assert flight.get_stats()["shared_errors"] == 2
+
+
+def test_disabled_when_max_wait_is_zero():
+    flight = SingleFlight(max_wait=0)
+    calls = []
+    _run_concurrently(3, lambda: flight.do("k", lambda: calls.append(1)))
+    assert len(calls) == 3
+
+
+class SlowAdapter:
+    def __init__(self):
+        self.calls = 0
+        self.name = "paiou"
+        self.base_url = "https://example.com"
+
+    def generate_names(self, prompt, **kwargs):
+        self.calls += 1
+        time.sleep(0.2)
+        return {"success": True, "names": [{"name": "林清和", "meaning": "清朗平和"}], "api_name": "paiou"}
+
+
+class DummyRouter:
+    def get_priority(self, adapters, preferred_api=None, context=None):
+        return ["paiou"]
+
+
+def test_unified_client_coalesces_identical_requests(cache_dir, monkeypatch):
+    adapter = SlowAdapter()
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_adapters",
+        lambda self: setattr(self, "adapters", {"paiou": adapter}),
+    )
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_router",
+        lambda self: setattr(self, "router_strategy", DummyRouter()),
+    )
+    client = unified_client_module.UnifiedAPIClient()
+    client.cache_manager = CacheManager(backend="memory")
+
+    results = _run_concurrently(
+        4, lambda: client.generate_names(prompt="同一个请求", count=1, use_cache=False)
+    )
+
+    assert adapter.calls == 1
+    assert all(result["names"][0]["name"] == "林清和" for result in results)
+    assert client.single_flight.get_stats()["coalesced"] == 3
+
+    # 不同请求不合并
+    client.generate_names(prompt="另一个请求", count=1, use_cache=False)
+    assert adapter.calls == 2
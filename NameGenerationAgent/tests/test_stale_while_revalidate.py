@@ -0,0 +1,157 @@
+import threading
+import time
+
+import pytest
+
+import src.api.unified_client as unified_client_module
+from config.settings import Config
+from src.api.adapters.base_adapter import APIException
+from src.core.name_pool import POOL_KEY_PREFIX, NamePool
+from src.utils.background_refresh import BackgroundRefresher
+from src.utils.cache_keys import build_request_signature, semantic_cache_key
+from src.utils.cache_manager import CacheManager
+
+
+@pytest.fixture
+def cache_dir(cache_dir, monkeypatch):
+    monkeypatch.setattr(Config, "CACHE_TTL", 60)
+    monkeypatch.setattr(Config, "CACHE_MAX_STALE", 600)
+    return cache_dir
+
+
+def _age(cache, key, value, seconds):
+    cache.backend.set(key, value, time.time() - seconds)
+    if cache.l1 is not None:
+        cache.l1.clear()
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_fresh_and_max_stale_windows(cache_dir, backend):
+    cache = CacheManager(backend=backend)
+    cache.set("fresh", 1)
+    _age(cache, "stale", 2, 120)
+    _age(cache, "dead", 3, 700)
+
+    assert cache.get_with_state("fresh") == (1, False)
+    assert cache.get("stale") is None
+    assert cache.get_with_state("stale") == (2, True)
+    assert cache.get_with_state("dead") == (None, False)
+
+    stats = cache.get_stats()
+    assert stats["stale_hits"] == 1
+    assert stats["expirations"] == 1
+    assert stats["stale_entries"] == 1
+    assert stats["max_stale"] == 600
+    cache.close()
+
+
+def test_stale_disabled_by_default(cache_dir, monkeypatch):
+    monkeypatch.setattr(Config, "CACHE_MAX_STALE", 0)
+    cache = CacheManager(backend="memory")
+    _age(cache, "old", 1, 120)
+
+    assert cache.get_with_state("old") == (None, False)
+    assert cache.get_stats()["expirations"] == 1
+
+
+def test_refresher_deduplicates_keys():
+    refresher = BackgroundRefresher(workers=1)
+    release = threading.Event()
+    runs = []
+
+    def job():
+        release.wait(2)
+        runs.append(1)
+
+    assert refresher.submit("k", job) is True
+    assert refresher.submit("k", job) is False
+    release.set()
+    refresher.join()
+
+    assert runs == [1]
+    stats = refresher.get_stats()
+    assert (stats["submitted"], stats["deduplicated"], stats["completed"], stats["pending"]) == (1, 1, 1, 0)
+
+
+class SequenceAdapter:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.name = "paiou"
+        self.base_url = "https://example.com"
+
+    def generate_names(self, prompt, **kwargs):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return {"success": True, "names": [{"name": outcome, "meaning": "寓意"}], "api_name": "paiou"}
+
+
+class DummyRouter:
+    def get_priority(self, adapters, preferred_api=None, context=None):
+        return ["paiou"]
+
+
+def _client(monkeypatch, adapter):
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_adapters",
+        lambda self: setattr(self, "adapters", {"paiou": adapter}),
+    )
+    monkeypatch.setattr(
+        unified_client_module.UnifiedAPIClient,
+        "_initialize_router",
+        lambda self: setattr(self, "router_strategy", DummyRouter()),
+    )
+    client = unified_client_module.UnifiedAPIClient()
+    client.cache_manager = CacheManager(backend="memory")
+    return client
+
+
+def _age_entry(client, key):
+    stored, _ = client.cache_manager.backend.get(key)
+    client.cache_manager.backend.set(key, stored, time.time() - 120)
+
+
+def test_stale_result_is_served_and_refreshed(cache_dir, monkeypatch):
+    client = _client(monkeypatch, SequenceAdapter(["林清和", "苏婉清"]))
+    signature = build_request_signature("温柔坚定", count=1)
+
+    first = client.generate_names(prompt="p", count=1, cache_signature=signature)
+    assert (first["names"][0]["name"], first["stale"]) == ("林清和", False)
+
+    _age_entry(client, client._resolve_cache_key("p", 1, {}, signature))
+    stale = client.generate_names(prompt="p", count=1, cache_signature=signature)
+    assert (stale["names"][0]["name"], stale["stale"]) == ("林清和", True)
+
+    client.refresher.join()
+    refreshed = client.generate_names(prompt="p", count=1, cache_signature=signature)
+    assert (refreshed["names"][0]["name"], refreshed["stale"]) == ("苏婉清", False)
+
+
+def test_failed_refresh_keeps_stale_result(cache_dir, monkeypatch):
+    client = _client(monkeypatch, SequenceAdapter(["林清和", APIException("down")]))
+
+    client.generate_names(prompt="p", count=1)
+    _age_entry(client, client._generate_cache_key("p", 1, {}))
+    assert client.generate_names(prompt="p", count=1)["stale"] is True
+    client.refresher.join()
+
+    again = client.generate_names(prompt="p", count=1)
+    assert (again["names"][0]["name"], again["stale"]) == ("林清和", True)
+
+
+def test_stale_pool_is_flagged(cache_dir):
+    cache = CacheManager(backend="memory")
+    pool = NamePool(cache, factor=3)
+    signature = build_request_signature("温柔坚定", count=1)
+    pool.put(signature, {"success": True, "names": [{"name": "林清和"}, {"name": "苏婉清"}]})
+    assert pool.take(signature, 1, user_id=1)["stale"] is False
+
+    key = semantic_cache_key(signature, prefix=POOL_KEY_PREFIX)
+    stored, _ = cache.backend.get(key)
+    cache.backend.set(key, stored, time.time() - 120)
+
+    taken = pool.take(signature, 1, user_id=1)
+    assert taken["stale"] is True
+    assert taken["names"] == [{"name": "苏婉清"}]
+
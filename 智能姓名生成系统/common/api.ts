@@ -62,6 +62,12 @@ export interface BackendCacheStats {
   active_entries?: number;
   expired_entries?: number;
   total_entries?: number;
+  hits?: number;
+  misses?: number;
+  hit_rate?: number;
+  evictions?: number;
+  expirations?: number;
+  latency_saved_ms?: number;
 }
 
 export interface BackendStats {